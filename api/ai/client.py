@@ -0,0 +1,53 @@
+import os
+import asyncio
+import logging
+from dotenv import load_dotenv
+from warmup import register_warmup_hook
+
+load_dotenv()
+
+# Initialize OpenAI Client
+api_key = os.getenv("OPENAI_API_KEY")
+if not api_key:
+    logging.warning("OpenAI API key not found. OpenAI service will not function properly.")
+
+openai_model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+
+# Per-request timeout and SDK-level retries (429/5xx/connection errors, with backoff)
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "60"))
+OPENAI_CONNECT_TIMEOUT_SECONDS = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", "5"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+
+# The openai SDK is the single most expensive import in the API, so the client
+# is created on first use rather than at import time.
+openai_client = None
+async_openai_client = None
+_async_client_loop = None
+
+
+def _client_options() -> dict:
+    import httpx
+    timeout = httpx.Timeout(OPENAI_TIMEOUT_SECONDS, connect=OPENAI_CONNECT_TIMEOUT_SECONDS)
+    return dict(api_key=api_key, timeout=timeout, max_retries=OPENAI_MAX_RETRIES)
+
+
+@register_warmup_hook("openai_client")
+def get_openai_client():
+    """Return the shared OpenAI client, constructing it on first use."""
+    global openai_client
+    if openai_client is None:
+        from openai import OpenAI
+        openai_client = OpenAI(**_client_options())
+    return openai_client
+
+
+def get_async_openai_client():
+    """Return the AsyncOpenAI client bound to the running event loop."""
+    global async_openai_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if async_openai_client is None or _async_client_loop is not loop:
+        # httpx connection pools belong to the loop that opened them
+        from openai import AsyncOpenAI
+        async_openai_client = AsyncOpenAI(**_client_options())
+        _async_client_loop = loop
+    return async_openai_client
@@ -0,0 +1,140 @@
+import os
+import re
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict
+from ai import client as ai_client
+from storage.images import IMAGE_BUCKET_NAME, get_s3_client, image_exists, store_image_from_url, variant_keys, variant_urls
+from storage.utils import acquire_image_lease, release_image_lease, set_pantry_item_image
+from warmup import register_warmup_hook
+from metrics import dependency_span
+from tracing import hydration_phase
+
+# Bucket name for images
+S3_BUCKET_NAME = IMAGE_BUCKET_NAME
+
+# Bump PROMPT_VERSION whenever build_item_image_prompt changes so cached images are regenerated
+PROMPT_VERSION = "v1"
+SHARED_IMAGE_PREFIX = "shared/items"
+IMAGE_LEASE_SECONDS = int(os.getenv("IMAGE_LEASE_SECONDS", "60"))
+# How long a caller that lost the lease waits for the winner's upload. Kept far
+# below the worker timeout: a batch of waiting jobs must still finish in time.
+IMAGE_LEASE_WAIT_SECONDS = float(os.getenv("IMAGE_LEASE_WAIT_SECONDS", "5"))
+IMAGE_LEASE_POLL_SECONDS = 1.0
+IMAGE_PENDING_RETRY_SECONDS = 5  # Retry-After for callers told the image is still pending
+GENERATED_IMAGE_EXT = "png"  # OpenAI image URLs serve PNG
+
+# Per-key locks with their holder counts; an entry is dropped when its last holder leaves
+_generation_locks: Dict[str, list] = {}
+_generation_locks_guard = threading.Lock()
+
+
+class ImagePending(RuntimeError):
+    """Another worker is generating this image; retry once its upload lands."""
+
+@register_warmup_hook("s3")
+def prime_s3():
+    """Open a pooled S3 connection to the image bucket."""
+    get_s3_client().head_bucket(Bucket=S3_BUCKET_NAME)
+
+def build_item_image_prompt(item_name: str) -> str:
+    """Return a detailed prompt for generating a photo-realistic image of the item."""
+    return (
+        f"Photo-realistic studio photograph of {item_name} on a clean neutral "
+        "background, soft natural lighting, crisp focus, no props except plates."
+    )
+
+# ─── Shared Image Cache ──────────────────────────────────────────────────────────
+# Item images depend only on the product name and the prompt, so they are stored
+# once under a content-addressed key and reused by every user and item.
+
+def normalize_item_name(item_name: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace ("  Milk! " -> "milk")."""
+    return " ".join(re.sub(r"[^\w\s]", " ", item_name.lower()).split())
+
+def shared_image_key(item_name: str) -> str:
+    """Return the S3 prefix holding the item image of ``item_name`` at the current PROMPT_VERSION."""
+    digest = hashlib.sha256(f"{PROMPT_VERSION}:{normalize_item_name(item_name)}".encode()).hexdigest()
+    return f"{SHARED_IMAGE_PREFIX}/{digest}"
+
+def _shared_image_exists(prefix: str) -> bool:
+    # The original is written last, so it marks a complete variant set
+    return image_exists(variant_keys(prefix, GENERATED_IMAGE_EXT)["original"])
+
+@contextmanager
+def _key_lock(key: str, timeout: float):
+    """Hold the per-key lock, raising ImagePending if another thread keeps it past ``timeout`` seconds."""
+    with _generation_locks_guard:
+        entry = _generation_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        if not entry[0].acquire(timeout=timeout):
+            raise ImagePending(f"Shared image {key} is being generated by another thread")
+        try:
+            yield
+        finally:
+            entry[0].release()
+    finally:
+        with _generation_locks_guard:
+            entry[1] -= 1
+            if not entry[1]:
+                del _generation_locks[key]
+
+def _wait_for_shared_image(prefix: str, wait_seconds: float) -> bool:
+    """Poll S3 for up to ``wait_seconds`` while another worker holds the lease; True once the image lands."""
+    deadline = time.monotonic() + wait_seconds
+    while time.monotonic() < deadline:
+        time.sleep(min(IMAGE_LEASE_POLL_SECONDS, max(0.0, deadline - time.monotonic())))
+        if _shared_image_exists(prefix):
+            return True
+    return False
+
+def _generate_image(prefix: str, item_name: str, openai_client) -> Dict[str, str]:
+    prompt = build_item_image_prompt(item_name)
+    with dependency_span("openai", "images.generate"):
+        resp = openai_client.images.generate(prompt=prompt, n=1, size="256x256")
+    return store_image_from_url(resp.data[0].url, prefix, GENERATED_IMAGE_EXT)
+
+def get_or_create_item_image(item_name: str, openai_client=None,
+                             wait_seconds: float = None) -> Dict[str, str]:
+    """Return the variant URL map of the shared image for ``item_name``, generating it at most once.
+
+    Threads in this process coalesce on a per-key lock and workers in other
+    processes on a DynamoDB lease. A caller that loses either waits up to
+    ``wait_seconds`` (default IMAGE_LEASE_WAIT_SECONDS) for the winner, then
+    raises ImagePending so it retries later instead of holding its thread.
+    """
+    if wait_seconds is None:
+        wait_seconds = IMAGE_LEASE_WAIT_SECONDS
+    prefix = shared_image_key(item_name)
+    if _shared_image_exists(prefix):
+        return variant_urls(prefix, GENERATED_IMAGE_EXT)
+    with _key_lock(prefix, wait_seconds):
+        if _shared_image_exists(prefix):
+            return variant_urls(prefix, GENERATED_IMAGE_EXT)
+        owner = str(uuid.uuid4())
+        if not acquire_image_lease(prefix, owner, IMAGE_LEASE_SECONDS):
+            if _wait_for_shared_image(prefix, wait_seconds):
+                return variant_urls(prefix, GENERATED_IMAGE_EXT)
+            raise ImagePending(f"Shared image {prefix} is being generated by another worker")
+        try:
+            return _generate_image(prefix, item_name, openai_client or ai_client.get_openai_client())
+        finally:
+            release_image_lease(prefix, owner)
+
+def enrich_image_job(payload: dict):
+    """Hydrate a single pantry item image from the shared cache (generating on a miss) and persist URL."""
+    if not ai_client.api_key:
+        raise RuntimeError("OpenAI API key not configured")
+    user_id = payload.get("user_id")
+    item_id = payload.get("item_id")
+    item_name = payload.get("item_name")
+    with hydration_phase("upstream"):
+        variants = get_or_create_item_image(item_name)
+    with hydration_phase("write"):
+        set_pantry_item_image(user_id, item_id, variants["original"], variants)
+    logging.info(f"Enriched image for item {item_id}")
@@ -0,0 +1,181 @@
+import json
+from typing import Any, List, Optional, Tuple
+
+# ─── Incremental Recipe JSON ─────────────────────────────────────────────────────
+# The model is asked for a JSON recipe (title, ingredients, steps, macros). This
+# parser consumes the completion as it streams and reports each top-level field
+# and each ingredient/step the moment its JSON value is complete, then repairs a
+# truncated or slightly malformed document at the end.
+
+TITLE_KEYS = ("title", "name")
+LIST_EVENTS = {
+    "ingredients": "ingredient",
+    "steps": "step",
+    "instructions": "step",
+}
+
+Event = Tuple[str, Any]
+
+
+class _Frame:
+    __slots__ = ("kind", "key", "expect_key", "value_start", "member_start", "owner_key")
+
+    def __init__(self, kind: str, owner_key: Optional[str], member_start: int):
+        self.kind = kind                  # "obj" or "arr"
+        self.key = None                   # current member key (objects)
+        self.expect_key = kind == "obj"
+        self.value_start = None           # buffer index where the pending value began
+        self.member_start = member_start  # buffer index just after the last "{", "[" or ","
+        self.owner_key = owner_key        # parent's key for this container
+
+
+class RecipeStreamParser:
+    """Feed completion text chunk by chunk; collect ``(event, value)`` pairs as values complete.
+
+    Events are ``("title", str)``, ``("ingredient", value)`` and ``("step", value)``.
+    Text before the first ``{`` (prose, code fences) is ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.stack: List[_Frame] = []
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+        self.in_string = False
+        self.escape = False
+        self.string_start = 0
+        self.members: dict = {}       # completed top-level members
+        self.lists: dict = {}         # list items seen so far, by top-level key
+
+    @property
+    def complete(self) -> bool:
+        return self.end is not None
+
+    def feed(self, text: str) -> List[Event]:
+        events: List[Event] = []
+        self.buffer += text
+        buf = self.buffer
+        while self.pos < len(buf) and not self.complete:
+            i, c = self.pos, buf[self.pos]
+            self.pos += 1
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == "\\":
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+                    frame = self.stack[-1]
+                    if frame.kind == "obj" and frame.expect_key:
+                        frame.key = _loads(buf[self.string_start:i + 1])
+                continue
+            if self.start is None:
+                if c == "{":
+                    self.start = i
+                    self.stack.append(_Frame("obj", None, i + 1))
+                continue
+            if c.isspace():
+                continue
+            frame = self.stack[-1]
+            if c == '"':
+                self.in_string = True
+                self.string_start = i
+                self._begin_value(frame, i)
+            elif c in "{[":
+                self._begin_value(frame, i)
+                owner_key = frame.key if frame.kind == "obj" else None
+                self.stack.append(_Frame("obj" if c == "{" else "arr", owner_key, i + 1))
+            elif c in "}]":
+                self._finish_value(frame, i, events)
+                self.stack.pop()
+                if not self.stack:
+                    self.end = i + 1
+            elif c == ",":
+                self._finish_value(frame, i, events)
+                frame.member_start = i + 1
+                if frame.kind == "obj":
+                    frame.expect_key = True
+                    frame.key = None
+            elif c == ":":
+                frame.expect_key = False
+            else:
+                self._begin_value(frame, i)
+        return events
+
+    def _begin_value(self, frame: _Frame, i: int):
+        if frame.value_start is None and not (frame.kind == "obj" and frame.expect_key):
+            frame.value_start = i
+
+    def _finish_value(self, frame: _Frame, i: int, events: List[Event]):
+        if frame.value_start is None:
+            return
+        raw = self.buffer[frame.value_start:i].strip()
+        frame.value_start = None
+        depth = len(self.stack)
+        if depth == 1 and frame.kind == "obj" and frame.key is not None:
+            value = _loads(raw)
+            if value is _INVALID:
+                return
+            self.members[frame.key] = value
+            if frame.key in TITLE_KEYS and isinstance(value, str):
+                events.append(("title", value))
+        elif depth == 2 and frame.kind == "arr" and frame.owner_key in LIST_EVENTS:
+            value = _loads(raw)
+            if value is _INVALID:
+                return
+            self.lists.setdefault(frame.owner_key, []).append(value)
+            events.append((LIST_EVENTS[frame.owner_key], value))
+
+    def finalize(self) -> Optional[dict]:
+        """Return the best-effort recipe document: parsed, repaired, or assembled from events."""
+        if self.start is None:
+            return None
+        if self.complete:
+            doc = _loads(self.buffer[self.start:self.end])
+            if isinstance(doc, dict):
+                return doc
+        repaired = _loads(self._repaired_text())
+        if isinstance(repaired, dict) and repaired:
+            return repaired
+        doc = dict(self.members)
+        for key, items in self.lists.items():
+            doc.setdefault(key, items)
+        return doc or None
+
+    def _repaired_text(self) -> str:
+        """Close an unterminated string and every open container, dropping a dangling member."""
+        text = self.buffer[:self.end or len(self.buffer)]
+        if self.in_string:
+            # A lone trailing backslash would escape the closing quote
+            text = (text[:-1] if self.escape else text) + '"'
+        if self.stack:
+            top = self.stack[-1]
+            pending = text[top.value_start:].strip() if top.value_start is not None else None
+            # A key with no value yet ("steps":) or a cut-off scalar (tru, 12.) can't be kept
+            dangling_key = top.kind == "obj" and (top.expect_key or pending is None)
+            if dangling_key or (pending is not None and _loads(pending) is _INVALID):
+                text = text[:top.member_start]
+        text = text[self.start:].rstrip().rstrip(",")
+        closers = "".join("}" if frame.kind == "obj" else "]" for frame in reversed(self.stack))
+        return text + closers
+
+
+_INVALID = object()
+
+
+def _loads(raw: str):
+    try:
+        return json.loads(raw)
+    except (ValueError, TypeError):
+        return _INVALID
+
+
+def parse_recipe_json(raw: str) -> Optional[dict]:
+    """Parse a complete completion, repairing truncation or trailing junk; None if hopeless."""
+    doc = _loads(raw)
+    if isinstance(doc, dict):
+        return doc
+    parser = RecipeStreamParser()
+    parser.feed(raw)
+    return parser.finalize()
@@ -0,0 +1,194 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from metrics import dependency_span, percentiles, register_collector, sample_lines, window_lines
+
+# ─── LLM Call Layer ──────────────────────────────────────────────────────────────
+# Every OpenAI call from the API goes through an admission gate: a global
+# semaphore caps upstream concurrency and a per-user semaphore keeps one
+# authenticated user from taking every slot. Waiting for a slot is bounded by
+# OPENAI_QUEUE_TIMEOUT_SECONDS; request timeouts and retries are handled by the
+# SDK client (see ai.client).
+
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+OPENAI_MAX_PER_USER = int(os.getenv("OPENAI_MAX_PER_USER", "2"))
+OPENAI_QUEUE_TIMEOUT_SECONDS = float(os.getenv("OPENAI_QUEUE_TIMEOUT_SECONDS", "10"))
+SLOW_QUEUE_MS = 1000
+
+
+class LLMBusy(Exception):
+    """No LLM slot freed up within OPENAI_QUEUE_TIMEOUT_SECONDS."""
+
+
+class LLMStats:
+    """Counters plus a rolling window of queue and upstream latencies."""
+
+    def __init__(self, window: int = 1000):
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.waiting = 0
+        self.queue_ms = deque(maxlen=window)
+        self.upstream_ms = deque(maxlen=window)
+
+    def snapshot(self) -> dict:
+        return {
+            "started": self.started,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "queue_ms": percentiles(self.queue_ms),
+            "upstream_ms": percentiles(self.upstream_ms),
+        }
+
+
+stats = LLMStats()
+
+
+class _Gate:
+    """Semaphores for one event loop (asyncio primitives can't be shared across loops)."""
+
+    def __init__(self):
+        self.global_slots = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+        self.user_slots: Dict[str, asyncio.Semaphore] = {}
+        self.user_refs: Dict[str, int] = {}
+
+
+_gate: Optional[_Gate] = None
+_gate_loop = None
+
+
+def _get_gate() -> _Gate:
+    global _gate, _gate_loop
+    loop = asyncio.get_running_loop()
+    if _gate is None or _gate_loop is not loop:
+        _gate, _gate_loop = _Gate(), loop
+    return _gate
+
+
+@asynccontextmanager
+async def llm_slot(user_id: Optional[str]):
+    """Hold one global LLM slot (and one of ``user_id``'s slots, if given) for the block."""
+    gate = _get_gate()
+    user_sem = None
+    if user_id is not None:
+        user_sem = gate.user_slots.setdefault(user_id, asyncio.Semaphore(OPENAI_MAX_PER_USER))
+        gate.user_refs[user_id] = gate.user_refs.get(user_id, 0) + 1
+    held = []
+    start = time.perf_counter()
+    stats.waiting += 1
+    try:
+        try:
+            async with asyncio.timeout(OPENAI_QUEUE_TIMEOUT_SECONDS):
+                for sem in (user_sem, gate.global_slots):
+                    if sem is not None:
+                        await sem.acquire()
+                        held.append(sem)
+        except TimeoutError:
+            stats.rejected += 1
+            raise LLMBusy(f"No LLM capacity after {OPENAI_QUEUE_TIMEOUT_SECONDS:.0f}s")
+        finally:
+            stats.waiting -= 1
+        queued_ms = (time.perf_counter() - start) * 1000
+        stats.queue_ms.append(queued_ms)
+        if queued_ms > SLOW_QUEUE_MS:
+            logging.warning(f"LLM call for {user_id or 'anonymous'} queued {queued_ms:.0f} ms")
+        stats.in_flight += 1
+        try:
+            yield
+        finally:
+            stats.in_flight -= 1
+    finally:
+        for sem in held:
+            sem.release()
+        if user_sem is not None:
+            # Drop idle per-user semaphores so the map doesn't grow with every user seen
+            gate.user_refs[user_id] -= 1
+            if gate.user_refs[user_id] == 0:
+                del gate.user_refs[user_id]
+                del gate.user_slots[user_id]
+
+
+async def _timed(operation: str, call, **kwargs):
+    start = time.perf_counter()
+    stats.started += 1
+    try:
+        with dependency_span("openai", operation):
+            result = await call(**kwargs)
+    except Exception:
+        stats.failed += 1
+        raise
+    stats.upstream_ms.append((time.perf_counter() - start) * 1000)
+    return result
+
+
+async def chat_completion(client, user_id: Optional[str], **kwargs):
+    """Run one chat completion on ``client`` (AsyncOpenAI) inside an LLM slot."""
+    async with llm_slot(user_id):
+        response = await _timed("chat.completions", client.chat.completions.create, **kwargs)
+    stats.completed += 1
+    return response
+
+
+class SlotStream:
+    """An open completion stream that keeps its LLM slot until exhausted or closed."""
+
+    def __init__(self, stream, slot):
+        self._stream = stream
+        self._slot = slot
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator:
+        try:
+            async for chunk in self._stream:
+                yield chunk
+            stats.completed += 1
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self._stream.close()
+        finally:
+            await self._slot.__aexit__(None, None, None)
+
+
+async def open_chat_stream(client, user_id: Optional[str], **kwargs) -> SlotStream:
+    """Start a streaming chat completion; the slot is released when the stream is closed."""
+    slot = llm_slot(user_id)
+    await slot.__aenter__()
+    try:
+        stream = await _timed("chat.completions.stream", client.chat.completions.create, stream=True, **kwargs)
+    except BaseException:
+        await slot.__aexit__(None, None, None)
+        raise
+    return SlotStream(stream, slot)
+
+
+def llm_stats() -> dict:
+    """Return a snapshot of LLM admission and latency stats."""
+    return stats.snapshot()
+
+
+@register_collector("llm")
+def llm_metrics():
+    snap = stats.snapshot()
+    outcomes = ("started", "completed", "failed", "rejected")
+    return (
+        sample_lines("llm_calls_total", "LLM calls by outcome (rejected = no slot in time).",
+                     [({"outcome": o}, snap[o]) for o in outcomes], kind="counter")
+        + sample_lines("llm_in_flight", "LLM calls holding a slot.", [({}, snap["in_flight"])])
+        + sample_lines("llm_waiting", "LLM calls waiting for a slot.", [({}, snap["waiting"])])
+        + window_lines("llm_queue_wait_seconds", "Wait for an LLM slot.", [({}, stats.queue_ms)])
+    )
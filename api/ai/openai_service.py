@@ -1,9 +1,7 @@
-import json
-import os
 import logging
-from openai import OpenAI
-from fastapi import APIRouter, HTTPException, Depends, Request
-from starlette.responses import StreamingResponse
+from typing import Tuple
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from starlette.concurrency import run_in_threadpool
 from storage.utils import read_pantry_items
 from models.models import (
     InventoryItemMacros,
@@ -11,12 +9,19 @@ from models.models import (
     RecipeRequest,
     RecipeResponse,
 )
-from datetime import datetime
-import pytz  # Import pytz for timezone conversion
+from datetime import datetime, timezone
 from auth.auth_service import get_user_id_from_token
-import boto3
-import requests
-from storage.utils import pantry_table
+from storage.utils import set_pantry_item_image
+from ai import client as ai_client
+from ai import llm
+from ai.llm import LLMBusy
+from ai.client import api_key, openai_model
+from ai.json_stream import parse_recipe_json
+from ai.prompt_budget import PROMPT_ITEM_TOKEN_BUDGET, budget_item_lines, compact_macros
+from ai.response_cache import canonical_items, response_cache, response_key
+from ai.streaming import sse_response, stream_completion_events, stream_recipe_events
+# Image helpers are shared with the SQS worker, which must not import FastAPI
+from ai.images import IMAGE_PENDING_RETRY_SECONDS, ImagePending, get_or_create_item_image
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
@@ -25,162 +30,220 @@ logging.basicConfig(level=logging.INFO,
 # AI Router for OpenAI-powered recipe recommendations
 openai_router = APIRouter(prefix="/openai")
 
-# Initialize OpenAI Client
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    logging.warning("OpenAI API key not found. OpenAI service will not function properly.")
+# Tests may assign a stub to ``openai_client``; otherwise the shared lazy client is used.
+openai_client = None
 
-openai_model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
-openai_client = OpenAI(api_key=api_key)
 
+def get_openai_client():
+    """Return the AsyncOpenAI client for the routes in this module."""
+    return openai_client or ai_client.get_async_openai_client()
 
-def call_openai(prompt: str) -> str:
-    """Execute a chat completion and return the raw string."""
-    resp = openai_client.chat.completions.create(
-        model=openai_model,
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=800,
-    )
-    return resp.choices[0].message.content
 
-# Bucket name for images
-S3_BUCKET_NAME = os.getenv("IMAGE_BUCKET_NAME", "ppal-images")
+def get_image_client():
+    """Return the blocking client used by the image pipeline, which runs on a worker thread."""
+    return openai_client or ai_client.get_openai_client()
 
-# Initialize S3 client once
-s3 = boto3.client("s3")
 
-def _ensure_bucket(bucket_name: str):
-    try:
-        s3.head_bucket(Bucket=bucket_name)
-    except s3.exceptions.NoSuchBucket:
-        logging.info(f"Creating S3 bucket {bucket_name}")
-        s3.create_bucket(Bucket=bucket_name)
-
-def _upload_image_to_s3(user_id: str, item_id: str, img_data: bytes) -> str:
-    _ensure_bucket(S3_BUCKET_NAME)
-    key = f"{user_id}/{item_id}.png"
-    s3.put_object(
-        Bucket=S3_BUCKET_NAME,
-        Key=key,
-        Body=img_data,
-        ContentType="image/png"
-    )
-    return f"https://{S3_BUCKET_NAME}.s3.amazonaws.com/{key}"
+async def complete(user_id, kwargs: dict) -> str:
+    """Run a chat completion through the LLM admission gate and return its text."""
+    response = await llm.chat_completion(get_openai_client(), user_id, **kwargs)
+    return response.choices[0].message.content
+
 
 def check_api_key():
     if not api_key:
         raise HTTPException(status_code=500, detail="OpenAI API key not configured")
 
-def build_item_image_prompt(item_name: str) -> str:
-    """Return a detailed prompt for generating a photo-realistic image of the item."""
-    return (
-        f"Photo-realistic studio photograph of {item_name} on a clean neutral "
-        "background, soft natural lighting, crisp focus, no props except plates."
+def item_dict(item) -> dict:
+    return item if isinstance(item, dict) else item.dict()
+
+def cached_response(user_id: str, key: str, regenerate: bool):
+    """Return the cached response for ``key``, or None on a miss or when regeneration was asked for."""
+    if regenerate:
+        response_cache.bypass()
+        return None
+    return response_cache.get(user_id, key)
+
+def meal_recommendation_request(user_id: str) -> Tuple[dict, str]:
+    """Build the chat completion arguments for pantry-based recipe recommendations, plus their cache key."""
+    items = [item_dict(it) for it in read_pantry_items(user_id)]
+    prompt = build_recipe_prompt(items, token_budget=PROMPT_ITEM_TOKEN_BUDGET)
+    # Expiry and age decide which items make the budget, so they are part of the key
+    key = response_key("meal_recommendation", openai_model,
+                       items=canonical_items(items, ("product_name", "quantity", "expiration_date", "created_at")))
+    return dict(
+        model=openai_model,
+        messages=[{"role": "system", "content": "You are a helpful culinary assistant."},
+                 {"role": "user", "content": prompt}],
+        max_tokens=800,
+        temperature=0.7
+    ), key
+
+def meal_suggestions_request(user_id: str, daily_macro_goals: InventoryItemMacros) -> Tuple[dict, str]:
+    """Build the chat completion arguments for macro-aware meal suggestions, plus their cache key."""
+    items = [item_dict(it) for it in read_pantry_items(user_id)]
+    prompt = generate_meal_suggestion_prompt(items, daily_macro_goals)
+    # Expiry dates are in the prompt and, with item age, decide the ranking. Of the
+    # prompt's timestamp only the date is keyed: a plan is reused within a day.
+    key = response_key("meal_suggestions", openai_model,
+                       items=canonical_items(items, ("product_name", "macros", "expiration_date", "created_at")),
+                       goals=daily_macro_goals, day=datetime.now(timezone.utc).date().isoformat())
+    return dict(
+        model=openai_model,
+        messages=[{"role": "system", "content": "You are a nutrition expert and chef."},
+                 {"role": "user", "content": prompt}],
+        max_tokens=1000,
+        temperature=0.7
+    ), key
+
+def llm_chat_request(request: LLMChatRequest) -> dict:
+    """Build the chat completion arguments for a free-form chat."""
+    if not request.messages:
+        raise HTTPException(status_code=400, detail="No messages provided")
+    return dict(
+        model=openai_model,
+        messages=[m.dict() for m in request.messages],
+        max_tokens=500
     )
 
+async def open_stream(user_id, kwargs: dict):
+    """Start a streaming chat completion, mapping setup failures to an error before any bytes are sent."""
+    try:
+        return await llm.open_chat_stream(get_openai_client(), user_id, **kwargs)
+    except LLMBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error starting OpenAI stream: {e}")
+        raise HTTPException(status_code=500, detail=f"Error communicating with OpenAI: {str(e)}")
+
 @openai_router.get("/meal_recommendation")
-def get_recipe_recommendations(user_id: str = Depends(get_user_id_from_token)):
-    """Get OpenAI-powered recipe recommendations based on the user's pantry items."""
+async def get_recipe_recommendations(regenerate: bool = False, user_id: str = Depends(get_user_id_from_token)):
+    """Get OpenAI-powered recipe recommendations based on the user's pantry items.
+
+    Unchanged pantry contents return the cached answer unless ``regenerate`` is set.
+    """
     check_api_key()
     logging.info(f"Generating OpenAI recipe recommendations for user ID: {user_id}")
-    items = read_pantry_items(user_id)
-    prompt = build_recipe_prompt(items)
+    kwargs, key = await run_in_threadpool(meal_recommendation_request, user_id)
+    cached = cached_response(user_id, key, regenerate)
+    if cached is not None:
+        return cached
     
     try:
         logging.info(f"OpenAI meal generation starting for: {user_id}")
-        response = openai_client.chat.completions.create(
-            model=openai_model,
-            messages=[{"role": "system", "content": "You are a helpful culinary assistant."},
-                     {"role": "user", "content": prompt}],
-            max_tokens=800,
-            temperature=0.7
-        )
-        recipes = response.choices[0].message.content
-        return recipes
+        content = await complete(user_id, kwargs)
+    except LLMBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logging.error(f"Error generating recipes with OpenAI: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate recipes: {str(e)}")
+    if content:
+        response_cache.put(user_id, key, content)
+    return content
+
+@openai_router.get("/meal_recommendation/stream")
+async def stream_recipe_recommendations(request: Request, user_id: str = Depends(get_user_id_from_token)):
+    """SSE variant of /meal_recommendation: forwards tokens as they are generated."""
+    check_api_key()
+    logging.info(f"Streaming OpenAI recipe recommendations for user ID: {user_id}")
+    kwargs, _ = await run_in_threadpool(meal_recommendation_request, user_id)
+    stream = await open_stream(user_id, kwargs)
+    return sse_response(stream_completion_events(request, stream), stream)
 
 @openai_router.post("/meal_suggestions")
-def get_meal_suggestions(daily_macro_goals: InventoryItemMacros, user_id: str = Depends(get_user_id_from_token)):
-    """Get OpenAI-powered meal suggestions based on the user's pantry items and daily macro goals."""
+async def get_meal_suggestions(daily_macro_goals: InventoryItemMacros, regenerate: bool = False,
+                               user_id: str = Depends(get_user_id_from_token)):
+    """Get OpenAI-powered meal suggestions based on the user's pantry items and daily macro goals.
+
+    Unchanged items and goals return the cached answer unless ``regenerate`` is set.
+    """
     check_api_key()
     logging.info(f"Generating OpenAI meal suggestions for user ID: {user_id} with daily macro goals: {daily_macro_goals}")
-    items = read_pantry_items(user_id)
-    prompt = generate_meal_suggestion_prompt(items, daily_macro_goals)
+    kwargs, key = await run_in_threadpool(meal_suggestions_request, user_id, daily_macro_goals)
+    cached = cached_response(user_id, key, regenerate)
+    if cached is not None:
+        return cached
     
     try:
         logging.info(f"OpenAI meal suggestion generation starting for: {user_id}")
-        response = openai_client.chat.completions.create(
-            model=openai_model,
-            messages=[{"role": "system", "content": "You are a nutrition expert and chef."},
-                     {"role": "user", "content": prompt}],
-            max_tokens=1000,
-            temperature=0.7
-        )
-        meal_suggestions = response.choices[0].message.content
-        return meal_suggestions
+        content = await complete(user_id, kwargs)
+    except LLMBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logging.error(f"Error generating meal suggestions with OpenAI: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate meal suggestions: {str(e)}")
+    if content:
+        response_cache.put(user_id, key, content)
+    return content
+
+@openai_router.post("/meal_suggestions/stream")
+async def stream_meal_suggestions(request: Request, daily_macro_goals: InventoryItemMacros,
+                                  user_id: str = Depends(get_user_id_from_token)):
+    """SSE variant of /meal_suggestions: forwards tokens as they are generated."""
+    check_api_key()
+    logging.info(f"Streaming OpenAI meal suggestions for user ID: {user_id}")
+    kwargs, _ = await run_in_threadpool(meal_suggestions_request, user_id, daily_macro_goals)
+    stream = await open_stream(user_id, kwargs)
+    return sse_response(stream_completion_events(request, stream), stream)
 
 @openai_router.post("/llm_chat")
-def llm_chat(request: LLMChatRequest):
+async def llm_chat(request: LLMChatRequest):
     """Send chat history to OpenAI and get a response."""
     check_api_key()
-    if not request.messages:
-        raise HTTPException(status_code=400, detail="No messages provided")
+    kwargs = llm_chat_request(request)
 
     try:
-        response = openai_client.chat.completions.create(
-            model=openai_model,
-            messages=[m.dict() for m in request.messages],
-            max_tokens=500
-        )
-        return {"response": response.choices[0].message.content}
+        return {"response": await complete(None, kwargs)}
+    except LLMBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logging.error(f"Error communicating with OpenAI: {e}")
         raise HTTPException(status_code=500, detail=f"Error communicating with OpenAI: {str(e)}")
+
+@openai_router.post("/llm_chat/stream")
+async def stream_llm_chat(chat: LLMChatRequest, request: Request):
+    """SSE variant of /llm_chat: forwards tokens as they are generated."""
+    check_api_key()
+    stream = await open_stream(None, llm_chat_request(chat))
+    return sse_response(stream_completion_events(request, stream), stream)
     
 @openai_router.post("/generate_image")
-def generate_image(request: dict, user_id: str = Depends(get_user_id_from_token)):
-    """Generate an image for a pantry item using OpenAI, store in S3, and persist the URL."""
+async def generate_image(request: dict, response: Response, user_id: str = Depends(get_user_id_from_token)):
+    """Generate an image for a pantry item using OpenAI, store in S3, and persist the URL.
+
+    If another worker is already generating the same image, answer 202 "pending"
+    right away; retrying after Retry-After serves the finished image from the cache.
+    """
     check_api_key()
     item_id = request.get("item_id")
-    items = read_pantry_items(user_id)
+    items = await run_in_threadpool(read_pantry_items, user_id)
     item = next((i for i in items if i.id == item_id), None)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
-    prompt = build_item_image_prompt(item.product_name)
     try:
-        # generate via OpenAI and upload to S3
-        response = openai_client.images.generate(prompt=prompt, n=1, size="256x256")
-        img_data = requests.get(response.data[0].url).content
-        public_url = _upload_image_to_s3(user_id, item_id, img_data)
-        # persist URL in DynamoDB
-        pk = f"USER#{user_id}"; sk = f"PANTRY#{item_id}"
-        pantry_table.update_item(
-            Key={"PK": pk, "SK": sk},
-            UpdateExpression="SET image_url = :url",
-            ExpressionAttributeValues={":url": public_url}
-        )
-        return {"url": public_url}
+        # The S3/Pillow image pipeline is blocking; it runs on a worker thread inside an LLM slot
+        async with llm.llm_slot(user_id):
+            variants = await run_in_threadpool(get_or_create_item_image, item.product_name, get_image_client(), 0)
+        await run_in_threadpool(set_pantry_item_image, user_id, item_id, variants["original"], variants)
+        return {"url": variants["original"], "variants": variants}
+    except ImagePending:
+        response.status_code = 202
+        response.headers["Retry-After"] = str(IMAGE_PENDING_RETRY_SECONDS)
+        return {"status": "pending"}
+    except LLMBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logging.error(f"Error generating image: {e}")
         raise HTTPException(status_code=500, detail="Image generation failed")
 
 
-@openai_router.post("/recipes/generate", response_model=RecipeResponse)
-def gen_recipe(req: RecipeRequest, user_id: str = Depends(get_user_id_from_token)):
-    """Generate a recipe from selected pantry items."""
-    check_api_key()
+def recipe_generation_request(user_id: str, req: RecipeRequest) -> Tuple[dict, str]:
+    """Build the chat completion arguments for a JSON recipe from the selected pantry items, plus their cache key."""
     items = read_pantry_items(user_id)
     id_map = {}
     for it in items:
-        if isinstance(it, dict):
-            id_map[it["id"]] = it
-        else:
-            id_map[it.id] = it.dict()
+        it = item_dict(it)
+        id_map[it["id"]] = it
     selected = []
     for item_id in req.itemIds:
         if item_id not in id_map:
@@ -188,41 +251,62 @@ def gen_recipe(req: RecipeRequest, user_id: str = Depends(get_user_id_from_token
         selected.append(id_map[item_id])
 
     prompt = build_recipe_prompt(selected, req.modifiers)
+    key = response_key("recipe", openai_model,
+                       items=canonical_items(selected, ("product_name", "quantity")), modifiers=req.modifiers)
+    return dict(
+        model=openai_model,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=800,
+    ), key
+
+@openai_router.post("/recipes/generate", response_model=RecipeResponse)
+async def gen_recipe(req: RecipeRequest, regenerate: bool = False, user_id: str = Depends(get_user_id_from_token)):
+    """Generate a recipe from selected pantry items.
+
+    The same items and modifiers return the cached recipe unless ``regenerate`` is set.
+    """
+    check_api_key()
+    kwargs, key = await run_in_threadpool(recipe_generation_request, user_id, req)
+    cached = cached_response(user_id, key, regenerate)
+    if cached is not None:
+        return {"recipe": cached}
     try:
-        raw = call_openai(prompt)
-        recipe = json.loads(raw)
+        raw = await complete(user_id, kwargs)
+    except LLMBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logging.error(f"LLM error: {e}")
         raise HTTPException(status_code=502, detail="Failed to parse LLM response")
+    # Tolerate code fences, trailing junk and truncation instead of failing the whole generation
+    recipe = parse_recipe_json(raw or "")
+    if recipe is None:
+        logging.error(f"LLM returned no usable recipe JSON: {raw!r:.200}")
+        raise HTTPException(status_code=502, detail="Failed to parse LLM response")
+    response_cache.put(user_id, key, recipe)
     return {"recipe": recipe}
 
-def enrich_image_job(payload: dict):
-    """Hydrate a single pantry item image: generate via OpenAI, upload to S3, and persist URL."""
+@openai_router.post("/recipes/generate/stream")
+async def stream_gen_recipe(req: RecipeRequest, request: Request, user_id: str = Depends(get_user_id_from_token)):
+    """SSE variant of /recipes/generate: emits title, ingredient and step events as they complete."""
     check_api_key()
-    user_id = payload.get("user_id")
-    item_id = payload.get("item_id")
-    item_name = payload.get("item_name")
-    prompt = build_item_image_prompt(item_name)
-    resp = openai_client.images.generate(prompt=prompt, n=1, size="256x256")
-    img_url = resp.data[0].url
-    img_data = requests.get(img_url).content
-    # Upload image
-    public_url = _upload_image_to_s3(user_id, item_id, img_data)
-    # Persist to DynamoDB
-    pk = f"USER#{user_id}"
-    sk = f"PANTRY#{item_id}"
-    pantry_table.update_item(
-        Key={"PK": pk, "SK": sk},
-        UpdateExpression="SET image_url = :url",
-        ExpressionAttributeValues={":url": public_url}
-    )
-    logging.info(f"Enriched image for item {item_id}")
+    kwargs, _ = await run_in_threadpool(recipe_generation_request, user_id, req)
+    stream = await open_stream(user_id, kwargs)
+    return sse_response(stream_recipe_events(request, stream), stream)
+
+def recipe_item_line(item) -> str:
+    return f"- {item['product_name']} ({item['quantity']})"
+
+def build_recipe_prompt(items, modifiers=None, token_budget=None) -> str:
+    """Build a structured recipe generation prompt.
 
-def build_recipe_prompt(items, modifiers=None) -> str:
-    """Build a structured recipe generation prompt."""
+    With ``token_budget`` only the most relevant items that fit are listed;
+    without it (explicitly selected items) every item is.
+    """
     prompt = ["Use these ingredients:"]
-    for it in items:
-        prompt.append(f"- {it['product_name']} ({it['quantity']})")
+    if token_budget:
+        prompt.extend(budget_item_lines(items, recipe_item_line, token_budget, model=openai_model))
+    else:
+        prompt.extend(recipe_item_line(it) for it in items)
 
     if modifiers:
         if getattr(modifiers, "servings", None):
@@ -243,17 +327,26 @@ def build_recipe_prompt(items, modifiers=None) -> str:
     )
     return "\n".join(prompt)
 
-def generate_meal_suggestion_prompt(items, daily_macro_goals):
-    """Generate a prompt for the OpenAI model to create meal suggestions based on pantry items and daily macro goals."""
+def meal_item_line(item) -> str:
+    line = f"- {item['product_name']}"
+    macros = compact_macros(item.get("macros"))
+    if macros:
+        line += f": {macros}"
+    if item.get("expiration_date"):
+        line += f" (exp {item['expiration_date'][:10]})"
+    return line
+
+def generate_meal_suggestion_prompt(items, daily_macro_goals, token_budget=PROMPT_ITEM_TOKEN_BUDGET):
+    """Generate a prompt for the OpenAI model to create meal suggestions based on pantry items and daily macro goals.
+
+    Items are ranked by expiry, macro fit and recency and listed until ``token_budget`` is spent.
+    """
     logging.info("Generating meal suggestion prompt for OpenAI model with macros")
-    item_details = ""
-    for item in items:
-        macros = item.get('macros', {})
-        macros_str = ", ".join(f"{key}: {value}" for key, value in macros.items() if value)
-        item_detail = f"- {item['product_name']}: {macros_str}"
-        item_details += item_detail + "\n"
+    lines = budget_item_lines(items, meal_item_line, token_budget, goals=daily_macro_goals, model=openai_model)
+    item_details = "".join(line + "\n" for line in lines)
     
     # Add current date and time in US Central Time to the prompt
+    import pytz
     central = pytz.timezone('US/Central')
     current_time = datetime.now(central).strftime("%Y-%m-%d %H:%M:%S")
     
@@ -264,7 +357,7 @@ def generate_meal_suggestion_prompt(items, daily_macro_goals):
         f"Daily Macro Goals:\n"
         f"Calories: {daily_macro_goals.calories}, Protein: {daily_macro_goals.protein}g, "
         f"Carbohydrates: {daily_macro_goals.carbohydrates}g, Fat: {daily_macro_goals.fat}g\n\n"
-        "Pantry Items:\n"
+        "Pantry Items (kcal=calories, P/C/F=protein/carbs/fat g, fib=fiber g, sug=sugar g):\n"
         f"{item_details}"
     )
     return prompt
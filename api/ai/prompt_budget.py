@@ -0,0 +1,164 @@
+import os
+import math
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Callable, List, Optional
+
+# ─── Prompt Budget ───────────────────────────────────────────────────────────────
+# Large pantries used to be dumped into prompts item by item. Items are now
+# ranked by relevance (expiring soon, macro fit to the user's goals, recently
+# added) and listed until PROMPT_ITEM_TOKEN_BUDGET is spent; the rest are
+# summarized as a count. Tokens are counted with tiktoken when it is installed
+# and its encoding is available locally, otherwise with a character heuristic.
+
+PROMPT_ITEM_TOKEN_BUDGET = int(os.getenv("PROMPT_ITEM_TOKEN_BUDGET", "1200"))
+EXPIRY_HORIZON_DAYS = 14       # items expiring further out than this get no urgency boost
+RECENCY_HALF_LIFE_DAYS = 14
+SCORE_WEIGHTS = {"expiry": 0.5, "macro_fit": 0.3, "recency": 0.2}
+
+# Short labels for the macros worth showing the model, in display order
+MACRO_LABELS = (
+    ("calories", "kcal"),
+    ("protein", "P"),
+    ("carbohydrates", "C"),
+    ("fat", "F"),
+    ("fiber", "fib"),
+    ("sugar", "sug"),
+)
+
+
+@lru_cache()
+def _encoder(model: Optional[str]):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("cl100k_base")
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # tiktoken fetches encodings on first use; no network means heuristic counts
+        return None
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count the tokens in ``text``; exact with tiktoken, otherwise a slight overestimate."""
+    encoder = _encoder(model)
+    if encoder is not None:
+        return len(encoder.encode(text))
+    # ~4 characters per token for English; short words and numbers tokenize worse
+    return max(math.ceil(len(text) / 4), len(text.split()))
+
+
+def _number(value) -> str:
+    value = float(value)
+    return str(int(round(value))) if value >= 10 or value.is_integer() else f"{value:.1f}"
+
+
+def compact_macros(macros) -> str:
+    """Format macros as e.g. ``120kcal P4 C22 F1.5``, skipping empty values."""
+    if not macros:
+        return ""
+    if not isinstance(macros, dict):
+        macros = macros.dict()
+    parts = []
+    for key, label in MACRO_LABELS:
+        value = macros.get(key)
+        if not value:
+            continue
+        parts.append(f"{_number(value)}{label}" if label == "kcal" else f"{label}{_number(value)}")
+    return " ".join(parts)
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def expiry_score(item: dict, now: datetime) -> float:
+    """1.0 for items expiring today, falling to 0 at EXPIRY_HORIZON_DAYS; 0 once spoiled."""
+    expires = _parse_time(item.get("expiration_date"))
+    if expires is None:
+        return 0.0
+    days_left = (expires - now).total_seconds() / 86400
+    if days_left < -1:
+        return 0.0
+    return min(1.0, max(0.0, 1 - days_left / EXPIRY_HORIZON_DAYS))
+
+
+def recency_score(item: dict, now: datetime) -> float:
+    """Exponential decay on the item's age with a RECENCY_HALF_LIFE_DAYS half life."""
+    created = _parse_time(item.get("created_at"))
+    if created is None:
+        return 0.0
+    age_days = max(0.0, (now - created).total_seconds() / 86400)
+    return 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+
+
+def _energy_split(macros) -> Optional[tuple]:
+    if not macros:
+        return None
+    if not isinstance(macros, dict):
+        macros = macros.dict()
+    energy = (float(macros.get("protein") or 0) * 4,
+              float(macros.get("carbohydrates") or 0) * 4,
+              float(macros.get("fat") or 0) * 9)
+    total = sum(energy)
+    return tuple(e / total for e in energy) if total else None
+
+
+def macro_fit_score(item: dict, goals) -> float:
+    """How closely the item's protein/carb/fat energy split matches the goals (0..1)."""
+    return _fit(item, _energy_split(goals))
+
+
+def _fit(item: dict, target: Optional[tuple]) -> float:
+    if target is None:
+        return 0.0
+    actual = _energy_split(item.get("macros"))
+    if actual is None:
+        return 0.0
+    return 1 - 0.5 * sum(abs(a - t) for a, t in zip(actual, target))
+
+
+def rank_items(items: List[dict], goals=None, now: Optional[datetime] = None) -> List[dict]:
+    """Return ``items`` ordered most relevant first (ties broken by name)."""
+    now = now or datetime.now(timezone.utc)
+    target = _energy_split(goals)
+
+    def score(item):
+        return (SCORE_WEIGHTS["expiry"] * expiry_score(item, now)
+                + SCORE_WEIGHTS["macro_fit"] * _fit(item, target)
+                + SCORE_WEIGHTS["recency"] * recency_score(item, now))
+
+    return sorted(items, key=lambda item: (-score(item), item.get("product_name") or ""))
+
+
+def budget_item_lines(
+    items: List[dict],
+    format_line: Callable[[dict], str],
+    token_budget: int = PROMPT_ITEM_TOKEN_BUDGET,
+    goals=None,
+    model: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> List[str]:
+    """Format the most relevant items until ``token_budget`` is spent; note how many were left out."""
+    lines: List[str] = []
+    used = 0
+    ranked = rank_items(items, goals, now)
+    for index, item in enumerate(ranked):
+        line = format_line(item)
+        cost = count_tokens(line, model) + 1  # newline
+        if used + cost > token_budget:
+            lines.append(f"(+{len(ranked) - index} more items not listed)")
+            break
+        lines.append(line)
+        used += cost
+    return lines
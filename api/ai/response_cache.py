@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional
+from pydantic import BaseModel
+from metrics import register_collector, sample_lines
+
+# ─── LLM Response Cache ──────────────────────────────────────────────────────────
+# Recipe and meal generations are cached per user under a hash of the prompt
+# inputs (items, modifiers, goals, model), so tapping "generate" again with an
+# unchanged selection returns the previous answer instead of a new completion.
+# Entries expire after RESPONSE_CACHE_TTL_SECONDS; each user keeps at most
+# RESPONSE_CACHE_PER_USER entries. Routes accept ``regenerate=true`` to bypass it.
+
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "1800"))
+RESPONSE_CACHE_PER_USER = int(os.getenv("RESPONSE_CACHE_PER_USER", "16"))
+RESPONSE_CACHE_MAX_USERS = int(os.getenv("RESPONSE_CACHE_MAX_USERS", "1024"))
+
+
+def _canonical(value):
+    if isinstance(value, Decimal):
+        # 1, 1.0 and 1.00 hash the same
+        return format(value.normalize(), "f")
+    if isinstance(value, BaseModel):
+        return value.dict(exclude_none=True)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Cannot hash {type(value).__name__} into a cache key")
+
+
+def canonical_items(items: Iterable[dict], fields: Iterable[str]) -> list:
+    """Reduce pantry items to the ``fields`` a prompt uses, in a stable order."""
+    fields = tuple(fields)
+    reduced = []
+    for item in items:
+        entry = {field: item.get(field) for field in fields}
+        if isinstance(entry.get("product_name"), str):
+            entry["product_name"] = " ".join(entry["product_name"].lower().split())
+        reduced.append(entry)
+    return sorted(reduced, key=lambda e: json.dumps(e, sort_keys=True, default=_canonical))
+
+
+def response_key(kind: str, model: str, **inputs: Any) -> str:
+    """Hash the inputs of one prompt; equal inputs give equal keys regardless of dict order."""
+    payload = json.dumps({"kind": kind, "model": model, "inputs": inputs},
+                         sort_keys=True, separators=(",", ":"), default=_canonical)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """Per-user LRU of generated responses with a TTL, plus hit/miss counters."""
+
+    def __init__(self, ttl_seconds: int = RESPONSE_CACHE_TTL_SECONDS,
+                 per_user: int = RESPONSE_CACHE_PER_USER, max_users: int = RESPONSE_CACHE_MAX_USERS):
+        self.ttl_seconds = ttl_seconds
+        self.per_user = per_user
+        self.max_users = max_users
+        self._users: "OrderedDict[str, OrderedDict[str, tuple]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+
+    def get(self, user_id: str, key: str) -> Optional[Any]:
+        entries = self._users.get(user_id)
+        entry = entries.get(key) if entries else None
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del entries[key]
+            self.misses += 1
+            return None
+        entries.move_to_end(key)
+        self._users.move_to_end(user_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, user_id: str, key: str, value: Any) -> None:
+        entries = self._users.setdefault(user_id, OrderedDict())
+        entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        entries.move_to_end(key)
+        self._users.move_to_end(user_id)
+        while len(entries) > self.per_user:
+            entries.popitem(last=False)
+            self.evictions += 1
+        while len(self._users) > self.max_users:
+            _, dropped = self._users.popitem(last=False)
+            self.evictions += len(dropped)
+
+    def bypass(self) -> None:
+        """Count a request that skipped the cache (``regenerate=true``)."""
+        self.bypassed += 1
+
+    def invalidate(self, user_id: str) -> None:
+        self._users.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._users.clear()
+        self.hits = self.misses = self.bypassed = self.evictions = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "users": len(self._users),
+            "entries": sum(len(entries) for entries in self._users.values()),
+        }
+
+
+response_cache = ResponseCache()
+
+
+def response_cache_stats() -> Dict[str, Any]:
+    """Return a snapshot of response cache counters, including the hit ratio."""
+    return response_cache.snapshot()
+
+
+@register_collector("response_cache")
+def response_cache_metrics():
+    snap = response_cache.snapshot()
+    return (
+        sample_lines("response_cache_lookups_total", "AI response cache lookups by result.",
+                     [({"result": r}, snap[k]) for r, k in (("hit", "hits"), ("miss", "misses"), ("bypass", "bypassed"))],
+                     kind="counter")
+        + sample_lines("response_cache_evictions_total", "Entries evicted by the size caps.",
+                       [({}, snap["evictions"])], kind="counter")
+        + sample_lines("response_cache_entries", "Cached AI responses.", [({}, snap["entries"])])
+    )
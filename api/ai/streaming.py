@@ -0,0 +1,116 @@
+import json
+import logging
+from typing import AsyncIterator, Optional
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+from ai.json_stream import RecipeStreamParser
+
+# ─── Server-Sent Events ──────────────────────────────────────────────────────────
+# Chat completions are requested with stream=True and each delta is forwarded as
+# an SSE "token" event as soon as it arrives. When the client goes away the
+# upstream stream is closed so OpenAI stops generating (and billing) tokens.
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # keep reverse proxies from buffering the stream
+}
+
+
+def sse_event(data, event: Optional[str] = None) -> str:
+    """Format one SSE frame; ``data`` is JSON encoded."""
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(data)}\n\n"
+
+
+def delta_text(chunk) -> str:
+    """Return the text carried by a streamed chat completion chunk ('' for role/finish chunks)."""
+    if not chunk.choices:
+        return ""
+    return chunk.choices[0].delta.content or ""
+
+
+class ClientDisconnected(Exception):
+    """The SSE client went away; the stream should end without a final event."""
+
+
+async def _completion_deltas(request: Request, stream) -> AsyncIterator[str]:
+    """Yield the text of each streamed chunk; stop (and close upstream) once the client is gone."""
+    try:
+        async for chunk in stream:
+            if await request.is_disconnected():
+                logging.info("Client disconnected; cancelling OpenAI stream")
+                raise ClientDisconnected()
+            text = delta_text(chunk)
+            if text:
+                yield text
+    finally:
+        await stream.close()
+
+
+async def stream_completion_events(request: Request, stream) -> AsyncIterator[str]:
+    """Forward an async OpenAI chat completion stream as SSE frames until done or disconnected.
+
+    Emits ``token`` events with ``{"delta": ...}``, then a ``done`` event with
+    the full text, or an ``error`` event if the upstream call fails midway.
+    """
+    parts = []
+    try:
+        async for text in _completion_deltas(request, stream):
+            parts.append(text)
+            yield sse_event({"delta": text}, event="token")
+    except ClientDisconnected:
+        return
+    except Exception as e:
+        logging.error(f"OpenAI stream failed: {e}")
+        yield sse_event({"detail": str(e)}, event="error")
+        return
+    yield sse_event({"content": "".join(parts)}, event="done")
+
+
+async def stream_recipe_events(request: Request, stream) -> AsyncIterator[str]:
+    """Stream a JSON recipe completion as ``title``/``ingredient``/``step`` SSE events.
+
+    Ends with a ``recipe`` event carrying the finalized (repaired if needed)
+    document, or an ``error`` event if nothing usable was generated.
+    """
+    parser = RecipeStreamParser()
+    try:
+        async for text in _completion_deltas(request, stream):
+            for event, value in parser.feed(text):
+                yield sse_event(value, event=event)
+    except ClientDisconnected:
+        return
+    except Exception as e:
+        # Keep whatever arrived before the failure
+        logging.error(f"OpenAI recipe stream failed: {e}")
+    recipe = parser.finalize()
+    if recipe is None:
+        yield sse_event({"detail": "Failed to parse LLM response"}, event="error")
+    else:
+        yield sse_event({"recipe": recipe}, event="recipe")
+
+
+class UpstreamStreamingResponse(StreamingResponse):
+    """StreamingResponse that closes ``upstream`` however the response ends.
+
+    The event generator's own cleanup only runs once Starlette starts iterating
+    it; a client that disconnects before that (or a failed send) would otherwise
+    leave the upstream stream, and the LLM slot it holds, open.
+    """
+
+    def __init__(self, content, upstream, **kwargs):
+        super().__init__(content, **kwargs)
+        self.upstream = upstream
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.upstream.close()
+
+
+def sse_response(events: AsyncIterator[str], upstream=None) -> StreamingResponse:
+    """SSE response for ``events``; ``upstream`` (closed once the response ends) is the stream they read."""
+    if upstream is None:
+        return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
+    return UpstreamStreamingResponse(events, upstream, media_type="text/event-stream", headers=SSE_HEADERS)
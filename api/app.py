@@ -1,25 +1,26 @@
 import logging
-import json
-import os
-import asyncio
-import boto3
 from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum  # AWS Lambda adapter for FastAPI
 from pantry.pantry_service import pantry_router, get_roi_metrics
 from cookbook.cookbook_service import cookbook_router
-from ai.openai_service import enrich_image_job  # helper for image hydration
-from macros.macro_service import macro_router, enrich_item, enrich_recipe
+from macros.macro_service import macro_router
 from auth.auth_service import auth_router
 from ai.openai_service import openai_router
 from chat.chat_service import chat_router
+from sync.sync_service import sync_router
+from worker import is_sqs_event, process_records
+from warmup import is_warmup_event, run_warmup_hooks
+from serialization import FastJSONResponse
+from metrics import MetricsMiddleware, metrics_authorized, render_metrics
 from dotenv import load_dotenv
 
 load_dotenv()
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Allow all origins, methods, and headers for simplicity
 app.add_middleware(
@@ -29,6 +30,8 @@ app.add_middleware(
     allow_methods=["*"],  # Adjust this to your specific needs
     allow_headers=["*"],  # Adjust this to your specific needs
 )
+# Outermost, so time spent in the other middleware is included
+app.add_middleware(MetricsMiddleware)
 
 # Add your routers to the main app
 app.include_router(pantry_router, tags=["Pantry"])
@@ -37,6 +40,7 @@ app.include_router(macro_router, tags=["Macros"])
 app.include_router(auth_router, tags=["Auth"])
 app.include_router(openai_router, tags=["OpenAI"])
 app.include_router(chat_router, tags=["Chats"])
+app.include_router(sync_router, tags=["Sync"])
 
 # Add new routes
 app.add_api_route("/roi/metrics", get_roi_metrics, methods=["GET"], tags=["ROI"])
@@ -45,35 +49,28 @@ app.add_api_route("/roi/metrics", get_roi_metrics, methods=["GET"], tags=["ROI"]
 def root():
     return {"message": "Welcome to Pantry Pal API"}
 
-# SQS setup for background hydration jobs
-MACRO_QUEUE_URL = os.getenv("MACRO_QUEUE_URL")
-sqs = boto3.client("sqs")
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics(request: Request):
+    """Prometheus text exposition of this instance's request and dependency metrics (METRICS_TOKEN required)."""
+    if not metrics_authorized(request.headers.get("authorization")):
+        # Not found rather than 401: don't advertise the route on the public API
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 handler_api = Mangum(app)
 
 # Lambda handler
 def lambda_handler(event, context):
     """
-    Handle both SQS and API Gateway events.
+    Handle SQS, scheduled warm-up and API Gateway events.
     """
-    # Handle SQS events
-    if event.get("Records") and event["Records"][0].get("eventSource") == "aws:sqs":
-        for rec in event["Records"]:
-            msg = json.loads(rec["body"])
-            logging.info(f"Received hydration message: {msg}")
-            job = msg.get("jobType", "ITEM")
-            payload = msg.get("payload", {})
-            if job == "ITEM":
-                logging.info(f"Hydrating macros ITEM job: {payload}")
-                enrich_item(payload)
-            elif job == "RECIPE":
-                logging.info(f"Hydrating macros RECIPE job: {payload}")
-                enrich_recipe(payload)
-            elif job == "IMAGE":
-                logging.info(f"Hydrating image IMAGE job: {payload}")
-                enrich_image_job(payload)
-            else:
-                logging.warning(f"Unknown hydration job type: {job} with payload {payload}")
-        return {"status": "hydration jobs processed"}
+    # Scheduled warm-up: run pre-init hooks so user requests skip first-use costs
+    if is_warmup_event(event):
+        return {"status": "warm", "hooks": run_warmup_hooks()}
+
+    # Handle SQS events (the dedicated worker entry point is worker.lambda_handler)
+    if is_sqs_event(event):
+        return process_records(event["Records"])
 
     # Handle API Gateway events
     return handler_api(event, context)
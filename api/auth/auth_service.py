@@ -1,21 +1,21 @@
 import os
 from dotenv import load_dotenv
 load_dotenv()
-import boto3
 import logging
 from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import BaseModel
-import httpx
 from jose import jwt, JWTError
-from functools import lru_cache
+from auth.claims_cache import claims_cache
+from auth.cognito import cognito_call, cognito_stats, load_cognito_client
+from auth.jwks import COGNITO_JWKS_FILE, JwksProvider
+from auth.refresh import refresh_deduper
+from warmup import register_warmup_hook
 
-# Initialize AWS Cognito client
+# Cognito settings; calls go through auth.cognito so they never block the event loop
 region = os.getenv('AWS_REGION', 'us-east-1')
 user_pool_id = os.getenv('COGNITO_USER_POOL_ID')
 client_id = os.getenv('COGNITO_USER_POOL_CLIENT_ID')
 
-cognito_client = boto3.client('cognito-idp', region_name=region)
-
 auth_router = APIRouter(prefix="/auth")
 
 # Pydantic models for request payloads
@@ -46,8 +46,10 @@ class ResetPasswordModel(BaseModel):
 # Endpoint to register a new user
 @auth_router.post('/register')
 async def register_user(model: RegisterModel):
+    cognito_client = await load_cognito_client()
     try:
-        cognito_client.sign_up(
+        await cognito_call(
+            'sign_up',
             ClientId=client_id,
             Username=model.username,
             Password=model.password,
@@ -71,8 +73,10 @@ async def register_user(model: RegisterModel):
 # Endpoint to confirm user registration
 @auth_router.post('/confirm')
 async def confirm_user(model: ConfirmModel):
+    cognito_client = await load_cognito_client()
     try:
-        cognito_client.confirm_sign_up(
+        await cognito_call(
+            'confirm_sign_up',
             ClientId=client_id,
             Username=model.username,
             ConfirmationCode=model.confirmation_code
@@ -89,12 +93,14 @@ async def confirm_user(model: ConfirmModel):
 # Endpoint to log in and obtain JWT tokens
 @auth_router.post('/login')
 async def login_user(model: LoginModel):
+    cognito_client = await load_cognito_client()
     try:
         logging.info(f"Login attempt for username: {model.username}")
         logging.info(f"Using client_id: {client_id}")
         logging.info(f"Using user_pool_id: {user_pool_id}")
         
-        resp = cognito_client.initiate_auth(
+        resp = await cognito_call(
+            'initiate_auth',
             ClientId=client_id,
             AuthFlow='USER_PASSWORD_AUTH',
             AuthParameters={'USERNAME': model.username, 'PASSWORD': model.password}
@@ -181,12 +187,49 @@ async def login_user(model: LoginModel):
         logging.error(f"Error details: {getattr(e, 'response', {})}")
         raise HTTPException(status_code=500, detail='Login failed due to server error')
 
+# Endpoint to exchange a refresh token for new ID/access tokens
+@auth_router.post('/refresh')
+async def refresh_tokens(model: RefreshModel):
+    cognito_client = await load_cognito_client()
+
+    async def refresh():
+        resp = await cognito_call(
+            'initiate_auth',
+            ClientId=client_id,
+            AuthFlow='REFRESH_TOKEN_AUTH',
+            AuthParameters={'REFRESH_TOKEN': model.refresh_token}
+        )
+        return resp.get('AuthenticationResult', {})
+
+    try:
+        # Concurrent refreshes of the same token share one Cognito call
+        auth_result = await refresh_deduper.run(model.refresh_token, refresh)
+    except cognito_client.exceptions.NotAuthorizedException:
+        raise HTTPException(status_code=401, detail='Refresh token is invalid or expired')
+    except cognito_client.exceptions.TooManyRequestsException:
+        raise HTTPException(status_code=429, detail='Too many refresh attempts. Please wait and try again later.')
+    except Exception as e:
+        logging.error(f"Unexpected error during token refresh: {type(e).__name__}: {e}")
+        raise HTTPException(status_code=500, detail='Token refresh failed due to server error')
+
+    if not auth_result.get('IdToken'):
+        logging.error("No IdToken received from Cognito refresh")
+        raise HTTPException(status_code=500, detail='No ID token received from authentication service')
+    return {
+        'access_token': auth_result.get('AccessToken'),
+        'id_token': auth_result.get('IdToken'),
+        # Cognito only returns a refresh token here when rotation is enabled
+        'refresh_token': auth_result.get('RefreshToken') or model.refresh_token
+    }
+
 # Endpoint to initiate password reset
 @auth_router.post('/forgot-password')
 async def forgot_password(model: ForgotPasswordModel):
+    cognito_client = await load_cognito_client()
     try:
         logging.info(f"Password reset request for username: {model.username}")
-        cognito_client.forgot_password(
+        await cognito_call(
+            'forgot_password',
             ClientId=client_id,
             Username=model.username
         )
@@ -205,9 +248,11 @@ async def forgot_password(model: ForgotPasswordModel):
 # Endpoint to confirm password reset
 @auth_router.post('/reset-password')
 async def reset_password(model: ResetPasswordModel):
+    cognito_client = await load_cognito_client()
     try:
         logging.info(f"Password reset confirmation for username: {model.username}")
-        cognito_client.confirm_forgot_password(
+        await cognito_call(
+            'confirm_forgot_password',
             ClientId=client_id,
             Username=model.username,
             ConfirmationCode=model.confirmation_code,
@@ -228,16 +273,16 @@ async def reset_password(model: ResetPasswordModel):
         logging.error(f"Error during password reset confirmation for {model.username}: {e}")
         raise HTTPException(status_code=500, detail='Password reset confirmation failed')
 
-# Fetch and cache JWKS for manual JWT verification
+# Signing keys for manual JWT verification, fetched and refreshed without blocking requests
 COGNITO_REGION = os.getenv('COGNITO_REGION', os.getenv('AWS_REGION', 'us-east-1'))
 COGNITO_USER_POOL_ID = os.getenv('COGNITO_USER_POOL_ID')
 COGNITO_JWKS_URL = f"https://cognito-idp.{COGNITO_REGION}.amazonaws.com/{user_pool_id}/.well-known/jwks.json"
 
-@lru_cache()
-def get_cognito_jwks():
-    resp = httpx.get(COGNITO_JWKS_URL)
-    resp.raise_for_status()
-    return resp.json()
+jwks_provider = JwksProvider(COGNITO_JWKS_URL, COGNITO_JWKS_FILE)
+
+@register_warmup_hook("cognito_jwks")
+def load_cognito_jwks():
+    jwks_provider.load()
 
 async def get_current_user(request: Request):
     # Parse and verify JWT from Authorization header
@@ -245,11 +290,13 @@ async def get_current_user(request: Request):
     if not auth_header or not auth_header.startswith('Bearer '):
         raise HTTPException(status_code=401, detail='Missing or invalid Authorization header')
     token = auth_header.split(' ', 1)[1]
-    jwks = get_cognito_jwks()
+    # A token verified earlier is trusted until its own exp
+    claims = claims_cache.get(token)
+    if claims is not None:
+        return claims
     try:
         unverified_header = jwt.get_unverified_header(token)
-        kid = unverified_header.get('kid')
-        key = next((k for k in jwks['keys'] if k['kid'] == kid), None)
+        key = await jwks_provider.get_key(unverified_header.get('kid'))
         if not key:
             raise HTTPException(status_code=401, detail='Public key not found in JWKS')
         claims = jwt.decode(
@@ -259,10 +306,11 @@ async def get_current_user(request: Request):
             audience=client_id,
             issuer=f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}"
         )
-        return claims
     except JWTError as e:
         logging.error(f"JWT verification failed: {e}")
         raise HTTPException(status_code=401, detail='Invalid token')
+    claims_cache.put(token, claims)
+    return claims
 
 # Alias for backward compatibility/tests
 get_user = get_current_user
@@ -281,7 +329,9 @@ async def health_check():
         'status': 'healthy',
         'service': 'auth',
         'cognito_configured': bool(client_id and user_pool_id),
-        'region': region
+        'region': region,
+        'cognito_calls': cognito_stats(),
+        'refresh_dedupe': refresh_deduper.snapshot()
     }
 
 # Add environment validation
@@ -0,0 +1,66 @@
+import os
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# ─── Verified Claims Cache ───────────────────────────────────────────────────────
+# Clients send the same ID token on every request until it expires, so the
+# claims of a successfully verified token are kept (keyed by a SHA-256 of the
+# token, never the token itself) until the token's own ``exp``. Signing keys are
+# parsed once per kid instead of on every verification.
+
+AUTH_CLAIMS_CACHE_SIZE = int(os.getenv("AUTH_CLAIMS_CACHE_SIZE", "4096"))
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+class VerifiedClaimsCache:
+    """Bounded LRU from token digest to verified claims, each entry expiring at the token's exp."""
+
+    def __init__(self, max_entries: int = AUTH_CLAIMS_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        digest = token_digest(token)
+        entry = self._entries.get(digest)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                del self._entries[digest]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, token: str, claims: dict) -> None:
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)) or exp <= time.time():
+            return
+        digest = token_digest(token)
+        self._entries[digest] = (exp, claims)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def parse_jwks(jwks: dict) -> Dict[str, object]:
+    """Build a jose Key object for every RS256 key in a JWKS, indexed by kid."""
+    from jose import jwk
+
+    return {key["kid"]: jwk.construct(key, key.get("alg", "RS256")) for key in jwks.get("keys", []) if "kid" in key}
+
+
+claims_cache = VerifiedClaimsCache()
@@ -0,0 +1,108 @@
+import os
+import time
+import asyncio
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from storage.clients import get_client
+from warmup import register_warmup_hook
+from metrics import percentiles, register_collector, window_lines
+
+# ─── Cognito Calls ───────────────────────────────────────────────────────────────
+# boto3's Cognito client is blocking, and the auth routes are async def. Every
+# call therefore runs on a small dedicated pool (COGNITO_MAX_WORKERS), so a slow
+# Cognito response during a login burst ties up a pool thread instead of the
+# event loop, and can't exhaust the thread pool pantry routes run on. Queue
+# wait and call latency are recorded per operation.
+
+COGNITO_REGION = os.getenv('AWS_REGION', 'us-east-1')
+COGNITO_MAX_WORKERS = int(os.getenv("COGNITO_MAX_WORKERS", "8"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_client_ready = False
+
+
+@register_warmup_hook("cognito_client")
+def get_cognito_client():
+    """Return the shared Cognito client, created on the first auth call rather than at import."""
+    return get_client('cognito-idp', region_name=COGNITO_REGION)
+
+
+def get_cognito_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=COGNITO_MAX_WORKERS, thread_name_prefix="cognito")
+    return _executor
+
+
+class CognitoStats:
+    """Per-operation call counts and rolling queue/call latency windows (ms)."""
+
+    def __init__(self, window: int = 500):
+        self.calls = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.queue_ms = defaultdict(lambda: deque(maxlen=window))
+        self.call_ms = defaultdict(lambda: deque(maxlen=window))
+
+    def snapshot(self) -> dict:
+        return {
+            operation: {
+                "calls": self.calls[operation],
+                "errors": self.errors[operation],
+                "queue_ms": percentiles(self.queue_ms[operation]),
+                "call_ms": percentiles(self.call_ms[operation]),
+            }
+            for operation in sorted(self.calls)
+        }
+
+
+stats = CognitoStats()
+
+
+async def load_cognito_client():
+    """Return the Cognito client; the first call builds it on the pool (loading the model blocks)."""
+    global _client_ready
+    if not _client_ready:
+        await asyncio.get_running_loop().run_in_executor(get_cognito_executor(), get_cognito_client)
+        _client_ready = True
+    return get_cognito_client()
+
+
+async def cognito_call(operation: str, **kwargs):
+    """Run ``cognito_client.<operation>(**kwargs)`` on the Cognito pool; exceptions propagate unchanged."""
+    method = getattr(await load_cognito_client(), operation)
+    submitted = time.perf_counter()
+    started = None
+
+    def run():
+        nonlocal started
+        started = time.perf_counter()
+        return method(**kwargs)
+
+    stats.calls[operation] += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(get_cognito_executor(), run)
+    except Exception:
+        stats.errors[operation] += 1
+        raise
+    finally:
+        finished = time.perf_counter()
+        if started is not None:
+            stats.queue_ms[operation].append((started - submitted) * 1000)
+            stats.call_ms[operation].append((finished - started) * 1000)
+
+
+def cognito_stats() -> dict:
+    """Return a snapshot of Cognito call latency stats, by operation."""
+    return stats.snapshot()
+
+
+@register_collector("cognito")
+def cognito_metrics():
+    # Call latency is in dependency_call_duration_seconds; only the pool wait is Cognito-specific
+    return window_lines("cognito_pool_queue_wait_seconds", "Wait for a Cognito pool thread.",
+                        [({"operation": op}, list(stats.queue_ms[op])) for op in sorted(stats.calls)])
@@ -0,0 +1,110 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from typing import Dict, Optional
+import httpx
+from auth.claims_cache import parse_jwks
+from metrics import dependency_span
+
+# ─── JWKS Provider ───────────────────────────────────────────────────────────────
+# Signing keys are fetched with an async client and never on a blocking call in
+# the request path. Keys older than COGNITO_JWKS_REFRESH_SECONDS keep being
+# served while a background task refetches them (stale-while-revalidate), and a
+# token signed with an unknown kid (key rotation) triggers one refetch, at most
+# every COGNITO_JWKS_MIN_REFETCH_SECONDS after the last successful one. A failed
+# fetch is only retried after COGNITO_JWKS_RETRY_SECONDS, so a cold container
+# recovers from a transient error on the next request instead of a minute later.
+# COGNITO_JWKS_FILE preloads a JWKS from disk for offline testing; with it set
+# the network is never used.
+
+COGNITO_JWKS_FILE = os.getenv("COGNITO_JWKS_FILE")
+JWKS_REFRESH_SECONDS = int(os.getenv("COGNITO_JWKS_REFRESH_SECONDS", "3600"))
+JWKS_MIN_REFETCH_SECONDS = int(os.getenv("COGNITO_JWKS_MIN_REFETCH_SECONDS", "60"))
+JWKS_RETRY_SECONDS = float(os.getenv("COGNITO_JWKS_RETRY_SECONDS", "1"))
+JWKS_FETCH_TIMEOUT = httpx.Timeout(5.0, connect=2.0)
+
+
+class JwksProvider:
+    """Parsed signing keys by kid, refreshed in the background."""
+
+    def __init__(self, url: str, path: Optional[str] = None):
+        self.url = url
+        self.path = path
+        self.keys: Dict[str, object] = {}
+        self.fetched_at: Optional[float] = None
+        self.last_success: Optional[float] = None
+        self.last_failure: Optional[float] = None
+        self.fetches = 0
+        self._refresh: Optional[asyncio.Task] = None
+        if path:
+            with open(path) as f:
+                self.install(json.load(f))
+
+    def install(self, jwks: dict) -> None:
+        """Replace the key set (parsed once here, not per verification)."""
+        self.keys = parse_jwks(jwks)
+        self.fetched_at = time.monotonic()
+
+    @property
+    def stale(self) -> bool:
+        return self.fetched_at is None or time.monotonic() - self.fetched_at > JWKS_REFRESH_SECONDS
+
+    def _may_refetch(self) -> bool:
+        now = time.monotonic()
+        if self.last_failure is not None and now - self.last_failure < JWKS_RETRY_SECONDS:
+            return False
+        if not self.keys or self.last_success is None:
+            # Nothing to verify with yet; the anti-abuse limit doesn't apply
+            return True
+        return now - self.last_success >= JWKS_MIN_REFETCH_SECONDS
+
+    async def get_key(self, kid: Optional[str]):
+        """Return the key for ``kid``; None if it is still unknown after an allowed refetch."""
+        key = self.keys.get(kid)
+        if key is not None:
+            if self.stale and not self.path and self._may_refetch():
+                self._start_refresh()
+            return key
+        if self.path or not self._may_refetch():
+            # Don't let tokens with made-up kids hammer the JWKS endpoint
+            return None
+        await asyncio.shield(self._start_refresh())
+        return self.keys.get(kid)
+
+    def _start_refresh(self) -> asyncio.Task:
+        """Start a refetch, or join the one already running on this loop."""
+        loop = asyncio.get_running_loop()
+        if self._refresh is None or self._refresh.done() or self._refresh.get_loop() is not loop:
+            self._refresh = loop.create_task(self._fetch())
+        return self._refresh
+
+    async def _fetch(self) -> None:
+        self.fetches += 1
+        try:
+            async with httpx.AsyncClient(timeout=JWKS_FETCH_TIMEOUT) as client:
+                with dependency_span("cognito-jwks", "fetch"):
+                    resp = await client.get(self.url)
+                resp.raise_for_status()
+                self.install(resp.json())
+            self.last_success = time.monotonic()
+        except Exception as e:
+            # Keep serving the keys we have; the next stale read or kid miss retries
+            self.last_failure = time.monotonic()
+            logging.error(f"JWKS refresh from {self.url} failed: {e}")
+
+    def load(self) -> None:
+        """Blocking fetch for the scheduled warm-up, which runs outside any request."""
+        if self.path:
+            return
+        self.fetches += 1
+        try:
+            with dependency_span("cognito-jwks", "fetch"):
+                resp = httpx.get(self.url, timeout=JWKS_FETCH_TIMEOUT)
+            resp.raise_for_status()
+            self.install(resp.json())
+        except Exception:
+            self.last_failure = time.monotonic()
+            raise
+        self.last_success = time.monotonic()
@@ -0,0 +1,69 @@
+import os
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+from auth.claims_cache import token_digest
+
+# ─── Refresh Dedupe ──────────────────────────────────────────────────────────────
+# Apps tend to refresh from several places at once when a token expires (every
+# in-flight request sees the 401). Concurrent refreshes of the same refresh token
+# share one Cognito call, and its result is reused for AUTH_REFRESH_CACHE_SECONDS
+# so a burst right after it doesn't go upstream either. Failures are not cached.
+
+AUTH_REFRESH_CACHE_SECONDS = int(os.getenv("AUTH_REFRESH_CACHE_SECONDS", "30"))
+AUTH_REFRESH_CACHE_SIZE = int(os.getenv("AUTH_REFRESH_CACHE_SIZE", "1024"))
+
+
+class RefreshDeduper:
+    """Coalesce refreshes per refresh token (keyed by digest) and briefly cache the result."""
+
+    def __init__(self, ttl_seconds: int = AUTH_REFRESH_CACHE_SECONDS, max_entries: int = AUTH_REFRESH_CACHE_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._results: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._inflight: Dict[bytes, asyncio.Task] = {}
+        self.upstream = 0
+        self.joined = 0
+        self.cached = 0
+
+    def _cached(self, digest: bytes) -> Optional[dict]:
+        entry = self._results.get(digest)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._results[digest]
+            return None
+        return entry[1]
+
+    async def run(self, refresh_token: str, refresh: Callable[[], Awaitable[dict]]) -> dict:
+        """Return ``await refresh()``, shared with concurrent and very recent callers for the same token."""
+        digest = token_digest(refresh_token)
+        result = self._cached(digest)
+        if result is not None:
+            self.cached += 1
+            return result
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(digest)
+        if task is not None and task.get_loop() is loop and not task.done():
+            self.joined += 1
+            return await asyncio.shield(task)
+        task = loop.create_task(refresh())
+        self._inflight[digest] = task
+        self.upstream += 1
+        try:
+            # One caller going away must not cancel the refresh for the others
+            result = await asyncio.shield(task)
+        finally:
+            if self._inflight.get(digest) is task:
+                del self._inflight[digest]
+        self._results[digest] = (time.monotonic() + self.ttl_seconds, result)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+        return result
+
+    def snapshot(self) -> dict:
+        return {"upstream": self.upstream, "joined": self.joined, "cached": self.cached}
+
+
+refresh_deduper = RefreshDeduper()
@@ -1,15 +1,81 @@
-from fastapi import APIRouter, Depends
+import asyncio
+import logging
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from auth.auth_service import get_user_id_from_token
-from models.models import ChatMeta
-from storage.utils import read_chat_meta, upsert_chat_meta
+from models.models import ChatHistory, ChatMeta, ChatTurnRequest
+from storage.utils import read_chat_history, read_chat_meta, upsert_chat_meta, write_chat_history
+from storage import async_utils as async_storage
+from storage.async_utils import storage_call
+from ai.client import openai_model
+from ai.llm import LLMBusy
+from ai.openai_service import check_api_key, complete
+from etags import not_modified
+from chat.memory import apply_turn, messages_to_fold, new_chat, reply_request, summary_request
 
 chat_router = APIRouter(prefix="/chats")
 
 @chat_router.get("/", response_model=list[ChatMeta])
-def list_chats(user_id: str = Depends(get_user_id_from_token)):
-    return read_chat_meta(user_id)
+async def list_chats(request: Request, response: Response, user_id: str = Depends(get_user_id_from_token)):
+    unchanged = await not_modified(request, response, "chats", user_id)
+    if unchanged is not None:
+        return unchanged
+    return await storage_call(read_chat_meta, async_storage.read_chat_meta, user_id)
 
 @chat_router.post("/", status_code=204)
 def save_chat(meta: ChatMeta, user_id: str = Depends(get_user_id_from_token)):
     upsert_chat_meta(user_id, meta)
     return None
+
+@chat_router.get("/{chat_id}", response_model=ChatHistory)
+async def get_chat(chat_id: str, user_id: str = Depends(get_user_id_from_token)):
+    """Return a stored chat: its recent message window and the summary of older turns."""
+    history = await storage_call(read_chat_history, async_storage.read_chat_history, user_id, chat_id)
+    if history is None:
+        raise HTTPException(status_code=404, detail="Chat not found")
+    return history
+
+async def _summarize(user_id: str, history: ChatHistory, folded) -> Optional[str]:
+    try:
+        return await complete(user_id, summary_request(history.summary, folded, openai_model))
+    except Exception as e:
+        # Keep the old messages in the window and retry folding on a later turn
+        logging.warning(f"Chat summary failed for {history.id}: {e}")
+        return None
+
+@chat_router.post("/{chat_id}/messages")
+async def send_message(chat_id: str, turn: ChatTurnRequest, user_id: str = Depends(get_user_id_from_token)):
+    """Add one user message to a server-side chat and return the assistant's reply.
+
+    Only the new message is sent; the server supplies the recent window and the
+    summary of older turns, creating the chat on its first message.
+    """
+    check_api_key()
+    if not turn.content.strip():
+        raise HTTPException(status_code=400, detail="Message is empty")
+    history = await storage_call(read_chat_history, async_storage.read_chat_history, user_id, chat_id)
+    history = history or new_chat(chat_id, turn.title, turn.content)
+
+    folded = messages_to_fold(history)
+    # The summary runs alongside the reply; it is pointless once the reply fails
+    summary_task = asyncio.create_task(_summarize(user_id, history, folded)) if folded else None
+    try:
+        reply = await complete(user_id, reply_request(history, turn.content, openai_model))
+        summary = await summary_task if summary_task else None
+    except LLMBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error communicating with OpenAI: {e}")
+        raise HTTPException(status_code=500, detail=f"Error communicating with OpenAI: {str(e)}")
+    finally:
+        if summary_task and not summary_task.done():
+            summary_task.cancel()
+            # Let it unwind so its LLM slot is free before the error response goes out
+            await asyncio.wait([summary_task])
+
+    updated = apply_turn(history, turn.content, reply or "", folded, summary)
+    saved = await storage_call(write_chat_history, async_storage.write_chat_history,
+                               user_id, updated, history.history_rev)
+    if not saved:
+        raise HTTPException(status_code=409, detail="Chat was updated by another request; resend the message")
+    return {"response": reply, "length": updated.length}
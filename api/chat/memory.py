@@ -0,0 +1,83 @@
+import os
+from datetime import datetime, timezone
+from typing import List, Optional
+from models.models import ChatHistory, ChatMessage
+
+# ─── Chat Memory ─────────────────────────────────────────────────────────────────
+# Conversations live server-side on the CHAT# row. A prompt is the system
+# prompt, a running summary of older turns and a bounded window of recent
+# messages, so its size stays flat however long the chat gets. Once the window
+# overflows by CHAT_FOLD_BATCH messages, the oldest ones are folded into the
+# summary (in the same turn, concurrently with the reply) and dropped.
+
+CHAT_WINDOW_MESSAGES = int(os.getenv("CHAT_WINDOW_MESSAGES", "12"))
+CHAT_FOLD_BATCH = int(os.getenv("CHAT_FOLD_BATCH", "8"))
+CHAT_REPLY_MAX_TOKENS = int(os.getenv("CHAT_REPLY_MAX_TOKENS", "500"))
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "300"))
+CHAT_TITLE_CHARS = 60
+
+SYSTEM_PROMPT = "You are Pantry Pal, a helpful culinary and nutrition assistant."
+SUMMARY_PROMPT = (
+    "Maintain a concise running summary of a conversation between a user and a cooking assistant. "
+    "Keep facts that matter later (preferences, allergies, goals, ingredients on hand, decisions made). "
+    "Return only the updated summary."
+)
+
+
+def new_chat(chat_id: str, title: Optional[str], first_message: str) -> ChatHistory:
+    return ChatHistory(
+        id=chat_id,
+        title=title or first_message.strip()[:CHAT_TITLE_CHARS] or "New chat",
+        updatedAt=datetime.now(timezone.utc).isoformat(),
+        length=0,
+    )
+
+
+def reply_request(history: ChatHistory, content: str, model: str) -> dict:
+    """Chat completion arguments for the next reply: system prompt, summary, window, new message."""
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    if history.summary:
+        messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{history.summary}"})
+    messages.extend(m.dict() for m in history.messages)
+    messages.append({"role": "user", "content": content})
+    return dict(model=model, messages=messages, max_tokens=CHAT_REPLY_MAX_TOKENS)
+
+
+def messages_to_fold(history: ChatHistory) -> List[ChatMessage]:
+    """Return the oldest stored messages to fold into the summary this turn (often none)."""
+    after_turn = len(history.messages) + 2
+    if after_turn <= CHAT_WINDOW_MESSAGES + CHAT_FOLD_BATCH:
+        return []
+    return history.messages[:after_turn - CHAT_WINDOW_MESSAGES]
+
+
+def summary_request(summary: str, folded: List[ChatMessage], model: str) -> dict:
+    """Chat completion arguments that fold ``folded`` into the existing ``summary``."""
+    transcript = "\n".join(f"{m.role}: {m.content}" for m in folded)
+    return dict(
+        model=model,
+        messages=[
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {"role": "user", "content": f"Current summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}"},
+        ],
+        max_tokens=CHAT_SUMMARY_MAX_TOKENS,
+        temperature=0.2,
+    )
+
+
+def apply_turn(history: ChatHistory, content: str, reply: str,
+               folded: List[ChatMessage], summary: Optional[str]) -> ChatHistory:
+    """Return the history after this turn; ``folded`` messages are dropped only if ``summary`` is set."""
+    messages = history.messages + [ChatMessage(role="user", content=content),
+                                   ChatMessage(role="assistant", content=reply)]
+    if folded and summary is not None:
+        messages = messages[len(folded):]
+    else:
+        summary = history.summary
+    return history.copy(update={
+        "messages": messages,
+        "summary": summary,
+        "length": history.length + 2,
+        "history_rev": history.history_rev + 1,
+        "updatedAt": datetime.now(timezone.utc).isoformat(),
+    })
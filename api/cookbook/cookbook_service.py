@@ -1,16 +1,23 @@
+import json
 import logging
-import os
-import uuid
 from typing import List
-import boto3
-import requests
-from fastapi import APIRouter, Depends, HTTPException, Body
-from recipe_scrapers import scrape_me
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Body, Request, Response
+from fastapi.responses import StreamingResponse
 
 from models.models import Recipe
-from storage.utils import read_recipe_items, write_recipe_items, pantry_table
-from storage.utils import read_recipe_items, write_recipe_items, pantry_table, soft_delete_recipe_item
+from storage.utils import iter_recipe_items, read_recipe_items, write_recipe_items, soft_delete_recipe_item
+from storage import async_utils as async_storage
+from storage.async_utils import storage_call, storage_pages
+from cookbook.image_jobs import (
+    RECIPE_PLACEHOLDER_IMAGE_URL,
+    enqueue_recipe_image,
+    enrich_recipe_image,
+    recipe_image_payload,
+)
+from cookbook.importer import MAX_BULK_URLS, bulk_import_recipes, recipe_from_scraper
 from auth.auth_service import get_current_user, get_user_id_from_token
+from etags import not_modified
+from serialization import NDJSON_PAGE_SIZE, model_response, ndjson_response, wants_ndjson
 
 get_user = get_current_user
 get_user_id = get_user_id_from_token
@@ -19,25 +26,32 @@ cookbook_router = APIRouter(prefix="/cookbook")
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-S3_BUCKET_NAME = os.getenv("IMAGE_BUCKET_NAME", "ppal-images")
-s3 = boto3.client("s3")
+def scrape_me(url: str):
+    # recipe_scrapers pulls in lxml/extruct/rdflib; only load it when a recipe is imported
+    from recipe_scrapers import scrape_me as _scrape_me
+    return _scrape_me(url)
 
-def _ensure_bucket(bucket_name: str):
+def _queue_recipe_image(background_tasks: BackgroundTasks, user_id: str, recipe_id: str, img: str):
+    job = recipe_image_payload(user_id, recipe_id, img)
     try:
-        s3.head_bucket(Bucket=bucket_name)
-    except s3.exceptions.NoSuchBucket:
-        s3.create_bucket(Bucket=bucket_name)
-
-def _upload_recipe_image(img_data: bytes) -> str:
-    _ensure_bucket(S3_BUCKET_NAME)
-    key = f"recipes/{uuid.uuid4()}.jpg"
-    s3.put_object(Bucket=S3_BUCKET_NAME, Key=key, Body=img_data, ContentType="image/jpeg")
-    return f"https://{S3_BUCKET_NAME}.s3.amazonaws.com/{key}"
+        queued = enqueue_recipe_image(job)
+    except Exception as e:
+        logging.warning(f"Failed to queue recipe image job for {recipe_id}: {e}; fetching in background")
+        queued = False
+    if not queued:
+        background_tasks.add_task(enrich_recipe_image, job)
 
 @cookbook_router.get("", response_model=List[Recipe])
-def list_recipes(user_id: str = Depends(get_user_id)) -> List[Recipe]:
-    """List all recipes for the authenticated user."""
-    return read_recipe_items(user_id)
+async def list_recipes(request: Request, response: Response, user_id: str = Depends(get_user_id)) -> List[Recipe]:
+    """List all recipes for the authenticated user (304 if If-None-Match is current, NDJSON if accepted)."""
+    unchanged = await not_modified(request, response, "recipes", user_id, vary_accept=True)
+    if unchanged is not None:
+        return unchanged
+    if wants_ndjson(request):
+        pages = storage_pages(iter_recipe_items, async_storage.iter_recipe_items, user_id, NDJSON_PAGE_SIZE)
+        return await ndjson_response(pages, response)
+    recipes = await storage_call(read_recipe_items, async_storage.read_recipe_items, user_id)
+    return model_response(recipes, response)
 
 @cookbook_router.post("", response_model=Recipe)
 def add_recipe(recipe: Recipe, user_id: str = Depends(get_user_id)) -> Recipe:
@@ -61,39 +75,18 @@ def delete_recipe(recipe_id: str, user_id: str = Depends(get_user_id)) -> dict:
 
 
 @cookbook_router.post("/import", response_model=Recipe)
-def import_recipe(payload: dict = Body(...), user_id: str = Depends(get_user_id)) -> Recipe:
+def import_recipe(background_tasks: BackgroundTasks, payload: dict = Body(...),
+                  user_id: str = Depends(get_user_id)) -> Recipe:
+    """Import a recipe from a URL; the hero image is fetched after the recipe is saved."""
     url = payload.get("url")
     if not url:
         raise HTTPException(status_code=400, detail="URL is required")
     try:
-        scraper = scrape_me(url)
-        name = scraper.title() or "Imported recipe"
-        ingredients = scraper.ingredients()
-        instructions = scraper.instructions()
-        img = scraper.image()
-        cook_time = str(scraper.total_time()) if hasattr(scraper, "total_time") else None
-        tags = scraper.tags() if hasattr(scraper, "tags") else None
+        recipe, img = recipe_from_scraper(scrape_me(url))
     except Exception as e:
         logging.error(f"Scraping failed for {url}: {e}")
         raise HTTPException(status_code=400, detail="Unsupported or unstructured recipe URL")
-
-    image_url = f"https://{S3_BUCKET_NAME}.s3.amazonaws.com/recipes/default.jpg"
-    if img:
-        try:
-            resp = requests.get(img, timeout=10)
-            resp.raise_for_status()
-            image_url = _upload_recipe_image(resp.content)
-        except Exception as e:
-            logging.warning(f"Image fetch/upload failed: {e}; using placeholder")
-
-    recipe = Recipe(
-        name=name,
-        ingredients=ingredients,
-        instructions=instructions,
-        image_url=image_url,
-        cook_time=cook_time,
-        tags=tags,
-    )
+    recipe.image_url = RECIPE_PLACEHOLDER_IMAGE_URL
 
     try:
         write_recipe_items(user_id, [recipe])
@@ -101,4 +94,29 @@ def import_recipe(payload: dict = Body(...), user_id: str = Depends(get_user_id)
         logging.error(f"Error saving imported recipe: {e}")
         raise HTTPException(status_code=500, detail="Failed to save recipe")
 
+    if img:
+        _queue_recipe_image(background_tasks, user_id, recipe.id, img)
+
     return recipe
+
+
+@cookbook_router.post("/import/bulk")
+async def import_recipes_bulk(background_tasks: BackgroundTasks, payload: dict = Body(...),
+                              user_id: str = Depends(get_user_id)) -> StreamingResponse:
+    """Import many recipe URLs concurrently, streaming one NDJSON status line per URL."""
+    urls = [u for u in payload.get("urls") or [] if isinstance(u, str) and u.strip()]
+    if not urls:
+        raise HTTPException(status_code=400, detail="urls is required")
+    if len(urls) > MAX_BULK_URLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_URLS} URLs per request")
+
+    def on_saved(recipe: Recipe, img):
+        if img:
+            _queue_recipe_image(background_tasks, user_id, recipe.id, img)
+
+    async def lines():
+        async for status in bulk_import_recipes(user_id, urls, write_recipe_items, on_saved):
+            yield json.dumps(status) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", background=background_tasks)
+
@@ -0,0 +1,48 @@
+import os
+import logging
+from storage.clients import get_client
+from storage.images import public_url, store_image_from_url
+from storage.utils import set_recipe_image
+from tracing import hydration_message, hydration_phase
+
+# Recipe hero images are fetched after the recipe is saved, either by the SQS
+# worker (RECIPE_IMAGE jobs) or, without a queue, by a FastAPI background task.
+# Kept free of FastAPI so the worker can import it.
+
+IMAGE_QUEUE_URL = os.getenv("IMAGE_QUEUE_URL")
+RECIPE_PLACEHOLDER_IMAGE_URL = public_url("recipes/default.jpg")
+
+
+def recipe_image_payload(user_id: str, recipe_id: str, source_url: str) -> dict:
+    return {"user_id": user_id, "recipe_id": recipe_id, "source_url": source_url}
+
+
+def enqueue_recipe_image(payload: dict) -> bool:
+    """Send a RECIPE_IMAGE job to the image queue; False if no queue is configured."""
+    if not IMAGE_QUEUE_URL:
+        return False
+    get_client("sqs").send_message(
+        QueueUrl=IMAGE_QUEUE_URL,
+        MessageBody=hydration_message("RECIPE_IMAGE", payload)
+    )
+    return True
+
+
+def enrich_recipe_image(payload: dict):
+    """Fetch a recipe's hero image, store its variants and patch the recipe record."""
+    user_id = payload.get("user_id")
+    recipe_id = payload.get("recipe_id")
+    source_url = payload.get("source_url")
+    try:
+        with hydration_phase("upstream"):
+            variants = store_image_from_url(source_url, f"recipes/{recipe_id}")
+    except Exception as e:
+        # A dead image link is not worth retrying; the placeholder stays
+        logging.warning(f"Image fetch/upload failed for recipe {recipe_id}: {e}; keeping placeholder")
+        return
+    with hydration_phase("write"):
+        stored = set_recipe_image(user_id, recipe_id, variants["original"], variants)
+    if stored:
+        logging.info(f"Enriched image for recipe {recipe_id}")
+    else:
+        logging.info(f"Recipe {recipe_id} was removed before its image was stored")
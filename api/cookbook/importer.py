@@ -0,0 +1,231 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import httpx
+from starlette.concurrency import run_in_threadpool
+from models.models import Recipe
+
+# ─── Recipe Import ───────────────────────────────────────────────────────────────
+# Bulk import fetches pages concurrently on the event loop (bounded globally and
+# per domain), revalidates a small HTML cache with ETag/Last-Modified, parses on
+# a worker pool and saves recipes in batches.
+
+MAX_BULK_URLS = int(os.getenv("MAX_BULK_IMPORT_URLS", "50"))
+BULK_CONCURRENCY = int(os.getenv("BULK_IMPORT_CONCURRENCY", "8"))
+PER_DOMAIN_CONCURRENCY = int(os.getenv("BULK_IMPORT_PER_DOMAIN", "2"))
+PARSE_WORKERS = int(os.getenv("RECIPE_PARSE_WORKERS", "4"))
+SAVE_BATCH_SIZE = 25  # DynamoDB BatchWriteItem limit
+FETCH_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
+USER_AGENT = "PantryPal recipe importer (+https://github.com/nate-sepich/pantry-pal)"
+
+HTML_CACHE_SIZE = int(os.getenv("RECIPE_HTML_CACHE_SIZE", "256"))
+HTML_CACHE_FRESH_SECONDS = int(os.getenv("RECIPE_HTML_CACHE_FRESH_SECONDS", "300"))
+
+TRACKING_PARAM_PREFIXES = ("utm_", "fbclid", "gclid", "mc_")
+
+_parse_executor: Optional[ThreadPoolExecutor] = None
+_parse_executor_lock = threading.Lock()
+
+
+def recipe_from_scraper(scraper) -> Tuple[Recipe, Optional[str]]:
+    """Build a Recipe from a recipe_scrapers scraper; return it with the hero image URL."""
+    def optional(field: str):
+        # Schema-only scrapers raise (or lack the method) for fields the page omits
+        try:
+            return getattr(scraper, field)()
+        except Exception:
+            return None
+
+    total_time = optional("total_time")
+    recipe = Recipe(
+        name=scraper.title() or "Imported recipe",
+        ingredients=scraper.ingredients(),
+        instructions=scraper.instructions(),
+        cook_time=str(total_time) if total_time is not None else None,
+        tags=optional("tags"),
+    )
+    return recipe, optional("image")
+
+
+def canonical_url(url: str) -> str:
+    """Normalize ``url`` for caching and de-duplication (host case, fragments, tracking params)."""
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAM_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+class HtmlCache:
+    """Bounded LRU of fetched pages keyed by canonical URL, with HTTP validators."""
+
+    def __init__(self, max_entries: int = HTML_CACHE_SIZE, fresh_seconds: int = HTML_CACHE_FRESH_SECONDS):
+        self.max_entries = max_entries
+        self.fresh_seconds = fresh_seconds
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+
+    def get(self, url: str) -> Optional[dict]:
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+        return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time.monotonic() - entry["fetched_at"] < self.fresh_seconds
+
+    def put(self, url: str, html: str, headers: httpx.Headers) -> None:
+        self._entries[url] = {
+            "html": html,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": time.monotonic(),
+        }
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def touch(self, url: str) -> None:
+        self._entries[url]["fetched_at"] = time.monotonic()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+html_cache = HtmlCache()
+
+
+def get_parse_executor() -> ThreadPoolExecutor:
+    global _parse_executor
+    if _parse_executor is None:
+        with _parse_executor_lock:
+            if _parse_executor is None:
+                _parse_executor = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="recipe-parse")
+    return _parse_executor
+
+
+def build_http_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=BULK_CONCURRENCY, max_keepalive_connections=BULK_CONCURRENCY)
+    return httpx.AsyncClient(timeout=FETCH_TIMEOUT, limits=limits, follow_redirects=True,
+                             headers={"User-Agent": USER_AGENT})
+
+
+async def fetch_html(client: httpx.AsyncClient, url: str) -> str:
+    """Return the page at ``url``, served from or revalidated against the HTML cache.
+
+    The page is cached under its canonical URL but fetched as given: sites may
+    404 or redirect on the rewritten form (dropped slash, reordered query).
+    """
+    key = canonical_url(url)
+    cached = html_cache.get(key)
+    if cached and html_cache.is_fresh(cached):
+        return cached["html"]
+    headers = {}
+    if cached and cached["etag"]:
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached["last_modified"]:
+        headers["If-Modified-Since"] = cached["last_modified"]
+    resp = await client.get(url, headers=headers)
+    if resp.status_code == 304 and cached:
+        html_cache.touch(key)
+        return cached["html"]
+    resp.raise_for_status()
+    html_cache.put(key, resp.text, resp.headers)
+    return resp.text
+
+
+def parse_recipe_html(html: str, url: str) -> Tuple[Recipe, Optional[str]]:
+    """Parse a fetched page with recipe_scrapers (CPU bound; run on the parse pool)."""
+    # recipe_scrapers pulls in lxml/extruct/rdflib; only load it when a recipe is imported
+    from recipe_scrapers import scrape_html
+    return recipe_from_scraper(scrape_html(html, org_url=url, supported_only=False))
+
+
+async def bulk_import_recipes(
+    user_id: str,
+    urls: List[str],
+    write_items: Callable[[str, List[Recipe]], None],
+    on_saved: Optional[Callable[[Recipe, Optional[str]], None]] = None,
+    client: Optional[httpx.AsyncClient] = None,
+) -> AsyncIterator[dict]:
+    """Import ``urls`` concurrently, yielding one status dict per URL and a final summary.
+
+    Failures are reported as soon as they happen; successes once their batch
+    has been written with ``write_items``. ``on_saved`` receives every saved
+    recipe with its hero image URL (used to queue image jobs).
+    """
+    loop = asyncio.get_running_loop()
+    global_gate = asyncio.Semaphore(BULK_CONCURRENCY)
+    domain_gates: Dict[str, asyncio.Semaphore] = {}
+    own_client = client is None
+    client = client or build_http_client()
+
+    # Duplicate URLs (after canonicalization) are imported once, fetched as first given
+    targets: Dict[str, str] = {}
+    for url in urls:
+        targets.setdefault(canonical_url(url), url)
+
+    async def import_one(canonical: str, original: str):
+        host = urlsplit(canonical).netloc
+        gate = domain_gates.setdefault(host, asyncio.Semaphore(PER_DOMAIN_CONCURRENCY))
+        try:
+            async with gate, global_gate:
+                html = await fetch_html(client, original)
+            recipe, image = await loop.run_in_executor(get_parse_executor(), parse_recipe_html, html, original)
+            return original, recipe, image, None
+        except Exception as e:
+            logging.warning(f"Bulk import failed for {original}: {e}")
+            return original, None, None, e
+
+    pending: List[Tuple[str, Recipe, Optional[str]]] = []
+    saved = failed = 0
+
+    async def flush():
+        nonlocal saved, failed
+        batch, pending[:] = list(pending), []
+        try:
+            await run_in_threadpool(write_items, user_id, [recipe for _, recipe, _ in batch])
+        except Exception as e:
+            logging.error(f"Error saving imported recipes: {e}")
+            failed += len(batch)
+            return [{"url": url, "status": "error", "error": "Failed to save recipe"} for url, _, _ in batch]
+        saved += len(batch)
+        statuses = []
+        for url, recipe, image in batch:
+            if on_saved:
+                await run_in_threadpool(on_saved, recipe, image)
+            statuses.append({"url": url, "status": "saved", "recipe_id": recipe.id, "name": recipe.name})
+        return statuses
+
+    try:
+        tasks = [asyncio.ensure_future(import_one(c, o)) for c, o in targets.items()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                url, recipe, image, error = await next_done
+                if error is not None:
+                    failed += 1
+                    yield {"url": url, "status": "error", "error": str(error) or type(error).__name__}
+                    continue
+                pending.append((url, recipe, image))
+                if len(pending) >= SAVE_BATCH_SIZE:
+                    for status in await flush():
+                        yield status
+            if pending:
+                for status in await flush():
+                    yield status
+        finally:
+            # Client went away mid-stream: stop fetching the rest
+            for task in tasks:
+                task.cancel()
+    finally:
+        if own_client:
+            await client.aclose()
+
+    yield {"status": "done", "saved": saved, "failed": failed}
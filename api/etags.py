@@ -0,0 +1,58 @@
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+from storage.utils import read_user_version
+from storage import async_utils as async_storage
+from storage.async_utils import storage_call
+from serialization import wants_ndjson
+
+# ─── Conditional GET ─────────────────────────────────────────────────────────────
+# List endpoints are re-fetched on every app launch and pull-to-refresh, and are
+# usually unchanged. Their ETag is the user's change counter for the collection
+# (see "Change Versions" in storage/utils.py), so answering If-None-Match costs
+# one GetItem instead of a partition query and a full response body. The ETag
+# also hashes the user id: two accounts on one device never share a 304. Lists
+# served as JSON or NDJSON by Accept get a different ETag per form and carry
+# Vary: Accept, 304s included, so a cache never answers one with the other.
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def version_etag(scope: str, user_id: str, version: int, variant: Optional[str] = None) -> str:
+    user = hashlib.sha256(user_id.encode()).hexdigest()[:12]
+    tag = f"{scope}-{variant}" if variant else scope
+    return f'W/"{tag}-{user}-{version}"'
+
+
+def _opaque(tag: str) -> str:
+    return tag.strip().removeprefix("W/")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of ``etag`` against an If-None-Match header value."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return _opaque(etag) in {_opaque(tag) for tag in if_none_match.split(",")}
+
+
+async def not_modified(request: Request, response: Response, scope: str, user_id: str,
+                       vary_accept: bool = False) -> Optional[Response]:
+    """Return a 304 if the client already has the current ``scope`` list; otherwise tag ``response`` and return None.
+
+    The version is read before the caller queries the items, so a write racing the
+    query can only make the ETag older than the body, which costs a refetch.
+    ``vary_accept`` is for routes that also stream NDJSON.
+    """
+    version = await storage_call(read_user_version, async_storage.read_user_version, user_id, scope)
+    headers = {"Cache-Control": CACHE_CONTROL}
+    variant = None
+    if vary_accept:
+        variant = "ndjson" if wants_ndjson(request) else None
+        headers["Vary"] = "Accept"
+    etag = headers["ETag"] = version_etag(scope, user_id, version, variant)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -1,9 +1,7 @@
 import asyncio
-import os
 from decimal import Decimal
 from fastapi import APIRouter, HTTPException, Depends, Request
 import httpx
-import requests
 from typing import Optional, List
 from dotenv import load_dotenv
 from models.models import (
@@ -15,15 +13,23 @@ from models.models import (
     ItemMacroRequest,
 )
 import logging
-from storage.utils import read_pantry_items, write_pantry_items, read_recipe_items
+from storage.utils import read_pantry_items
+from metrics import dependency_span
 from pantry.pantry_service import get_current_user
+# Sync USDA lookups and the hydration jobs live in a FastAPI-free module so the
+# SQS worker can import them without building the API
+from macros.enrichment import (
+    USDA_API_KEY,
+    search_food_item,
+    fetch_food_details,
+    query_food_api,
+    enrich_item,
+    enrich_recipe,
+)
 
 # load .env file
 load_dotenv()
 
-# Load your USDA API Key
-USDA_API_KEY = os.getenv('USDA_API_KEY')
-
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 CATEGORY_MAP = {
@@ -75,7 +81,8 @@ async def search_food_item_async(item_name: str) -> Optional[int]:
     search_url = "https://api.nal.usda.gov/fdc/v1/foods/search"
     params = {"api_key": USDA_API_KEY, "query": item_name}
     async with httpx.AsyncClient() as client:
-        resp = await client.get(search_url, params=params)
+        with dependency_span("usda", "search"):
+            resp = await client.get(search_url, params=params)
     if resp.status_code == 200:
         data = resp.json()
         foods = data.get("foods", [])
@@ -89,7 +96,8 @@ async def search_food_items_async(query: str) -> List[dict]:
     search_url = "https://api.nal.usda.gov/fdc/v1/foods/search"
     params = {"api_key": USDA_API_KEY, "query": query}
     async with httpx.AsyncClient() as client:
-        resp = await client.get(search_url, params=params)
+        with dependency_span("usda", "search"):
+            resp = await client.get(search_url, params=params)
     if resp.status_code == 200:
         data = resp.json()
         return data.get("foods", [])
@@ -111,7 +119,8 @@ async def fetch_food_details_async(fdc_id: int, format: str = 'full', nutrients:
         params['nutrients'] = ','.join(map(str, nutrients))
     
     async with httpx.AsyncClient() as client:
-        response = await client.get(detail_url, params=params)
+        with dependency_span("usda", "food"):
+            response = await client.get(detail_url, params=params)
         if response.status_code == 200:
             food_data = response.json()
             nutrients = {nutrient['nutrient']['name']: nutrient['amount'] for nutrient in food_data.get('foodNutrients', [])}
@@ -152,80 +161,6 @@ async def query_food_api_async(item_name: str) -> Optional[InventoryItemMacros]:
 
 macro_router = APIRouter(prefix="/macros")
 
-# Define a function to search for food items using the USDA FoodData Central API
-def search_food_item(item_name: str) -> Optional[int]:
-    """
-    Search for food items using the USDA FoodData Central API.
-    Returns the fdcId of the first result, or None if no result is found.
-    """
-    search_url = f"https://api.nal.usda.gov/fdc/v1/foods/search"
-    params = {
-        'api_key': USDA_API_KEY,
-        'query': item_name
-    }
-    response = requests.get(search_url, params=params)
-    
-    if response.status_code == 200:
-        search_data = response.json()
-        if search_data['foods']:
-            # Return the first food's FDC ID
-            return search_data['foods'][0]['fdcId']
-    return None
-
-def fetch_food_details(fdc_id: int, format: str = 'full', nutrients: Optional[List[int]] = None) -> Optional[InventoryItemMacros]:
-    """
-    Fetch detailed food nutrient information using the FDC ID.
-    Supports optional format (abridged/full) and nutrient filtering.
-    """
-    detail_url = f"https://api.nal.usda.gov/fdc/v1/food/{fdc_id}"
-    params = {
-        'api_key': USDA_API_KEY,
-        'format': format
-    }
-    if nutrients:
-        params['nutrients'] = ','.join(map(str, nutrients))
-    
-    response = requests.get(detail_url, params=params)
-    if response.status_code == 200:
-        food_data = response.json()
-        nutrients = {nutrient['nutrient']['name']: nutrient['amount'] for nutrient in food_data.get('foodNutrients', [])}
-        
-        # Map USDA nutrient data to your InventoryItemMacros model
-        return InventoryItemMacros(
-            protein=nutrients.get('Protein', 0),
-            carbohydrates=nutrients.get('Carbohydrate, by difference', 0),
-            fiber=nutrients.get('Fiber, total dietary', 0),
-            sugar=nutrients.get('Sugars, total including NLEA', 0),
-            fat=nutrients.get('Total lipid (fat)', 0),
-            saturated_fat=nutrients.get('Fatty acids, total saturated', 0),
-            polyunsaturated_fat=nutrients.get('Fatty acids, total polyunsaturated', 0),
-            monounsaturated_fat=nutrients.get('Fatty acids, total monounsaturated', 0),
-            trans_fat=nutrients.get('Fatty acids, total trans', 0),
-            cholesterol=nutrients.get('Cholesterol', 0),
-            sodium=nutrients.get('Sodium, Na', 0),
-            potassium=nutrients.get('Potassium, K', 0),
-            vitamin_a=nutrients.get('Vitamin A, RAE', 0),
-            vitamin_c=nutrients.get('Vitamin C, total ascorbic acid', 0),
-            calcium=nutrients.get('Calcium, Ca', 0),
-            iron=nutrients.get('Iron, Fe', 0),
-            calories=nutrients.get('Energy', 0)  # Add calories
-        )
-    
-    return None
-
-def query_food_api(item_name: str) -> Optional[InventoryItemMacros]:
-    """
-    Query the USDA FoodData Central API to retrieve macro information for a given food item.
-    First searches for the item, then fetches detailed nutrient information using the fdcId.
-    Portion size is in grams by default.
-    """
-    fdc_id = search_food_item(item_name)
-    
-    if fdc_id:
-        return fetch_food_details(fdc_id)
-    
-    return None
-
 @macro_router.post("/item", response_model=InventoryItemMacros)
 async def get_item_macros(req: ItemMacroRequest):
     """Lookup macros for a single food item and scale by quantity."""
@@ -400,62 +335,3 @@ def lookup_upc(upc: str):
     if not fdc_id:
         raise HTTPException(status_code=404, detail="Item not found for UPC")
     return UPCResponseModel(fdc_id=str(fdc_id))
-
-def enrich_item(data: dict):
-    """
-    Fetch macros for an item using the USDA API and update the pantry.
-    """
-    item_name = data["item_name"]
-    user_id = data["user_id"]
-    item_id = data["item_id"]
-
-    logging.info(f"Enriching item: {item_name} for user ID: {user_id}")
-    macros = query_food_api(item_name)
-    if macros:
-        items = read_pantry_items(user_id)
-        for i, it in enumerate(items):
-            if it.id == item_id:
-                it.macros = macros
-                write_pantry_items(user_id, [it])
-                logging.info(f"Updated macros for item ID: {item_id}")
-                return
-    logging.warning(f"Failed to enrich item: {item_name}. No macros found.")
-
-def enrich_recipe(data: dict):
-    """
-    Aggregate macros for a recipe based on its ingredients and update the recipe.
-    """
-    user_id = data["user_id"]
-    recipe_id = data["recipe_id"]
-
-    logging.info(f"Enriching recipe ID: {recipe_id} for user ID: {user_id}")
-    recipes = read_recipe_items(user_id)
-    for rec in recipes:
-        if rec.id == recipe_id:
-            total = InventoryItemMacros()
-            for ing in rec.ingredients:
-                macros = query_food_api(ing.item_name)
-                if macros:
-                    factor = ing.quantity / 100
-                    total.protein += macros.protein * factor
-                    total.carbohydrates += macros.carbohydrates * factor
-                    total.fiber += macros.fiber * factor
-                    total.sugar += macros.sugar * factor
-                    total.fat += macros.fat * factor
-                    total.saturated_fat += macros.saturated_fat * factor
-                    total.polyunsaturated_fat += macros.polyunsaturated_fat * factor
-                    total.monounsaturated_fat += macros.monounsaturated_fat * factor
-                    total.trans_fat += macros.trans_fat * factor
-                    total.cholesterol += macros.cholesterol * factor
-                    total.sodium += macros.sodium * factor
-                    total.potassium += macros.potassium * factor
-                    total.vitamin_a += macros.vitamin_a * factor
-                    total.vitamin_c += macros.vitamin_c * factor
-                    total.calcium += macros.calcium * factor
-                    total.iron += macros.iron * factor
-            rec.total_macros = total
-            write_recipe_items(user_id, [rec])
-            logging.info(f"Updated macros for recipe ID: {recipe_id}")
-            return
-    logging.warning(f"Failed to enrich recipe ID: {recipe_id}. Recipe not found.")
-
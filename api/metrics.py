@@ -0,0 +1,243 @@
+import os
+import hmac
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# ─── Metrics ─────────────────────────────────────────────────────────────────────
+# In-process request and dependency metrics, rendered in the Prometheus text
+# format at GET /metrics (nothing to run alongside the API). MetricsMiddleware
+# times every request by route template; dependency_span() times an outbound
+# call, and every boto3 client from the registry reports its calls through
+# botocore's before-call/after-call events. Modules that already keep stats
+# (LLM gate, response cache, Cognito pool) publish them with
+# @register_collector, the same way warm-up hooks are registered. The route is
+# on the public API, so it is only served to scrapers presenting METRICS_TOKEN
+# as a bearer token; without METRICS_TOKEN it is not served at all.
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+COLLECTORS: Dict[str, Callable[[], Iterable[str]]] = {}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names: Labels, values: Labels) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Labels = ()):
+        self.name, self.help_text, self.labels = name, help_text, labels
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[values] = self._values.get(values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines += [f"{self.name}{_label_text(self.labels, k)} {v:g}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    """Latency histogram per label set; buckets are in seconds, as Prometheus expects."""
+
+    def __init__(self, name: str, help_text: str, labels: Labels = (), buckets=LATENCY_BUCKETS):
+        self.name, self.help_text, self.labels, self.buckets = name, help_text, labels, buckets
+        # Per label set: [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, *values: str) -> None:
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(values)
+            if series is None:
+                series = self._series[values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, [list(s[0]), s[1], s[2]]) for k, s in self._series.items())
+        for values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{_label_text(self.labels + ('le',), values + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, values)} {total:.6f}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, values)} {count}")
+        return lines
+
+
+http_requests = Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+http_latency = Histogram("http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"))
+dependency_latency = Histogram("dependency_call_duration_seconds", "Outbound call latency by dependency and operation.",
+                               ("dependency", "operation"))
+dependency_errors = Counter("dependency_call_errors_total", "Outbound calls that raised or returned an error.",
+                            ("dependency", "operation"))
+
+
+def register_collector(name: str):
+    """Decorator registering ``fn`` (returning exposition lines) to run on every /metrics scrape."""
+    def decorator(fn: Callable[[], Iterable[str]]):
+        COLLECTORS[name] = fn
+        return fn
+    return decorator
+
+
+def sample_lines(name: str, help_text: str, samples: Iterable[Tuple[dict, float]], kind: str = "gauge") -> List[str]:
+    """Exposition lines for a collected metric from ``(labels, value)`` pairs."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_label_text(tuple(labels), tuple(labels.values()))} {value:g}")
+    return lines
+
+
+# ─── Rolling Windows ─────────────────────────────────────────────────────────────
+# Stats kept as deques of recent latencies in ms (LLM gate, Cognito pool,
+# hydration jobs) are summarised by nearest rank with one helper.
+
+WINDOW_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _nearest_rank(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def percentiles(samples: Iterable[float]) -> Dict[str, float]:
+    """Return p50/p95/p99 and max of ``samples`` (ms), rounded to 0.1; all 0.0 when empty."""
+    ordered = sorted(samples)
+    summary = {f"p{round(q * 100)}": round(_nearest_rank(ordered, q), 1) for q in WINDOW_QUANTILES}
+    summary["max"] = round(ordered[-1], 1) if ordered else 0.0
+    return summary
+
+
+def window_lines(name: str, help_text: str, windows: Iterable[Tuple[dict, Iterable[float]]]) -> List[str]:
+    """Gauges for the quantiles of ``(labels, samples in ms)`` windows, exported in seconds.
+
+    ``name{quantile="0.5"}`` etc. carry WINDOW_QUANTILES; the largest sample goes
+    to a separate ``name_max`` gauge, since a max is not a quantile.
+    """
+    quantile_samples, max_samples = [], []
+    for labels, samples in windows:
+        ordered = sorted(samples)
+        for q in WINDOW_QUANTILES:
+            quantile_samples.append(({**labels, "quantile": f"{q:g}"}, _nearest_rank(ordered, q) / 1000))
+        max_samples.append((labels, (ordered[-1] if ordered else 0.0) / 1000))
+    return (sample_lines(name, f"{help_text} Quantiles over the recent window.", quantile_samples)
+            + sample_lines(f"{name}_max", f"{help_text} Maximum over the recent window.", max_samples))
+
+
+def metrics_authorized(authorization: Optional[str]) -> bool:
+    """True if ``authorization`` is "Bearer <METRICS_TOKEN>" (always False with no token configured)."""
+    if not METRICS_TOKEN or not authorization:
+        return False
+    scheme, _, token = authorization.partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(token.strip().encode(), METRICS_TOKEN.encode())
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in (http_requests, http_latency, dependency_latency, dependency_errors):
+        lines += metric.render()
+    for name, collect in list(COLLECTORS.items()):
+        try:
+            lines += collect()
+        except Exception as e:
+            lines.append(f"# collector {name} failed: {e!r}")
+    return "\n".join(lines) + "\n"
+
+
+# ─── Dependency Spans ────────────────────────────────────────────────────────────
+
+def record_call(dependency: str, operation: str, seconds: float, failed: bool = False) -> None:
+    if not METRICS_ENABLED:
+        return
+    dependency_latency.observe(seconds, dependency, operation)
+    if failed:
+        dependency_errors.inc(dependency, operation)
+
+
+@contextmanager
+def dependency_span(dependency: str, operation: str):
+    """Time the enclosed outbound call; an exception counts as an error."""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        record_call(dependency, operation, time.perf_counter() - start, failed=True)
+        raise
+    record_call(dependency, operation, time.perf_counter() - start)
+
+
+def _before_aws_call(model, context, **kwargs):
+    context["metrics_call"] = (model.service_model.service_name, model.name, time.perf_counter())
+
+
+def _after_aws_call(http_response, context, **kwargs):
+    call = context.pop("metrics_call", None)
+    if call is not None:
+        record_call(call[0], call[1], time.perf_counter() - call[2], failed=http_response.status_code >= 300)
+
+
+def _after_aws_call_error(context, **kwargs):
+    call = context.pop("metrics_call", None)
+    if call is not None:
+        record_call(call[0], call[1], time.perf_counter() - call[2], failed=True)
+
+
+def instrument_botocore(client) -> None:
+    """Time every API call made through ``client`` (boto3 or aiobotocore; retries included)."""
+    if not METRICS_ENABLED:
+        return
+    events = client.meta.events
+    events.register("before-call", _before_aws_call, unique_id="metrics-before-call")
+    events.register("after-call", _after_aws_call, unique_id="metrics-after-call")
+    events.register("after-call-error", _after_aws_call_error, unique_id="metrics-after-call-error")
+
+
+# ─── Request Middleware ──────────────────────────────────────────────────────────
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and status per route template (not raw path)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            return await self.app(scope, receive, send)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope; unmatched paths share one label
+            route = getattr(scope.get("route"), "path", "<unmatched>")
+            http_latency.observe(time.perf_counter() - start, scope["method"], route)
+            http_requests.inc(scope["method"], route, str(status))
@@ -2,7 +2,7 @@ import uuid
 from enum import Enum
 from decimal import Decimal
 from pydantic import BaseModel, Field, validator
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class UPCResponseModel(BaseModel):
     fdc_id: str
@@ -59,6 +59,8 @@ class InventoryItem(BaseModel):
     expiration_date: Optional[str] = None
     environmental_impact: Optional[Decimal] = Decimal("0")  # Use Decimal for DynamoDB compatibility
     image_url: Optional[str] = None  # Public S3 URL for item image
+    image_variants: Optional[Dict[str, str]] = None  # Resized variant URLs, e.g. {"thumb": ..., "medium": ...}
+    created_at: Optional[str] = None  # ISO timestamp set when the item is first added
     active: bool = True  # Default to active
 
     @validator("cost", "environmental_impact", pre=True, always=True)
@@ -93,6 +95,7 @@ class Recipe(BaseModel):
     ingredients: Optional[List[str]] = None
     instructions: Optional[str] = None
     image_url: Optional[str] = None
+    image_variants: Optional[Dict[str, str]] = None
     cook_time: Optional[str] = None
     tags: Optional[List[str]] = None
     active: bool = True  # Soft delete flag
@@ -122,6 +125,33 @@ class ChatMeta(BaseModel):
     length: int
 
 
+class ChatHistory(ChatMeta):
+    """A server-side conversation: recent messages plus a running summary of older ones."""
+    summary: str = ""
+    messages: List[ChatMessage] = []
+    history_rev: int = 0  # bumped on every turn; guards concurrent writers
+
+
+class ChatTurnRequest(BaseModel):
+    content: str
+    title: Optional[str] = None
+
+
+class SyncTombstone(BaseModel):
+    type: str  # "pantry" or "recipe"
+    id: str
+
+
+class SyncPage(BaseModel):
+    """Rows changed since the client's token; ``next`` is the token for the following call."""
+    pantry: List[InventoryItem] = []
+    recipes: List[Recipe] = []
+    chats: List[ChatMeta] = []
+    deleted: List[SyncTombstone] = []
+    next: str
+    has_more: bool = False
+
+
 class FoodCategory(str, Enum):
     """High-level food category used for autocomplete filtering."""
 
@@ -1,13 +1,42 @@
-import cv2
-from pyzbar.pyzbar import decode, ZBarSymbol
-import numpy as np
 import requests
 from dotenv import load_dotenv
 import os
+from metrics import dependency_span
 # Load environment variables from .env file
 load_dotenv()
 USDA_API_KEY = os.getenv('USDA_API_KEY')
+USDA_SEARCH_URL = "https://api.nal.usda.gov/fdc/v1/foods/search"
+
+
+class BarcodeService:
+    """UPC lookups against USDA FoodData Central (no CV dependencies)."""
+
+    @staticmethod
+    def lookup_product_by_upc(upc: str):
+        """Return product info for a UPC, or None if USDA has no match."""
+        with dependency_span("usda", "search"):
+            response = requests.get(USDA_SEARCH_URL, params={'api_key': USDA_API_KEY, 'query': upc}, timeout=10)
+        response.raise_for_status()
+        foods = response.json().get('foods', [])
+        if not foods:
+            return None
+        food_item = foods[0]
+        return {
+            'product_name': food_item.get('description', ''),
+            'brand': food_item.get('brandOwner'),
+            'category': food_item.get('foodCategory'),
+            'fdc_id': str(food_item.get('fdcId')),
+            'ingredients': food_item.get('ingredients'),
+            'source': 'usda',
+        }
+
+
 def decode_barcodes(image):
+    # OpenCV/zbar are only needed by the local webcam scanner, so load them on demand
+    import cv2
+    import numpy as np
+    from pyzbar.pyzbar import decode
+
     # Decode barcodes in the image (no restrictions on barcode type)
     barcodes = decode(image)
 
@@ -29,7 +58,7 @@ def decode_barcodes(image):
             for i in range(len(points)):
                 pt1 = tuple(points[i])
                 pt2 = tuple(points[(i + 1) % len(points)])
-                
+
                 # Ensure the points are tuples of length 2
                 if len(pt1) == 2 and len(pt2) == 2:
                     cv2.line(image, pt1, pt2, (0, 255, 0), 3)
@@ -38,15 +67,21 @@ def decode_barcodes(image):
         if barcode.rect:
             cv2.putText(image, f"{data} ({barcode_type})", (barcode.rect.left, barcode.rect.top - 10),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 2)
-    
+
     return image, barcode_info
 
-# Initialize webcam
-cap = cv2.VideoCapture(0)
 
-if not cap.isOpened():
-    print("Error: Could not open webcam.")
-else:
+def run_webcam_scanner():
+    """Scan barcodes from the local webcam and print USDA matches until 'q' is pressed."""
+    import cv2
+
+    # Initialize webcam
+    cap = cv2.VideoCapture(0)
+
+    if not cap.isOpened():
+        print("Error: Could not open webcam.")
+        return
+
     while True:
         ret, frame = cap.read()
         if not ret:
@@ -63,7 +98,7 @@ else:
         if barcode_info:
             for data, barcode_type in barcode_info:
                 print(f"Detected barcode: {data} ({barcode_type})")
-                search_url = f"https://api.nal.usda.gov/fdc/v1/foods/search?api_key={USDA_API_KEY}"
+                search_url = f"{USDA_SEARCH_URL}?api_key={USDA_API_KEY}"
                 params = {'query': data}
                 response = requests.get(search_url, params=params)
                 if response.status_code == 200:
@@ -76,11 +111,15 @@ else:
                     print(f"Category: {food_item.get('foodCategory', 'N/A')}")
                 else:
                     print(f"Error: {response.status_code}, Could not retrieve data.")
-        
+
         # Break the loop if 'q' is pressed
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
     # Release the webcam and close windows
     cap.release()
-    cv2.destroyAllWindows()
\ No newline at end of file
+    cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    run_webcam_scanner()
@@ -1,16 +1,20 @@
 import os
-import json
 import logging
+from datetime import datetime, timezone
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Request
-from storage.utils import read_pantry_items, write_pantry_items, read_users, soft_delete_pantry_item
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from storage.utils import iter_pantry_items, read_pantry_items, read_pantry_item, write_pantry_items, read_users, soft_delete_pantry_item
 from models.models import InventoryItem, InventoryItemMacros, User  
-from ai.openai_service import openai_client, check_api_key  
-import boto3
 import requests
-from storage.utils import pantry_table
+from storage import async_utils as async_storage
+from storage.async_utils import storage_call, storage_pages
+from storage.clients import get_client
 from auth.auth_service import get_current_user, get_user_id_from_token
 from pantry.barcode_scanner import BarcodeService
+from warmup import register_warmup_hook
+from etags import not_modified
+from serialization import NDJSON_PAGE_SIZE, model_response, ndjson_response, wants_ndjson
+from tracing import hydration_message
 
 # Alias to get_current_user for test overrides
 get_user = get_current_user
@@ -25,64 +29,58 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 # SQS client for hydration jobs
 MACRO_QUEUE_URL = os.getenv("MACRO_QUEUE_URL")
 IMAGE_QUEUE_URL = os.getenv("IMAGE_QUEUE_URL")
-sqs = boto3.client("sqs")
+
+@register_warmup_hook("sqs_client")
+def get_sqs_client():
+    return get_client("sqs")
 
 @pantry_router.get("/items", response_model=List[InventoryItem])
-def get_items(user_id: str = Depends(get_user_id_from_token)) -> List[InventoryItem]:
+async def get_items(request: Request, response: Response, user_id: str = Depends(get_user_id_from_token)) -> List[InventoryItem]:
     """
     Retrieve all pantry items for the authenticated user.
+    Answers If-None-Match with 304 while the pantry is unchanged, and streams
+    NDJSON (one item per line) for Accept: application/x-ndjson.
     """
+    unchanged = await not_modified(request, response, "pantry", user_id, vary_accept=True)
+    if unchanged is not None:
+        return unchanged
     logging.info(f"Fetching pantry items for user ID: {user_id}")
-    items = read_pantry_items(user_id)
-    return items
+    if wants_ndjson(request):
+        pages = storage_pages(iter_pantry_items, async_storage.iter_pantry_items, user_id, NDJSON_PAGE_SIZE)
+        return await ndjson_response(pages, response)
+    items = await storage_call(read_pantry_items, async_storage.read_pantry_items, user_id)
+    return model_response(items, response)
 
 @pantry_router.get("/items/{item_id}", response_model=InventoryItem)
-def get_item(item_id: str, user_id: str = Depends(get_user_id_from_token)) -> InventoryItem:
+async def get_item(item_id: str, user_id: str = Depends(get_user_id_from_token)) -> InventoryItem:
     """
     Retrieve a specific pantry item by its ID for the authenticated user.
     """
     logging.info(f"Fetching item ID: {item_id} for user ID: {user_id}")
-    pk = f"USER#{user_id}"
-    sk = f"PANTRY#{item_id}"
     try:
-        resp = pantry_table.get_item(Key={"PK": pk, "SK": sk})
+        item = await storage_call(read_pantry_item, async_storage.read_pantry_item, user_id, item_id)
     except Exception as e:
         logging.error(f"Error fetching pantry item: {e}")
         raise HTTPException(status_code=500, detail="Error retrieving item")
-    raw = resp.get("Item")
-    if not raw or not raw.get("active", True):
+    if item is None:
         raise HTTPException(status_code=404, detail="Item not found")
-    # Build InventoryItem with macros
-    macros_data = raw.get("macros") or {}
-    macros = InventoryItemMacros(**macros_data) if macros_data else None
-    item = InventoryItem(
-        id=raw["id"],
-        user_id=user_id,
-        product_name=raw.get("product_name", ""),
-        quantity=int(raw.get("quantity", 1)),
-        upc=raw.get("upc"),
-        macros=macros,
-        cost=raw.get("cost", 0),
-        expiration_date=raw.get("expiration_date"),
-        environmental_impact=raw.get("environmental_impact", 0),
-        image_url=raw.get("image_url"),
-        active=raw.get("active", True),
-    )
-    return item
+    return model_response(item)
 
 @pantry_router.post("/items")
 def create_pantry_item(item: InventoryItem, user_id: str = Depends(get_user_id_from_token)):
     """
     Create a new pantry item for the authenticated user.
     """
+    item.created_at = item.created_at or datetime.now(timezone.utc).isoformat()
     try:
         # Save new item record
         write_pantry_items(user_id, [item])
+        sqs = get_sqs_client()
         # Hydration job for macros
         if MACRO_QUEUE_URL:
             sqs.send_message(
                 QueueUrl=MACRO_QUEUE_URL,
-                MessageBody=json.dumps({"jobType":"ITEM","payload":{"user_id":user_id,"item_id":item.id,"item_name":item.product_name}})
+                MessageBody=hydration_message("ITEM", {"user_id":user_id,"item_id":item.id,"item_name":item.product_name})
             )
         else:
             logging.warning("MACRO_QUEUE_URL not set; skipping SQS send_message")
@@ -93,13 +91,10 @@ def create_pantry_item(item: InventoryItem, user_id: str = Depends(get_user_id_f
             if IMAGE_QUEUE_URL:
                 sqs.send_message(
                     QueueUrl=IMAGE_QUEUE_URL,
-                    MessageBody=json.dumps({
-                        "jobType": "IMAGE",
-                        "payload": {
-                            "user_id": user_id,
-                            "item_id": item.id,
-                            "item_name": item.product_name
-                        }
+                    MessageBody=hydration_message("IMAGE", {
+                        "user_id": user_id,
+                        "item_id": item.id,
+                        "item_name": item.product_name
                     })
                 )
             else:
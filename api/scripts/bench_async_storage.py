@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for the async DynamoDB path.
+Starts a local moto server and the API under uvicorn, then fires concurrent
+GET /pantry/items requests with ASYNC_STORAGE off (boto3 on the thread pool)
+and on (aioboto3 on the event loop), reporting throughput and latency.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import boto3
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TABLE_NAME = 'PantryPalBench'
+USER_ID = 'bench'
+
+
+def start_moto(port: int):
+    """Run moto in its own interpreter so it does not share a GIL with the API under test."""
+    proc = subprocess.Popen([sys.executable, '-m', 'moto.server', '-p', str(port)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for_port(port)
+    return proc
+
+
+def wait_for_port(port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return
+        time.sleep(0.1)
+    raise RuntimeError(f"Nothing listening on port {port} after {timeout:.0f}s")
+
+
+def seed_table(endpoint: str, items: int):
+    ddb = boto3.resource('dynamodb', endpoint_url=endpoint, region_name='us-east-1')
+    table = ddb.create_table(
+        TableName=TABLE_NAME,
+        KeySchema=[{'AttributeName': 'PK', 'KeyType': 'HASH'}, {'AttributeName': 'SK', 'KeyType': 'RANGE'}],
+        AttributeDefinitions=[{'AttributeName': 'PK', 'AttributeType': 'S'}, {'AttributeName': 'SK', 'AttributeType': 'S'}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    with table.batch_writer() as batch:
+        for i in range(items):
+            batch.put_item(Item={
+                'PK': f'USER#{USER_ID}', 'SK': f'PANTRY#{i}', 'id': str(i),
+                'product_name': f'Item {i}', 'quantity': 1, 'active': True,
+            })
+
+
+# Child program: serve the app with auth stubbed out for the benchmark user
+API_CHILD = (
+    "import uvicorn; from app import app; from auth.auth_service import get_user_id_from_token; "
+    "app.dependency_overrides[get_user_id_from_token] = lambda: {user!r}; "
+    "uvicorn.run(app, port={port}, log_level='warning')"
+)
+
+
+def start_api(port: int, async_storage: bool):
+    env = {**os.environ, 'ASYNC_STORAGE': 'true' if async_storage else 'false', 'PYTHONPATH': API_DIR}
+    proc = subprocess.Popen([sys.executable, '-c', API_CHILD.format(user=USER_ID, port=port)],
+                            cwd=API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for_port(port)
+    return proc
+
+
+async def fire(url: str, total: int, concurrency: int):
+    """Send ``total`` GETs with at most ``concurrency`` in flight; return (elapsed s, latencies ms)."""
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        async def one():
+            async with gate:
+                start = time.perf_counter()
+                resp = await client.get(url)
+                resp.raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return time.perf_counter() - start, latencies
+
+
+def report(label: str, elapsed: float, latencies):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"   {label:<14}{len(latencies) / elapsed:>10.0f}{p50:>10.1f}{p99:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare threaded boto3 vs aioboto3 storage under concurrency')
+    parser.add_argument('--requests', type=int, default=500, help='Total requests per mode')
+    parser.add_argument('--concurrency', type=int, default=500, help='Requests in flight at once')
+    parser.add_argument('--items', type=int, default=20, help='Pantry items seeded for the user')
+    parser.add_argument('--moto-port', type=int, default=5056, help='Local moto server port')
+    parser.add_argument('--api-port', type=int, default=8765, help='Local API port')
+
+    args = parser.parse_args()
+
+    endpoint = f'http://127.0.0.1:{args.moto_port}'
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    os.environ['AWS_ENDPOINT_URL'] = endpoint
+    os.environ['PANTRY_TABLE_NAME'] = TABLE_NAME
+    os.environ.setdefault('AUTH_TABLE_NAME', 'AuthTable')
+
+    moto = start_moto(args.moto_port)
+    try:
+        seed_table(endpoint, args.items)
+        url = f'http://127.0.0.1:{args.api_port}/pantry/items'
+
+        print(f"📊 {args.requests} GET /pantry/items, {args.concurrency} in flight, {args.items} items each")
+        print(f"   {'storage':<14}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for label, enabled in (('threaded', False), ('async', True)):
+            api = start_api(args.api_port, enabled)
+            try:
+                asyncio.run(fire(url, 20, 5))  # warm clients and connection pools
+                elapsed, latencies = asyncio.run(fire(url, args.requests, args.concurrency))
+                report(label, elapsed, latencies)
+            finally:
+                api.terminate()
+                api.wait()
+    finally:
+        moto.terminate()
+        moto.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Per-request JWT auth overhead benchmark.
+Signs an ID token with a throwaway RSA key and times get_current_user three
+ways: (a) the old path (scan the JWKS and parse the JWK on every call),
+(b) pre-parsed keys without the claims cache, and (c) the verified-claims
+cache hit that repeat requests with the same token take.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_token(pool_id: str, client_id: str, region: str):
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from jose import jwk, jwt
+
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                serialization.NoEncryption())
+    public = jwk.construct(private.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo), 'RS256').to_dict()
+    # Cognito pools publish two keys; put ours last so the old scan walks the list
+    jwks = {'keys': [{**public, 'kid': 'other', 'alg': 'RS256'}, {**public, 'kid': 'k1', 'alg': 'RS256'}]}
+    claims = {'sub': 'bench-user', 'aud': client_id, 'iss': f"https://cognito-idp.{region}.amazonaws.com/{pool_id}",
+              'exp': int(time.time()) + 3600}
+    return jwt.encode(claims, pem, algorithm='RS256', headers={'kid': 'k1'}), jwks
+
+
+def legacy_verify(token: str, jwks: dict, auth_service):
+    """The pre-cache verification: linear kid scan and a dict JWK parsed inside jwt.decode."""
+    from jose import jwt
+    kid = jwt.get_unverified_header(token).get('kid')
+    key = next((k for k in jwks['keys'] if k['kid'] == kid), None)
+    return jwt.decode(token, key, algorithms=['RS256'], audience=auth_service.client_id,
+                      issuer=f"https://cognito-idp.{auth_service.region}.amazonaws.com/{auth_service.user_pool_id}")
+
+
+def time_calls(fn, n: int):
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare JWT auth cost with and without the claims cache')
+    parser.add_argument('--requests', type=int, default=2000, help='Calls per variant')
+
+    args = parser.parse_args()
+
+    os.environ.setdefault('COGNITO_USER_POOL_ID', 'us-east-1_bench')
+    os.environ.setdefault('COGNITO_USER_POOL_CLIENT_ID', 'bench-client')
+    from auth import auth_service
+    from auth.claims_cache import claims_cache
+
+    token, jwks = make_token(auth_service.user_pool_id, auth_service.client_id, auth_service.region)
+    auth_service.jwks_provider.install(jwks)
+    request = SimpleNamespace(headers={'Authorization': f'Bearer {token}'})
+    loop = asyncio.new_event_loop()
+
+    def uncached():
+        claims_cache.clear()
+        loop.run_until_complete(auth_service.get_current_user(request))
+
+    def cached():
+        loop.run_until_complete(auth_service.get_current_user(request))
+
+    async def legacy_call():
+        return legacy_verify(token, jwks, auth_service)
+
+    # Every variant pays the same event-loop round trip
+    variants = (
+        ('legacy', lambda: loop.run_until_complete(legacy_call())),
+        ('parsed keys', uncached),
+        ('cache hit', cached),
+    )
+    print(f"📊 {args.requests} get_current_user calls per variant (µs)")
+    print(f"   {'variant':<14}{'p50':>10}{'p99':>10}{'mean':>10}")
+    for label, fn in variants:
+        fn()  # warm up: key parsing, imports, first cache fill
+        latencies = sorted(time_calls(fn, args.requests))
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"   {label:<14}{statistics.median(latencies):>10.1f}{p99:>10.1f}{statistics.mean(latencies):>10.1f}")
+    loop.close()
+    print("✅ Done")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for the shared AWS client registry.
+Starts a local moto server, then hammers DynamoDB GetItem from a thread pool
+using (a) a botocore-default client and (b) a registry client, and reports
+throughput and latency percentiles for each.
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.config import Config
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TABLE_NAME = 'PantryPalBench'
+
+
+class PoolFullCounter(logging.Filter):
+    """Counts urllib3 'Connection pool is full' warnings (each is a discarded connection)."""
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def filter(self, record):
+        if 'Connection pool is full' in record.getMessage():
+            self.count += 1
+            return False
+        return True
+
+
+def start_moto(port: int):
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    from moto.server import ThreadedMotoServer
+    server = ThreadedMotoServer(port=port)
+    server.start()
+    return server
+
+
+def create_table(endpoint: str):
+    ddb = boto3.client('dynamodb', endpoint_url=endpoint, region_name='us-east-1')
+    ddb.create_table(
+        TableName=TABLE_NAME,
+        KeySchema=[{'AttributeName': 'PK', 'KeyType': 'HASH'}, {'AttributeName': 'SK', 'KeyType': 'RANGE'}],
+        AttributeDefinitions=[{'AttributeName': 'PK', 'AttributeType': 'S'}, {'AttributeName': 'SK', 'AttributeType': 'S'}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    ddb.put_item(TableName=TABLE_NAME, Item={'PK': {'S': 'USER#bench'}, 'SK': {'S': 'PANTRY#1'}})
+
+
+def run(client, threads: int, requests_per_thread: int):
+    """Issue GetItem calls from ``threads`` workers; return (elapsed s, latencies ms)."""
+    def worker(_):
+        latencies = []
+        for _ in range(requests_per_thread):
+            start = time.perf_counter()
+            client.get_item(TableName=TABLE_NAME, Key={'PK': {'S': 'USER#bench'}, 'SK': {'S': 'PANTRY#1'}})
+            latencies.append((time.perf_counter() - start) * 1000)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(worker, range(threads)))
+    elapsed = time.perf_counter() - start
+    return elapsed, [lat for chunk in results for lat in chunk]
+
+
+def report(label: str, elapsed: float, latencies, discarded: int):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"   {label:<10}{len(latencies) / elapsed:>12.0f}{p50:>10.1f}{p99:>10.1f}{discarded:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare default vs registry boto3 pools under concurrency')
+    parser.add_argument('--threads', type=int, default=40, help='Concurrent threads (FastAPI default pool is 40)')
+    parser.add_argument('--requests', type=int, default=50, help='Requests per thread')
+    parser.add_argument('--port', type=int, default=5055, help='Local moto server port')
+
+    args = parser.parse_args()
+
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+    endpoint = f'http://127.0.0.1:{args.port}'
+    server = start_moto(args.port)
+    try:
+        create_table(endpoint)
+        from storage.clients import client_config
+
+        default_client = boto3.client('dynamodb', endpoint_url=endpoint, region_name='us-east-1', config=Config())
+        registry_client = boto3.client('dynamodb', endpoint_url=endpoint, region_name='us-east-1',
+                                       config=client_config('dynamodb'))
+
+        # Warm both pools once so neither pays TLS/model setup in the timed run
+        run(default_client, 1, 5)
+        run(registry_client, 1, 5)
+
+        pool_full = PoolFullCounter()
+        logging.getLogger('urllib3.connectionpool').addFilter(pool_full)
+
+        print(f"📊 {args.threads} threads x {args.requests} GetItem calls against moto")
+        print(f"   {'client':<10}{'req/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'discarded':>12}")
+        for label, client in (('default', default_client), ('registry', registry_client)):
+            pool_full.count = 0
+            elapsed, latencies = run(client, args.threads, args.requests)
+            report(label, elapsed, latencies, pool_full.count)
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
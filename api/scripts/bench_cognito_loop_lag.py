@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Event-loop lag under a login burst.
+Runs moto's cognito-idp server in its own process, adds a fixed delay to every
+Cognito response (a slow upstream), then fires concurrent logins while a probe
+coroutine measures how late the event loop wakes it. Compares calling the
+blocking boto3 client inline (the old route code) with the auth routes,
+which run Cognito calls on their own bounded pool.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = 'Passw0rd!bench'
+
+
+def start_moto(port: int):
+    """Run moto in its own interpreter so its CPU work does not share a GIL with the loop under test."""
+    proc = subprocess.Popen([sys.executable, '-m', 'moto.server', '-p', str(port)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return proc
+        time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError(f"moto did not start on port {port}")
+
+
+async def probe(lags: list, stop: asyncio.Event, interval: float = 0.005):
+    """Sleep ``interval`` repeatedly and record how late each wake-up is (ms)."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def burst(login, users: list):
+    lags, stop = [], asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+    await asyncio.sleep(0.02)
+    start = time.perf_counter()
+    await asyncio.gather(*(login(user) for user in users))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe_task
+    return elapsed, sorted(lags)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure event-loop lag during concurrent Cognito logins')
+    parser.add_argument('--logins', type=int, default=40, help='Concurrent logins per burst')
+    parser.add_argument('--delay-ms', type=int, default=50, help='Simulated Cognito response time')
+    parser.add_argument('--port', type=int, default=5057, help='Local moto server port')
+
+    args = parser.parse_args()
+
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+    os.environ.setdefault('PANTRY_TABLE_NAME', 'PantryPal')
+    os.environ.setdefault('AUTH_TABLE_NAME', 'AuthTable')
+    # The client registry picks the endpoint up from boto3's per-service endpoint variable
+    os.environ['AWS_ENDPOINT_URL_COGNITO_IDENTITY_PROVIDER'] = f'http://127.0.0.1:{args.port}'
+    moto = start_moto(args.port)
+    try:
+        import boto3
+        region = os.getenv('AWS_REGION', 'us-east-1')
+        idp = boto3.client('cognito-idp', region_name=region)
+        pool_id = idp.create_user_pool(PoolName='bench')['UserPool']['Id']
+        client_id = idp.create_user_pool_client(UserPoolId=pool_id, ClientName='bench',
+                                                ExplicitAuthFlows=['USER_PASSWORD_AUTH'])['UserPoolClient']['ClientId']
+        users = [f'user{i}' for i in range(args.logins)]
+        for user in users:
+            idp.sign_up(ClientId=client_id, Username=user, Password=PASSWORD)
+            idp.admin_confirm_sign_up(UserPoolId=pool_id, Username=user)
+
+        os.environ['COGNITO_USER_POOL_ID'] = pool_id
+        os.environ['COGNITO_USER_POOL_CLIENT_ID'] = client_id
+        from auth import auth_service
+        from auth.cognito import cognito_stats, get_cognito_client
+
+        def slow_upstream(**kwargs):
+            time.sleep(args.delay_ms / 1000)
+        get_cognito_client().meta.events.register('before-send.cognito-idp', slow_upstream)
+
+        async def inline_login(user):
+            get_cognito_client().initiate_auth(ClientId=client_id, AuthFlow='USER_PASSWORD_AUTH',
+                                               AuthParameters={'USERNAME': user, 'PASSWORD': PASSWORD})
+
+        async def route_login(user):
+            await auth_service.login_user(auth_service.LoginModel(username=user, password=PASSWORD))
+
+        import logging
+        logging.disable(logging.INFO)
+        print(f"📊 {args.logins} concurrent logins, Cognito responding in {args.delay_ms} ms")
+        print(f"   {'variant':<10}{'burst s':>9}{'lag p50':>10}{'lag p99':>10}{'lag max':>10}{'probes':>8}")
+        for label, login in (('inline', inline_login), ('pool', route_login)):
+            elapsed, lags = asyncio.run(burst(login, users))
+            p99 = lags[int(len(lags) * 0.99) - 1] if len(lags) > 1 else lags[-1]
+            print(f"   {label:<10}{elapsed:>9.2f}{statistics.median(lags):>10.1f}{p99:>10.1f}"
+                  f"{lags[-1]:>10.1f}{len(lags):>8}")
+        call = cognito_stats()['initiate_auth']
+        print(f"   pool initiate_auth: queue p95 {call['queue_ms']['p95']} ms, call p95 {call['call_ms']['p95']} ms")
+    finally:
+        moto.terminate()
+        moto.wait()
+    print("✅ Done")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Overhead of the in-process metrics.
+Measures, per request or call:
+(a) an ASGI app returning a small JSON body, bare vs wrapped in MetricsMiddleware,
+(b) a DynamoDB GetItem on a boto3 client, plain vs with the registry's
+    before-call/after-call timing hooks (responses are canned in before-send,
+    so the number is botocore's own work plus the hooks, not the network),
+    and the two hook handlers on their own,
+(c) a dependency_span() around an empty block, and
+(d) rendering /metrics with the series that produced.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def small_app(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 200, 'headers': [(b'content-type', b'application/json')]})
+    await send({'type': 'http.response.body', 'body': b'{"ok":true}'})
+
+
+class FakeRoute:
+    path = '/pantry/items'
+
+
+def asgi_us_per_request(app, requests: int) -> float:
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        pass
+
+    async def run():
+        start = time.perf_counter()
+        for _ in range(requests):
+            scope = {'type': 'http', 'method': 'GET', 'path': '/pantry/items', 'route': FakeRoute}
+            await app(scope, receive, send)
+        return (time.perf_counter() - start) / requests * 1e6
+    return asyncio.run(run())
+
+
+def canned_dynamodb_client():
+    import boto3
+    from botocore.awsrequest import AWSResponse
+
+    class Raw:
+        def stream(self, **kwargs):
+            yield b'{"Item": {"PK": {"S": "USER#bench"}}}'
+
+    def canned(request, **kwargs):
+        return AWSResponse(request.url, 200, {'x-amzn-requestid': 'bench'}, Raw())
+
+    client = boto3.client('dynamodb', region_name='us-east-1', aws_access_key_id='bench',
+                          aws_secret_access_key='bench')
+    client.meta.events.register('before-send.dynamodb', canned)
+    return client
+
+
+def set_hooks(client, enabled: bool) -> None:
+    from metrics import instrument_botocore
+    if enabled:
+        instrument_botocore(client)
+        return
+    for event in ('before-call', 'after-call', 'after-call-error'):
+        client.meta.events.unregister(event, unique_id=f'metrics-{event}')
+
+
+def us_per_call(fn, calls: int, rounds: int = 5) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        samples.append((time.perf_counter() - start) / calls * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the overhead of request and dependency metrics')
+    parser.add_argument('--requests', type=int, default=20000, help='ASGI requests per variant')
+    parser.add_argument('--calls', type=int, default=2000, help='GetItem calls per round')
+
+    args = parser.parse_args()
+
+    from metrics import MetricsMiddleware, dependency_span, render_metrics
+
+    print("📊 Metrics overhead (µs, median)")
+    bare = min(asgi_us_per_request(small_app, args.requests) for _ in range(3))
+    wrapped = min(asgi_us_per_request(MetricsMiddleware(small_app), args.requests) for _ in range(3))
+    print(f"   ASGI request      bare {bare:8.2f}   with middleware {wrapped:8.2f}   (+{wrapped - bare:.2f})")
+
+    key = {'PK': {'S': 'USER#bench'}, 'SK': {'S': 'VERSION'}}
+    client = canned_dynamodb_client()
+    get_item = lambda: client.get_item(TableName='PantryPal', Key=key)
+    us_per_call(get_item, 200, rounds=1)  # warm the model and endpoint caches
+    samples = {'plain': [], 'timed': []}
+    for _ in range(7):
+        # Same client with the hooks toggled, alternating so drift hits both alike
+        for label in samples:
+            set_hooks(client, label == 'timed')
+            samples[label].append(us_per_call(get_item, args.calls, rounds=1))
+    plain_us, timed_us = statistics.median(samples['plain']), statistics.median(samples['timed'])
+    print(f"   DynamoDB GetItem  plain {plain_us:7.2f}   with hooks {timed_us:13.2f}   (+{timed_us - plain_us:.2f})")
+
+    # The end-to-end difference is within this sandbox's noise, so also time the handlers alone
+    from types import SimpleNamespace
+    from metrics import _after_aws_call, _before_aws_call
+    model = SimpleNamespace(name='GetItem', service_model=SimpleNamespace(service_name='dynamodb'))
+    response = SimpleNamespace(status_code=200)
+
+    def hook_pair():
+        context = {}
+        _before_aws_call(model=model, context=context)
+        _after_aws_call(http_response=response, context=context)
+    print(f"   botocore hooks    {us_per_call(hook_pair, args.requests):.2f} per call (handlers alone)")
+
+    def empty_span():
+        with dependency_span('bench', 'noop'):
+            pass
+    print(f"   dependency_span   {us_per_call(empty_span, args.requests):.2f} per span")
+
+    start = time.perf_counter()
+    text = render_metrics()
+    print(f"   /metrics render   {(time.perf_counter() - start) * 1000:.2f} ms for {len(text.splitlines())} lines")
+    print("✅ Done")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Prompt size benchmark for the token-budgeted meal suggestion prompt.
+Builds prompts for synthetic pantries of several sizes with (a) the old
+list-every-item format and (b) the budgeted builder, and reports prompt
+tokens and build time for each. With --live, each prompt is also sent to
+OpenAI and the end-to-end completion latency is reported.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FOODS = ['chicken breast', 'brown rice', 'black beans', 'greek yogurt', 'spinach', 'oats', 'almond butter',
+         'salmon fillet', 'sweet potato', 'cheddar cheese', 'eggs', 'whole wheat pasta', 'broccoli', 'tofu',
+         'lentils', 'banana', 'olive oil', 'ground turkey', 'quinoa', 'cottage cheese']
+
+
+def synthetic_pantry(size: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    items = []
+    for i in range(size):
+        items.append({
+            'product_name': f"{rng.choice(FOODS)} #{i}",
+            'quantity': rng.randint(1, 4),
+            'expiration_date': (now + timedelta(days=rng.randint(-3, 60))).date().isoformat(),
+            'created_at': (now - timedelta(days=rng.randint(0, 120))).isoformat(),
+            'macros': {
+                'calories': rng.randint(20, 600), 'protein': round(rng.uniform(0, 40), 2),
+                'carbohydrates': round(rng.uniform(0, 80), 2), 'fat': round(rng.uniform(0, 30), 2),
+                'fiber': round(rng.uniform(0, 10), 2), 'sugar': round(rng.uniform(0, 25), 2),
+                'sodium': rng.randint(0, 900), 'cholesterol': rng.randint(0, 120), 'potassium': rng.randint(0, 600),
+                'calcium': rng.randint(0, 300), 'iron': round(rng.uniform(0, 5), 2),
+            },
+        })
+    return items
+
+
+def legacy_meal_prompt(items, goals) -> str:
+    """The pre-budget format: every item with every non-zero macro."""
+    item_details = ""
+    for item in items:
+        macros_str = ", ".join(f"{key}: {value}" for key, value in item['macros'].items() if value)
+        item_details += f"- {item['product_name']}: {macros_str}\n"
+    return (
+        "Using the following pantry items with their nutritional information, create meal suggestions that meet the specified daily macro goals.\n"
+        f"Daily Macro Goals:\nCalories: {goals.calories}, Protein: {goals.protein}g, "
+        f"Carbohydrates: {goals.carbohydrates}g, Fat: {goals.fat}g\n\nPantry Items:\n{item_details}"
+    )
+
+
+def time_build(build, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        prompt = build()
+        timings.append((time.perf_counter() - start) * 1000)
+    return prompt, statistics.median(timings)
+
+
+def live_latency(prompt: str, max_tokens: int) -> float:
+    from ai.client import get_openai_client, openai_model
+    start = time.perf_counter()
+    get_openai_client().chat.completions.create(
+        model=openai_model, messages=[{'role': 'user', 'content': prompt}], max_tokens=max_tokens)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare full vs token-budgeted meal suggestion prompts')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 500, 2000], help='Pantry sizes')
+    parser.add_argument('--budget', type=int, help='Item token budget (default PROMPT_ITEM_TOKEN_BUDGET)')
+    parser.add_argument('--repeat', type=int, default=5, help='Builds per measurement (median reported)')
+    parser.add_argument('--live', action='store_true', help='Also time a real OpenAI completion per prompt')
+    parser.add_argument('--max-tokens', type=int, default=300, help='Completion tokens for --live calls')
+
+    args = parser.parse_args()
+
+    if args.live and not os.environ.get('OPENAI_API_KEY'):
+        print("❌ --live needs OPENAI_API_KEY")
+        sys.exit(1)
+    # The prompt builders live in the API module, which checks its config at import
+    os.environ['OPENAI_API_KEY'] = os.environ.get('OPENAI_API_KEY') or 'unused'
+    os.environ.setdefault('PANTRY_TABLE_NAME', 'PantryPal')
+    os.environ.setdefault('AUTH_TABLE_NAME', 'AuthTable')
+    from ai import openai_service
+    from ai.prompt_budget import PROMPT_ITEM_TOKEN_BUDGET, count_tokens
+    from models.models import InventoryItemMacros
+
+    budget = args.budget or PROMPT_ITEM_TOKEN_BUDGET
+    goals = InventoryItemMacros(calories=2200, protein=160, carbohydrates=220, fat=70)
+
+    print(f"📊 Meal suggestion prompt, item budget {budget} tokens")
+    header = f"   {'items':>6}{'full tok':>10}{'full ms':>9}{'budget tok':>12}{'budget ms':>11}{'listed':>8}"
+    if args.live:
+        header += f"{'full e2e ms':>13}{'budget e2e ms':>15}"
+    print(header)
+    for size in args.sizes:
+        items = synthetic_pantry(size)
+        full, full_ms = time_build(lambda: legacy_meal_prompt(items, goals), args.repeat)
+        budgeted, budget_ms = time_build(
+            lambda: openai_service.generate_meal_suggestion_prompt(items, goals, token_budget=budget), args.repeat)
+        listed = sum(1 for line in budgeted.splitlines() if line.startswith('- '))
+        row = (f"   {size:>6}{count_tokens(full):>10}{full_ms:>9.1f}"
+               f"{count_tokens(budgeted):>12}{budget_ms:>11.1f}{listed:>8}")
+        if args.live:
+            row += f"{live_latency(full, args.max_tokens):>13.0f}{live_latency(budgeted, args.max_tokens):>15.0f}"
+        print(row)
+    print("✅ Done")
+
+
+if __name__ == '__main__':
+    main()
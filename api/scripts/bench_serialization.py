@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for GET /pantry/items.
+Serves synthetic pantries (every macro a Decimal, as read from DynamoDB)
+through three versions of the route and reports CPU time per response:
+(a) response_model + FastAPI's default JSONResponse (the old route),
+(b) the same route rendered by orjson (jsonable_encoder still runs), and
+(c) the app's real route, which hands its models to the orjson fast path.
+Storage and auth are stubbed, so the numbers are validation/encoding/rendering
+plus the in-process ASGI round trip. With --stream, the fast path is also
+compared with Accept: application/x-ndjson on peak traced memory and time to
+first byte, with the stubbed storage building items only as they're read.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from decimal import Decimal
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MACROS = ['calories', 'protein', 'carbohydrates', 'fiber', 'sugar', 'fat', 'saturated_fat', 'polyunsaturated_fat',
+          'monounsaturated_fat', 'trans_fat', 'cholesterol', 'sodium', 'potassium', 'vitamin_a', 'vitamin_c',
+          'calcium', 'iron']
+
+
+def synthetic_pantry(size: int, seed: int = 7, start: int = 0) -> list:
+    from models.models import InventoryItem, InventoryItemMacros
+    rng = random.Random(seed + start)
+    return [
+        InventoryItem(
+            id=f"item-{i}", user_id='bench', product_name=f"Item {i}", quantity=rng.randint(1, 4),
+            cost=Decimal(str(round(rng.uniform(0.5, 20), 2))),
+            environmental_impact=Decimal(str(round(rng.uniform(0, 5), 3))),
+            macros=InventoryItemMacros(**{m: Decimal(str(round(rng.uniform(0, 300), 2))) for m in MACROS}),
+            created_at='2024-05-01T12:00:00+00:00',
+        )
+        for i in range(start, start + size)
+    ]
+
+
+def stream_profile(app, headers: dict) -> tuple:
+    """Return (peak traced KB, ms to first body chunk, total ms) for one /pantry/items request.
+
+    Drives the ASGI app directly and drops each chunk once sent (TestClient would
+    buffer the whole body, hiding what streaming saves).
+    """
+    # spec_version 2.4: disconnects surface as send() errors, so receive() isn't polled
+    scope = {'type': 'http', 'asgi': {'version': '3.0', 'spec_version': '2.4'}, 'http_version': '1.1', 'method': 'GET',
+             'scheme': 'http', 'path': '/pantry/items', 'raw_path': b'/pantry/items', 'root_path': '',
+             'query_string': b'', 'server': ('bench', 80), 'client': ('bench', 1),
+             'headers': [(k.lower().encode(), v.encode()) for k, v in headers.items()]}
+    timing = {}
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.body' and message.get('body'):
+            timing.setdefault('first', time.perf_counter())
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    asyncio.run(app(scope, receive, send))
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024, (timing['first'] - start) * 1000, total * 1000
+
+
+def cpu_per_response(client, path: str, runs: int) -> list:
+    samples = []
+    client.get(path)  # warm
+    for _ in range(runs):
+        start = time.process_time()
+        resp = client.get(path)
+        samples.append((time.process_time() - start) * 1000)
+        assert resp.status_code == 200
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure CPU time to serialize /pantry/items responses')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000], help='Pantry sizes to serve')
+    parser.add_argument('--runs', type=int, default=10, help='Requests per variant and size')
+    parser.add_argument('--stream', action='store_true', help='Also compare peak memory and first byte with NDJSON')
+
+    args = parser.parse_args()
+
+    os.environ.setdefault('PANTRY_TABLE_NAME', 'PantryPal')
+    os.environ.setdefault('AUTH_TABLE_NAME', 'AuthTable')
+    os.environ.setdefault('OPENAI_API_KEY', 'bench')
+    import logging
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    import etags
+    import pantry.pantry_service as pantry_service
+    from app import app
+    from models.models import InventoryItem
+    from serialization import FastJSONResponse
+
+    logging.disable(logging.INFO)
+    pantry = {}
+    etags.read_user_version = lambda user_id, scope: 0
+    pantry_service.read_pantry_items = lambda user_id: pantry['items']
+    app.dependency_overrides[pantry_service.get_user_id_from_token] = lambda: 'bench'
+
+    def baseline_app(**kwargs):
+        bench_app = FastAPI(**kwargs)
+
+        @bench_app.get('/pantry/items', response_model=List[InventoryItem])
+        def get_items():
+            return pantry['items']
+        return bench_app
+
+    variants = [
+        ('json + encoder', TestClient(baseline_app())),
+        ('orjson + encoder', TestClient(baseline_app(default_response_class=FastJSONResponse))),
+        ('orjson fast path', TestClient(app)),
+    ]
+    print(f"📊 CPU ms per /pantry/items response ({args.runs} runs)")
+    print(f"   {'items':>6}  {'variant':<18}{'p50':>9}{'min':>9}{'bytes':>11}")
+    for size in args.sizes:
+        pantry['items'] = synthetic_pantry(size)
+        for label, client in variants:
+            samples = cpu_per_response(client, '/pantry/items', args.runs)
+            size_bytes = len(client.get('/pantry/items').content)
+            print(f"   {size:>6}  {label:<18}{statistics.median(samples):>9.1f}{min(samples):>9.1f}{size_bytes:>11}")
+
+    if args.stream:
+        from serialization import NDJSON_MEDIA_TYPE
+
+        def pages(user_id, page_size):
+            for start in range(0, pantry['size'], page_size):
+                yield synthetic_pantry(min(page_size, pantry['size'] - start), start=start)
+        pantry_service.read_pantry_items = lambda user_id: synthetic_pantry(pantry['size'])
+        pantry_service.iter_pantry_items = pages
+        print("📊 JSON array vs NDJSON stream (items built as storage reads them)")
+        print(f"   {'items':>6}  {'variant':<18}{'peak KB':>10}{'first ms':>10}{'total ms':>10}")
+        for size in args.sizes:
+            pantry['size'] = size
+            for label, headers in (('json array', {}), ('ndjson stream', {'Accept': NDJSON_MEDIA_TYPE})):
+                peak, first, total = stream_profile(app, headers)
+                print(f"   {size:>6}  {label:<18}{peak:>10.0f}{first:>10.1f}{total:>10.1f}")
+    print("✅ Done")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Startup profiling script for the Lambda entry points.
+Runs ``python -X importtime`` against each module and reports the total
+import time plus a per-package breakdown, optionally enforcing a budget.
+Each run also records wall-clock init time and peak RSS so entry points
+(e.g. ``app`` vs ``worker``) can be compared side by side.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# storage.utils refuses to import without table names; profiling never touches AWS
+PROFILE_ENV_DEFAULTS = {
+    'PANTRY_TABLE_NAME': 'PantryPal',
+    'AUTH_TABLE_NAME': 'AuthTable',
+    'AWS_DEFAULT_REGION': 'us-east-1',
+}
+
+
+# Child program: import the module, then report wall time and peak RSS on stdout
+CHILD_TEMPLATE = (
+    "import time, resource, json; start = time.perf_counter(); import {module}; "
+    "print(json.dumps({{'wall_ms': (time.perf_counter() - start) * 1000, "
+    "'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))"
+)
+
+
+def run_importtime(module: str) -> Tuple[str, Dict[str, float]]:
+    """Import ``module`` in a fresh interpreter; return the -X importtime log and run stats."""
+    env = {**PROFILE_ENV_DEFAULTS, **os.environ}
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [API_DIR, env.get('PYTHONPATH')]))
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD_TEMPLATE.format(module=module)],
+        cwd=API_DIR, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr}")
+    return proc.stderr, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def parse_importtime(log: str) -> Tuple[int, Dict[str, int]]:
+    """Return (total microseconds, self microseconds per top-level package)."""
+    per_package: Dict[str, int] = defaultdict(int)
+    total = 0
+    for line in log.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _cumulative_us, name = line[len('import time:'):].split('|', 2)
+        package = name.strip().split('.')[0]
+        per_package[package] += int(self_us)
+        total += int(self_us)
+    return total, dict(per_package)
+
+
+def print_report(module: str, total_us: int, per_package: Dict[str, int], top: int):
+    print(f"\n{module}: {total_us / 1000:.1f} ms total import time (median run)")
+    print(f"  {'package':<28}{'ms':>10}{'share':>9}")
+    ranked = sorted(per_package.items(), key=lambda kv: kv[1], reverse=True)
+    for package, self_us in ranked[:top]:
+        share = self_us / total_us if total_us else 0
+        print(f"  {package:<28}{self_us / 1000:>10.1f}{share:>9.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report -X importtime totals per package')
+    parser.add_argument('modules', nargs='*', default=['app'], help='Modules to profile (default: app)')
+    parser.add_argument('--top', type=int, default=15, help='Number of packages to list')
+    parser.add_argument('--budget-ms', type=float, help='Fail if any module exceeds this import time')
+    parser.add_argument('--repeat', type=int, default=3, help='Fresh interpreters per module (median is reported)')
+
+    args = parser.parse_args()
+
+    over_budget: List[str] = []
+    summary = []
+    for module in args.modules:
+        runs = []
+        for _ in range(max(1, args.repeat)):
+            log, stats = run_importtime(module)
+            total_us, per_package = parse_importtime(log)
+            runs.append((total_us, per_package, stats))
+        runs.sort(key=lambda run: run[0])
+        total_us, per_package, _ = runs[len(runs) // 2]
+        print_report(module, total_us, per_package, args.top)
+        summary.append((
+            module,
+            total_us / 1000,
+            statistics.median(run[2]['wall_ms'] for run in runs),
+            max(run[2]['max_rss_kb'] for run in runs) / 1024,
+        ))
+        if args.budget_ms is not None and total_us / 1000 > args.budget_ms:
+            over_budget.append(module)
+
+    print(f"\n📊 Cold start summary:")
+    print(f"   {'module':<20}{'import ms':>12}{'wall ms':>12}{'peak RSS MB':>14}")
+    for module, import_ms, wall_ms, rss_mb in summary:
+        print(f"   {module:<20}{import_ms:>12.1f}{wall_ms:>12.1f}{rss_mb:>14.1f}")
+
+    if over_budget:
+        print(f"\n❌ Import budget of {args.budget_ms:.0f} ms exceeded by: {', '.join(over_budget)}")
+        sys.exit(1)
+    if args.budget_ms is not None:
+        print(f"\n✅ All modules within the {args.budget_ms:.0f} ms import budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import os
+from decimal import Decimal
+from typing import Any, AsyncIterator, Optional
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+# ─── JSON Responses ──────────────────────────────────────────────────────────────
+# Every pantry item carries ~20 Decimal fields (cost, environmental impact, the
+# macros). FastAPI's jsonable_encoder converts them one by one through its
+# generic path before the response class renders the result. The app renders
+# with orjson instead, and hot list routes hand their models straight to
+# model_response(), which skips the encoder pass entirely: models become dicts
+# via .dict() and orjson calls encode_default() only for the Decimals.
+#
+# Clients that send Accept: application/x-ndjson get list routes as a stream
+# instead: one JSON object per line, fed page by page from storage, so memory
+# stays at one page however large the pantry is and the first rows go out as
+# soon as the first page is read. That holds where the app runs under an ASGI
+# server (uvicorn locally or in a container). The Lambda deployment in
+# template.yaml goes through Mangum without response streaming, which buffers
+# the whole body: there the client still gets line-by-line parsing, but not
+# the memory or first-byte savings.
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_PAGE_SIZE = int(os.getenv("NDJSON_PAGE_SIZE", "100"))
+
+
+def encode_default(obj: Any):
+    """orjson fallback for types it doesn't know; Decimals encode like FastAPI's (int if integral)."""
+    if isinstance(obj, Decimal):
+        exponent = obj.as_tuple().exponent
+        return int(obj) if isinstance(exponent, int) and exponent >= 0 else float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class for the app: JSONResponse rendered by orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=encode_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def model_response(content: Any, response: Optional[Response] = None) -> FastJSONResponse:
+    """Render models (or lists of them) directly, skipping response_model validation and jsonable_encoder.
+
+    Only for content that already is the route's response model, such as records
+    read from storage. Headers set on the injected ``response`` are kept.
+    """
+    return FastJSONResponse(content, headers=dict(response.headers) if response is not None else None)
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def ndjson_response(pages: AsyncIterator[list], response: Optional[Response] = None) -> StreamingResponse:
+    """Stream each model from ``pages`` as one NDJSON line; one chunk is sent per page.
+
+    The first page is read before the response starts, so a storage error still
+    becomes an error status rather than a truncated 200. ``pages`` is closed when
+    the stream ends, including when the client disconnects mid-stream. Under
+    Mangum the body is buffered (see above).
+    """
+    first = await anext(pages, [])
+
+    async def lines():
+        try:
+            page = first
+            while True:
+                yield b"".join(orjson.dumps(model, default=encode_default, option=orjson.OPT_APPEND_NEWLINE)
+                               for model in page)
+                page = await anext(pages, None)
+                if page is None:
+                    return
+        finally:
+            await pages.aclose()
+
+    headers = dict(response.headers) if response is not None else None
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE, headers=headers)
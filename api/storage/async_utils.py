@@ -0,0 +1,335 @@
+import os
+import asyncio
+import logging
+from typing import AsyncIterator, Optional
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from models.models import ChatHistory, ChatMeta, InventoryItem, Recipe, User
+from storage.clients import client_config_kwargs
+from metrics import instrument_botocore
+from storage.utils import (
+    PANTRY_TABLE_NAME,
+    AUTH_TABLE_NAME,
+    CHAT_META_PROJECTION,
+    active_rows_query,
+    chat_history_put,
+    change_stamp,
+    changes_query,
+    chat_meta_update,
+    convert_to_decimal,
+    inventory_item_from_record,
+    pantry_record,
+    recipe_record,
+    version_bump,
+    version_read,
+)
+
+# Async mirror of storage/utils.py on aioboto3. Routes use it through
+# storage_call() when ASYNC_STORAGE is on; otherwise the blocking boto3
+# functions run on FastAPI's thread pool exactly as before.
+ASYNC_STORAGE = os.getenv("ASYNC_STORAGE", "false").lower() in ("1", "true", "yes")
+
+_resource = None
+_resource_cm = None
+_resource_loop = None
+_tables: dict = {}
+_init_lock = None
+_init_lock_loop = None
+
+
+def _loop_init_lock(loop) -> asyncio.Lock:
+    # asyncio locks belong to one loop; no await between check and set, so this can't race
+    global _init_lock, _init_lock_loop
+    if _init_lock is None or _init_lock_loop is not loop:
+        _init_lock, _init_lock_loop = asyncio.Lock(), loop
+    return _init_lock
+
+
+async def get_async_dynamodb():
+    """Return the aioboto3 DynamoDB resource bound to the running event loop."""
+    global _resource, _resource_cm, _resource_loop
+    loop = asyncio.get_running_loop()
+    if _resource is not None and _resource_loop is loop:
+        return _resource
+    # A burst of first requests must build one resource, not one per request
+    async with _loop_init_lock(loop):
+        if _resource is None or _resource_loop is not loop:
+            # aioboto3 is only needed for the async path, so import it lazily
+            import aioboto3
+            from aiobotocore.config import AioConfig
+
+            session = aioboto3.Session()
+            resource_cm = session.resource("dynamodb", config=AioConfig(**client_config_kwargs("dynamodb")))
+            resource = await resource_cm.__aenter__()
+            instrument_botocore(resource.meta.client)
+            _resource, _resource_cm, _resource_loop = resource, resource_cm, loop
+            _tables.clear()
+    return _resource
+
+
+async def get_async_table(table_name: str):
+    """Return a cached aioboto3 Table on the shared resource."""
+    resource = await get_async_dynamodb()
+    table = _tables.get(table_name)
+    if table is None:
+        table = await resource.Table(table_name)
+        _tables[table_name] = table
+    return table
+
+
+async def close_async_dynamodb() -> None:
+    """Close the aioboto3 resource (tests and benchmarks that switch loops)."""
+    global _resource, _resource_cm, _resource_loop
+    if _resource_cm is not None:
+        await _resource_cm.__aexit__(None, None, None)
+    _resource = _resource_cm = _resource_loop = None
+    _tables.clear()
+
+
+async def storage_call(sync_fn, async_fn, *args):
+    """Run ``async_fn`` natively when ASYNC_STORAGE is on, else ``sync_fn`` on the thread pool."""
+    if ASYNC_STORAGE:
+        return await async_fn(*args)
+    return await run_in_threadpool(sync_fn, *args)
+
+
+async def storage_pages(sync_gen, async_gen, *args) -> AsyncIterator[list]:
+    """Iterate a paginated storage generator: ``async_gen`` natively when ASYNC_STORAGE
+    is on, else ``sync_gen`` with each page fetched on the thread pool."""
+    pages = async_gen(*args) if ASYNC_STORAGE else iterate_in_threadpool(sync_gen(*args))
+    async for page in pages:
+        yield page
+
+
+# ─── Pantry CRUD ─────────────────────────────────────────────────────────────────
+
+async def iter_active_rows(user_id: str, prefix: str, page_size: Optional[int] = None) -> AsyncIterator[list[dict]]:
+    """Yield pages of active raw rows, following LastEvaluatedKey; ``page_size`` rows are read per query."""
+    table = await get_async_table(PANTRY_TABLE_NAME)
+    cursor = None
+    while True:
+        try:
+            resp = await table.query(**active_rows_query(user_id, prefix, cursor, page_size))
+        except ClientError as e:
+            logging.error("Error querying %s rows: %s", prefix, e.response["Error"]["Message"])
+            raise
+        if resp.get("Items"):
+            yield resp["Items"]
+        cursor = resp.get("LastEvaluatedKey")
+        if cursor is None:
+            return
+
+
+async def iter_pantry_items(user_id: str, page_size: Optional[int] = None) -> AsyncIterator[list[InventoryItem]]:
+    """Yield a user's pantry items a page at a time."""
+    async for rows in iter_active_rows(user_id, "PANTRY#", page_size):
+        yield [inventory_item_from_record(raw, user_id) for raw in rows]
+
+
+async def read_pantry_items(user_id: str) -> list[InventoryItem]:
+    """Fetch all pantry items for a given user_id."""
+    return [item async for page in iter_pantry_items(user_id) for item in page]
+
+
+async def read_pantry_item(user_id: str, item_id: str) -> Optional[InventoryItem]:
+    """Fetch a single active pantry item, or None if missing or soft deleted."""
+    try:
+        table = await get_async_table(PANTRY_TABLE_NAME)
+        resp = await table.get_item(Key={"PK": f"USER#{user_id}", "SK": f"PANTRY#{item_id}"})
+    except ClientError as e:
+        logging.error("Error fetching pantry item: %s", e.response["Error"]["Message"])
+        raise
+    raw = resp.get("Item")
+    if not raw or not raw.get("active", True):
+        return None
+    return inventory_item_from_record(raw, user_id)
+
+
+async def write_pantry_items(user_id: str, items: list[InventoryItem]) -> None:
+    """Batch write a list of InventoryItem for a given user_id."""
+    try:
+        table = await get_async_table(PANTRY_TABLE_NAME)
+        async with table.batch_writer() as batch:
+            for item in items:
+                await batch.put_item(Item=pantry_record(user_id, item))
+        await bump_user_version(user_id, "pantry")
+    except ClientError as e:
+        logging.error("Error writing pantry items: %s", e.response["Error"]["Message"])
+        raise
+
+
+async def soft_delete_pantry_item(user_id: str, item_id: str) -> None:
+    """Mark a pantry item as inactive instead of deleting it."""
+    await _soft_delete(user_id, f"PANTRY#{item_id}")
+    await bump_user_version(user_id, "pantry")
+
+
+# ─── Change Versions ─────────────────────────────────────────────────────────────
+
+async def read_user_version(user_id: str, scope: str) -> int:
+    """Return the change counter for ``scope``; 0 if never written."""
+    try:
+        table = await get_async_table(PANTRY_TABLE_NAME)
+        resp = await table.get_item(**version_read(user_id, scope))
+    except ClientError as e:
+        logging.error("Error reading %s version: %s", scope, e.response["Error"]["Message"])
+        raise
+    return int(resp.get("Item", {}).get(scope, 0))
+
+
+async def bump_user_version(user_id: str, scope: str) -> None:
+    """Record that ``scope`` changed for ``user_id``."""
+    try:
+        table = await get_async_table(PANTRY_TABLE_NAME)
+        await table.update_item(**version_bump(user_id, scope))
+    except ClientError as e:
+        logging.error("Error bumping %s version: %s", scope, e.response["Error"]["Message"])
+        raise
+
+
+# ─── Recipe CRUD ─────────────────────────────────────────────────────────────────
+
+async def iter_recipe_items(user_id: str, page_size: Optional[int] = None) -> AsyncIterator[list[Recipe]]:
+    """Yield a user's recipes a page at a time."""
+    async for rows in iter_active_rows(user_id, "RECIPE#", page_size):
+        yield [Recipe(**raw) for raw in rows]
+
+
+async def read_recipe_items(user_id: str) -> list[Recipe]:
+    """Fetch all recipes for a given user_id."""
+    return [rec async for page in iter_recipe_items(user_id) for rec in page]
+
+
+async def write_recipe_items(user_id: str, items: list[Recipe]) -> None:
+    """Batch write a list of Recipe for a given user_id."""
+    try:
+        table = await get_async_table(PANTRY_TABLE_NAME)
+        async with table.batch_writer() as batch:
+            for rec in items:
+                await batch.put_item(Item=recipe_record(user_id, rec))
+        await bump_user_version(user_id, "recipes")
+    except ClientError as e:
+        logging.error("Error writing recipe items: %s", e.response["Error"]["Message"])
+        raise
+
+
+async def soft_delete_recipe_item(user_id: str, recipe_id: str) -> None:
+    """Mark a recipe as inactive instead of deleting it."""
+    await _soft_delete(user_id, f"RECIPE#{recipe_id}")
+    await bump_user_version(user_id, "recipes")
+
+
+async def _soft_delete(user_id: str, sk: str) -> None:
+    try:
+        table = await get_async_table(PANTRY_TABLE_NAME)
+        await table.update_item(
+            Key={"PK": f"USER#{user_id}", "SK": sk},
+            UpdateExpression="SET #active = :inactive, updated_at = :now",
+            ExpressionAttributeNames={"#active": "active"},
+            ExpressionAttributeValues={":inactive": False, ":now": change_stamp()}
+        )
+        logging.info(f"Soft deleted {sk} for user ID: {user_id}")
+    except ClientError as e:
+        logging.error("Error soft deleting %s: %s", sk, e.response["Error"]["Message"])
+        raise
+
+
+# ─── Chat Metadata CRUD ───────────────────────────────────────────────────────
+
+async def read_chat_meta(user_id: str) -> list[ChatMeta]:
+    """Return chat metadata entries for a user sorted by updatedAt desc."""
+    pk = f"USER#{user_id}"
+    try:
+        table = await get_async_table(PANTRY_TABLE_NAME)
+        resp = await table.query(
+            KeyConditionExpression=Key("PK").eq(pk) & Key("SK").begins_with("CHAT#"),
+            **CHAT_META_PROJECTION,
+        )
+        items = [ChatMeta(**raw) for raw in resp.get("Items", [])]
+        items.sort(key=lambda x: x.updatedAt, reverse=True)
+        return items
+    except ClientError as e:
+        logging.error("Error querying chats: %s", e.response["Error"]["Message"])
+        raise
+
+
+async def upsert_chat_meta(user_id: str, chat: ChatMeta) -> None:
+    """Insert or update a chat metadata record."""
+    try:
+        table = await get_async_table(PANTRY_TABLE_NAME)
+        await table.update_item(Key={"PK": f"USER#{user_id}", "SK": f"CHAT#{chat.id}"}, **chat_meta_update(chat))
+        await bump_user_version(user_id, "chats")
+    except ClientError as e:
+        logging.error("Error writing chat meta: %s", e.response["Error"]["Message"])
+        raise
+
+
+async def read_chat_history(user_id: str, chat_id: str) -> Optional[ChatHistory]:
+    """Fetch a chat with its message window and summary, or None if it doesn't exist."""
+    try:
+        table = await get_async_table(PANTRY_TABLE_NAME)
+        resp = await table.get_item(Key={"PK": f"USER#{user_id}", "SK": f"CHAT#{chat_id}"})
+    except ClientError as e:
+        logging.error("Error fetching chat: %s", e.response["Error"]["Message"])
+        raise
+    raw = resp.get("Item")
+    return ChatHistory(**raw) if raw else None
+
+
+async def write_chat_history(user_id: str, history: ChatHistory, expected_rev: int) -> bool:
+    """Store ``history``; return False if the chat changed since it was read at ``expected_rev``."""
+    try:
+        table = await get_async_table(PANTRY_TABLE_NAME)
+        await table.put_item(**chat_history_put(user_id, history, expected_rev))
+        await bump_user_version(user_id, "chats")
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return False
+        logging.error("Error writing chat: %s", e.response["Error"]["Message"])
+        raise
+
+
+# ─── Delta Sync ──────────────────────────────────────────────────────────────────
+
+async def read_changes(user_id: str, since: Optional[str], cursor: Optional[dict],
+                       limit: int) -> tuple[list[dict], Optional[dict]]:
+    """Return raw rows changed after ``since`` and the key to continue from (None when done)."""
+    rows = []
+    try:
+        table = await get_async_table(PANTRY_TABLE_NAME)
+        while True:
+            resp = await table.query(**changes_query(user_id, since, cursor, limit))
+            rows.extend(resp.get("Items", []))
+            cursor = resp.get("LastEvaluatedKey")
+            if cursor is None or len(rows) >= limit:
+                return rows, cursor
+    except ClientError as e:
+        logging.error("Error querying changes: %s", e.response["Error"]["Message"])
+        raise
+
+
+# ─── Auth CRUD ───────────────────────────────────────────────────────────────────
+
+async def read_users() -> list[User]:
+    """Scan all users from the auth table."""
+    try:
+        table = await get_async_table(AUTH_TABLE_NAME)
+        resp = await table.scan()
+        return [User(**raw) for raw in resp.get("Items", [])]
+    except ClientError as e:
+        logging.error("Error scanning users: %s", e.response["Error"]["Message"])
+        raise
+
+
+async def write_users(users: list[User]) -> None:
+    """Batch write a list of User into the auth table."""
+    try:
+        table = await get_async_table(AUTH_TABLE_NAME)
+        async with table.batch_writer() as batch:
+            for usr in users:
+                await batch.put_item(Item=convert_to_decimal(usr.dict()))
+    except ClientError as e:
+        logging.error("Error writing users: %s", e.response["Error"]["Message"])
+        raise
@@ -0,0 +1,96 @@
+import os
+import threading
+from typing import Dict, Optional, Tuple
+import boto3
+from botocore.config import Config
+from metrics import instrument_botocore
+
+# ─── Client Registry ─────────────────────────────────────────────────────────────
+# One place builds every boto3 client/resource so they share tuned connection
+# pools instead of botocore's defaults (10 connections, legacy retries, 60s reads),
+# and every call they make is timed for /metrics.
+
+MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50"))
+RETRY_MODE = os.getenv("AWS_RETRY_MODE", "adaptive")
+MAX_ATTEMPTS = int(os.getenv("AWS_MAX_ATTEMPTS", "3"))
+
+# (connect_timeout, read_timeout) in seconds; override with e.g. AWS_S3_READ_TIMEOUT
+SERVICE_TIMEOUTS: Dict[str, Tuple[float, float]] = {
+    "dynamodb": (1, 3),
+    "sqs": (1, 5),
+    "s3": (2, 15),
+    "cognito-idp": (2, 5),
+}
+DEFAULT_TIMEOUTS = (2, 10)
+
+_lock = threading.Lock()
+_clients: Dict[Tuple[str, Optional[str]], object] = {}
+_resources: Dict[Tuple[str, Optional[str]], object] = {}
+_tables: Dict[str, object] = {}
+
+
+def _timeout(service_name: str, kind: str, default: float) -> float:
+    env_name = f"AWS_{service_name.upper().replace('-', '_')}_{kind}_TIMEOUT"
+    return float(os.getenv(env_name, default))
+
+
+def client_config_kwargs(service_name: str) -> dict:
+    """Return the pool/retry/timeout settings for ``service_name`` (shared with aiobotocore)."""
+    connect, read = SERVICE_TIMEOUTS.get(service_name, DEFAULT_TIMEOUTS)
+    return dict(
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        retries={"mode": RETRY_MODE, "max_attempts": MAX_ATTEMPTS},
+        connect_timeout=_timeout(service_name, "CONNECT", connect),
+        read_timeout=_timeout(service_name, "READ", read),
+    )
+
+
+def client_config(service_name: str) -> Config:
+    """Return the botocore Config used for ``service_name``."""
+    return Config(tcp_keepalive=True, **client_config_kwargs(service_name))
+
+
+def get_client(service_name: str, region_name: Optional[str] = None):
+    """Return the shared low-level client for ``service_name``, creating it on first use."""
+    key = (service_name, region_name)
+    client = _clients.get(key)
+    if client is None:
+        # boto3's default session is not thread safe while creating clients
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = boto3.client(service_name, region_name=region_name, config=client_config(service_name))
+                instrument_botocore(client)
+                _clients[key] = client
+    return client
+
+
+def get_resource(service_name: str, region_name: Optional[str] = None):
+    """Return the shared boto3 resource for ``service_name``, creating it on first use."""
+    key = (service_name, region_name)
+    resource = _resources.get(key)
+    if resource is None:
+        with _lock:
+            resource = _resources.get(key)
+            if resource is None:
+                resource = boto3.resource(service_name, region_name=region_name, config=client_config(service_name))
+                instrument_botocore(resource.meta.client)
+                _resources[key] = resource
+    return resource
+
+
+def get_table(table_name: str):
+    """Return a cached DynamoDB Table on the shared resource (Table() costs ~0.5ms to build)."""
+    table = _tables.get(table_name)
+    if table is None:
+        table = get_resource("dynamodb").Table(table_name)
+        _tables[table_name] = table
+    return table
+
+
+def reset_clients() -> None:
+    """Drop every cached client/resource (tests and benchmarks that swap endpoints)."""
+    with _lock:
+        _clients.clear()
+        _resources.clear()
+        _tables.clear()
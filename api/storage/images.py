@@ -0,0 +1,175 @@
+import os
+import logging
+import threading
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from typing import Dict, Optional
+import requests
+from botocore.exceptions import ClientError
+from storage.clients import get_client
+
+# ─── Image Pipeline ──────────────────────────────────────────────────────────────
+# Downloads are streamed to a spooled temp file, resized variants are rendered
+# on a small thread pool (Pillow releases the GIL while resizing/encoding), and
+# everything is uploaded with upload_fileobj so large originals go multipart.
+
+IMAGE_BUCKET_NAME = os.getenv("IMAGE_BUCKET_NAME", "ppal-images")
+
+# Longest edge in pixels for each variant; "original" is stored as downloaded
+IMAGE_VARIANTS = {"thumb": 128, "medium": 512}
+VARIANT_FORMAT = os.getenv("IMAGE_VARIANT_FORMAT", "WEBP").upper()  # WEBP or JPEG
+VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", "80"))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "4"))
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", str(15 * 1024 * 1024)))
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+SPOOL_MAX_BYTES = 1024 * 1024  # keep small images in memory, spill larger ones to /tmp
+
+CONTENT_TYPE_EXTENSIONS = {"image/png": "png", "image/jpeg": "jpg", "image/webp": "webp", "image/gif": "gif"}
+FORMAT_CONTENT_TYPES = {"WEBP": "image/webp", "JPEG": "image/jpeg"}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_bucket_checked = False
+
+
+def get_s3_client():
+    return get_client("s3")
+
+
+def get_image_executor() -> ThreadPoolExecutor:
+    """Return the shared pool that renders and uploads variants."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image")
+    return _executor
+
+
+@lru_cache()
+def get_transfer_config():
+    from boto3.s3.transfer import TransferConfig
+    return TransferConfig(multipart_threshold=8 * 1024 * 1024, multipart_chunksize=8 * 1024 * 1024,
+                          max_concurrency=IMAGE_WORKERS)
+
+
+def ensure_image_bucket() -> None:
+    """Create the image bucket if missing; checked once per process, not per upload."""
+    global _bucket_checked
+    if _bucket_checked:
+        return
+    s3 = get_s3_client()
+    try:
+        s3.head_bucket(Bucket=IMAGE_BUCKET_NAME)
+    except ClientError as e:
+        # head_bucket reports a missing bucket as a bare 404, never NoSuchBucket
+        if e.response["Error"]["Code"] not in ("404", "NoSuchBucket"):
+            raise
+        logging.info(f"Creating S3 bucket {IMAGE_BUCKET_NAME}")
+        s3.create_bucket(Bucket=IMAGE_BUCKET_NAME)
+    _bucket_checked = True
+
+
+def public_url(key: str) -> str:
+    return f"https://{IMAGE_BUCKET_NAME}.s3.amazonaws.com/{key}"
+
+
+def variant_keys(prefix: str, original_ext: str) -> Dict[str, str]:
+    """Return the S3 key of every variant stored under ``prefix``."""
+    ext = "webp" if VARIANT_FORMAT == "WEBP" else "jpg"
+    keys = {name: f"{prefix}/{name}.{ext}" for name in IMAGE_VARIANTS}
+    keys["original"] = f"{prefix}/original.{original_ext}"
+    return keys
+
+
+def variant_urls(prefix: str, original_ext: str) -> Dict[str, str]:
+    """Return the public URL of every variant stored under ``prefix``."""
+    return {name: public_url(key) for name, key in variant_keys(prefix, original_ext).items()}
+
+
+def download_image(url: str, timeout: float = 10):
+    """Stream ``url`` into a spooled temp file; return (file positioned at 0, content type)."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    with requests.get(url, stream=True, timeout=timeout) as resp:
+        resp.raise_for_status()
+        size = 0
+        for chunk in resp.iter_content(DOWNLOAD_CHUNK_BYTES):
+            size += len(chunk)
+            if size > MAX_IMAGE_BYTES:
+                spool.close()
+                raise ValueError(f"Image at {url} exceeds {MAX_IMAGE_BYTES} bytes")
+            spool.write(chunk)
+        content_type = resp.headers.get("Content-Type", "image/jpeg").split(";")[0].strip()
+    spool.seek(0)
+    return spool, content_type
+
+
+def render_variant(image, max_edge: int) -> BytesIO:
+    """Downscale ``image`` to fit ``max_edge`` and encode it as VARIANT_FORMAT."""
+    from PIL import ImageOps
+
+    variant = ImageOps.contain(image, (max_edge, max_edge))
+    if VARIANT_FORMAT == "JPEG" and variant.mode not in ("RGB", "L"):
+        variant = variant.convert("RGB")
+    buf = BytesIO()
+    variant.save(buf, format=VARIANT_FORMAT, quality=VARIANT_QUALITY)
+    buf.seek(0)
+    return buf
+
+
+def _upload(fileobj, key: str, content_type: str) -> None:
+    get_s3_client().upload_fileobj(fileobj, IMAGE_BUCKET_NAME, key,
+                                   ExtraArgs={"ContentType": content_type}, Config=get_transfer_config())
+
+
+def _render_and_upload(image, max_edge: int, key: str) -> None:
+    _upload(render_variant(image, max_edge), key, FORMAT_CONTENT_TYPES[VARIANT_FORMAT])
+
+
+def store_image(fileobj, content_type: str, prefix: str, original_ext: Optional[str] = None) -> Dict[str, str]:
+    """Store an image and its resized variants under ``prefix``; return {variant: public URL}.
+
+    Variants are written before the original, so an existing original implies
+    the whole set is present.
+    """
+    # Pillow is only needed by the image paths, so import it lazily
+    from PIL import Image
+
+    ensure_image_bucket()
+    original_ext = original_ext or CONTENT_TYPE_EXTENSIONS.get(content_type, "jpg")
+    keys = variant_keys(prefix, original_ext)
+
+    with Image.open(fileobj) as source:
+        source.load()
+        pool = get_image_executor()
+        # Each task gets its own copy; Image objects are not safe to share across threads
+        futures = [
+            pool.submit(_render_and_upload, source.copy(), max_edge, keys[name])
+            for name, max_edge in IMAGE_VARIANTS.items()
+        ]
+        for future in futures:
+            future.result()
+
+    fileobj.seek(0)
+    _upload(fileobj, keys["original"], content_type)
+    return {name: public_url(key) for name, key in keys.items()}
+
+
+def store_image_from_url(url: str, prefix: str, original_ext: Optional[str] = None) -> Dict[str, str]:
+    """Download ``url`` (streamed) and store it plus variants under ``prefix``."""
+    spool, content_type = download_image(url)
+    with spool:
+        return store_image(spool, content_type, prefix, original_ext)
+
+
+def image_exists(key: str) -> bool:
+    """Return True if ``key`` is already in the image bucket."""
+    try:
+        get_s3_client().head_object(Bucket=IMAGE_BUCKET_NAME, Key=key)
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound", "NoSuchBucket"):
+            return False
+        raise
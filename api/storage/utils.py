@@ -1,11 +1,13 @@
 import os
 import logging
-import boto3
 from boto3.dynamodb.conditions import Key, Attr
 from botocore.exceptions import ClientError
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
+from typing import Iterator, Optional
 from models.models import InventoryItem, InventoryItemMacros, Recipe, User
+from storage.clients import get_resource, get_table
+from warmup import register_warmup_hook
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -15,10 +17,25 @@ AUTH_TABLE_NAME   = os.getenv("AUTH_TABLE_NAME")
 if not PANTRY_TABLE_NAME or not AUTH_TABLE_NAME:
     raise ValueError("Both PANTRY_TABLE_NAME and AUTH_TABLE_NAME must be set")
 
-# DynamoDB tables
-dynamodb     = boto3.resource("dynamodb")
-pantry_table = dynamodb.Table(PANTRY_TABLE_NAME)
-auth_table   = dynamodb.Table(AUTH_TABLE_NAME)
+# DynamoDB tables come from the shared client registry and are built on first
+# use, so cold starts don't pay for the service model load unless a request
+# actually touches storage.
+def get_dynamodb():
+    return get_resource("dynamodb")
+
+
+def get_pantry_table():
+    return get_table(PANTRY_TABLE_NAME)
+
+
+def get_auth_table():
+    return get_table(AUTH_TABLE_NAME)
+
+
+@register_warmup_hook("dynamodb")
+def prime_dynamodb():
+    """Open a pooled DynamoDB connection with a single cheap GetItem."""
+    get_pantry_table().get_item(Key={"PK": "WARMUP", "SK": "WARMUP"})
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
@@ -36,70 +53,186 @@ def convert_to_decimal(data):
     return data
 
 
+# ─── Record Conversion (shared with storage.async_utils) ────────────────────────
+
+def inventory_item_from_record(raw: dict, user_id: str) -> InventoryItem:
+    """Build an InventoryItem from a raw pantry row."""
+    # Build macros object if present
+    macros_data = raw.get("macros") or {}
+    macros = InventoryItemMacros(**macros_data) if macros_data else None
+
+    return InventoryItem(
+        id                   = raw["id"],
+        user_id              = user_id,
+        product_name         = raw.get("product_name", ""),
+        quantity             = int(raw.get("quantity", 1)),
+        upc                  = raw.get("upc", ""),
+        macros               = macros,
+        cost                 = Decimal(str(raw.get("cost", 0))),
+        expiration_date      = raw.get("expiration_date", None),
+        environmental_impact = Decimal(str(raw.get("environmental_impact", 0))),
+        image_url            = raw.get("image_url", None),  # Persisted S3 URL
+        image_variants       = raw.get("image_variants", None),
+        created_at           = raw.get("created_at", None),
+        active               = raw.get("active", True),
+    )
+
+
+def change_stamp() -> str:
+    """UTC timestamp stored as ``updated_at`` on every pantry, recipe and chat write.
+
+    Fixed-width ISO with microseconds, so string order is time order (delta sync
+    compares it in DynamoDB).
+    """
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+def pantry_record(user_id: str, item) -> dict:
+    """Build the DynamoDB row for an InventoryItem (or its dict form)."""
+    # Ensure item is an instance of InventoryItem
+    if isinstance(item, dict):
+        item = InventoryItem(**item)
+
+    # Use the model's method to convert to a DynamoDB-compatible dictionary
+    data = item.to_dynamodb_dict()
+
+    # Compute TTL from expiration_date if provided
+    expires_at = None
+    if item.expiration_date:
+        dt = datetime.fromisoformat(item.expiration_date.replace("Z", "+00:00"))
+        expires_at = int(dt.timestamp())
+
+    return {
+        "PK": f"USER#{user_id}",
+        "SK": f"PANTRY#{item.id}",
+        **data,
+        "expires_at": expires_at,
+        "updated_at": change_stamp(),
+    }
+
+
+def recipe_record(user_id: str, rec: Recipe) -> dict:
+    """Build the DynamoDB row for a Recipe."""
+    # Convert float values to Decimal
+    data = convert_to_decimal(rec.dict())
+    return {"PK": f"USER#{user_id}", "SK": f"RECIPE#{rec.id}", **data, "updated_at": change_stamp()}
+
+
+# ─── Change Versions ─────────────────────────────────────────────────────────────
+# One small row per user (SK=VERSION) holds a counter per collection that every
+# write to the collection bumps. List endpoints build their ETag from it, so an
+# unchanged reload costs one GetItem. The bump comes after the write: a reader
+# may pair new data with the old version (it just refetches next time) but
+# never old data with a new version.
+
+VERSION_SK = "VERSION"
+
+
+def version_key(user_id: str) -> dict:
+    return {"PK": f"USER#{user_id}", "SK": VERSION_SK}
+
+
+def version_read(user_id: str, scope: str) -> dict:
+    """GetItem arguments for one collection's counter."""
+    return {
+        "Key": version_key(user_id),
+        "ProjectionExpression": "#scope",
+        "ExpressionAttributeNames": {"#scope": scope},
+        "ConsistentRead": True,
+    }
+
+
+def version_bump(user_id: str, scope: str) -> dict:
+    """UpdateItem arguments that increment one collection's counter (creating the row if needed)."""
+    return {
+        "Key": version_key(user_id),
+        "UpdateExpression": "ADD #scope :one",
+        "ExpressionAttributeNames": {"#scope": scope},
+        "ExpressionAttributeValues": {":one": 1},
+    }
+
+
+def read_user_version(user_id: str, scope: str) -> int:
+    """Return the change counter for ``scope`` ("pantry", "recipes" or "chats"); 0 if never written."""
+    try:
+        resp = get_pantry_table().get_item(**version_read(user_id, scope))
+    except ClientError as e:
+        logging.error("Error reading %s version: %s", scope, e.response["Error"]["Message"])
+        raise
+    return int(resp.get("Item", {}).get(scope, 0))
+
+
+def bump_user_version(user_id: str, scope: str) -> None:
+    """Record that ``scope`` changed for ``user_id``."""
+    try:
+        get_pantry_table().update_item(**version_bump(user_id, scope))
+    except ClientError as e:
+        logging.error("Error bumping %s version: %s", scope, e.response["Error"]["Message"])
+        raise
+
+
 # ─── Pantry CRUD ─────────────────────────────────────────────────────────────────
 
+def active_rows_query(user_id: str, prefix: str, cursor: Optional[dict], page_size: Optional[int]) -> dict:
+    """Query arguments for one page of a user's active rows under ``prefix`` (e.g. "PANTRY#")."""
+    args = {
+        "KeyConditionExpression": Key("PK").eq(f"USER#{user_id}") & Key("SK").begins_with(prefix),
+        "FilterExpression": Attr("active").eq(True),
+    }
+    if page_size:
+        args["Limit"] = page_size
+    if cursor:
+        args["ExclusiveStartKey"] = cursor
+    return args
+
+
+def iter_active_rows(user_id: str, prefix: str, page_size: Optional[int] = None) -> Iterator[list[dict]]:
+    """Yield pages of active raw rows, following LastEvaluatedKey; ``page_size`` rows are read per query."""
+    cursor = None
+    while True:
+        try:
+            resp = get_pantry_table().query(**active_rows_query(user_id, prefix, cursor, page_size))
+        except ClientError as e:
+            logging.error("Error querying %s rows: %s", prefix, e.response["Error"]["Message"])
+            raise
+        if resp.get("Items"):
+            yield resp["Items"]
+        cursor = resp.get("LastEvaluatedKey")
+        if cursor is None:
+            return
+
+
+def iter_pantry_items(user_id: str, page_size: Optional[int] = None) -> Iterator[list[InventoryItem]]:
+    """Yield a user's pantry items a page at a time."""
+    for rows in iter_active_rows(user_id, "PANTRY#", page_size):
+        yield [inventory_item_from_record(raw, user_id) for raw in rows]
+
+
 def read_pantry_items(user_id: str) -> list[InventoryItem]:
     """Fetch all pantry items for a given user_id."""
-    pk = f"USER#{user_id}"
-    try:
-        resp = pantry_table.query(
-            KeyConditionExpression=Key("PK").eq(pk) & Key("SK").begins_with("PANTRY#"),
-            FilterExpression=Attr("active").eq(True)
-        )
-        items: list[InventoryItem] = []
-        for raw in resp.get("Items", []):
-            # Build macros object if present
-            macros_data = raw.get("macros") or {}
-            macros = InventoryItemMacros(**macros_data) if macros_data else None
-
-            item = InventoryItem(
-                id                   = raw["id"],
-                user_id              = user_id,
-                product_name         = raw.get("product_name", ""),
-                quantity             = int(raw.get("quantity", 1)),
-                upc                  = raw.get("upc", ""),
-                macros               = macros,
-                cost                 = Decimal(str(raw.get("cost", 0))),
-                expiration_date      = raw.get("expiration_date", None),
-                environmental_impact = Decimal(str(raw.get("environmental_impact", 0))),
-                image_url            = raw.get("image_url", None),  # Persisted S3 URL
-                active               = raw.get("active", True),
-            )
-            items.append(item)
-        return items
+    return [item for page in iter_pantry_items(user_id) for item in page]
+
 
+def read_pantry_item(user_id: str, item_id: str) -> Optional[InventoryItem]:
+    """Fetch a single active pantry item, or None if missing or soft deleted."""
+    try:
+        resp = get_pantry_table().get_item(Key={"PK": f"USER#{user_id}", "SK": f"PANTRY#{item_id}"})
     except ClientError as e:
-        logging.error("Error querying pantry items: %s", e.response["Error"]["Message"])
+        logging.error("Error fetching pantry item: %s", e.response["Error"]["Message"])
         raise
+    raw = resp.get("Item")
+    if not raw or not raw.get("active", True):
+        return None
+    return inventory_item_from_record(raw, user_id)
 
 
 def write_pantry_items(user_id: str, items: list[InventoryItem]) -> None:
     """Batch write a list of InventoryItem for a given user_id."""
-    pk = f"USER#{user_id}"
     try:
-        with pantry_table.batch_writer() as batch:
+        with get_pantry_table().batch_writer() as batch:
             for item in items:
-                # Ensure item is an instance of InventoryItem
-                if isinstance(item, dict):
-                    item = InventoryItem(**item)
-
-                # Use the model's method to convert to a DynamoDB-compatible dictionary
-                data = item.to_dynamodb_dict()
-
-                # Compute TTL from expiration_date if provided
-                expires_at = None
-                if item.expiration_date:
-                    dt = datetime.fromisoformat(item.expiration_date.replace("Z", "+00:00"))
-                    expires_at = int(dt.timestamp())
-
-                batch.put_item(
-                    Item={
-                        "PK": pk,
-                        "SK": f"PANTRY#{item.id}",
-                        **data,
-                        "expires_at": expires_at
-                    }
-                )
+                batch.put_item(Item=pantry_record(user_id, item))
+        bump_user_version(user_id, "pantry")
 
     except ClientError as e:
         logging.error("Error writing pantry items: %s", e.response["Error"]["Message"])
@@ -114,12 +247,13 @@ def soft_delete_pantry_item(user_id: str, item_id: str) -> None:
     pk = f"USER#{user_id}"
     sk = f"PANTRY#{item_id}"
     try:
-        pantry_table.update_item(
+        get_pantry_table().update_item(
             Key={"PK": pk, "SK": sk},
-            UpdateExpression="SET #active = :inactive",
+            UpdateExpression="SET #active = :inactive, updated_at = :now",
             ExpressionAttributeNames={"#active": "active"},
-            ExpressionAttributeValues={":inactive": False}
+            ExpressionAttributeValues={":inactive": False, ":now": change_stamp()}
         )
+        bump_user_version(user_id, "pantry")
         logging.info(f"Soft deleted pantry item with ID: {item_id} for user ID: {user_id}")
     except ClientError as e:
         logging.error("Error soft deleting pantry item: %s", e.response["Error"]["Message"])
@@ -129,40 +263,77 @@ def soft_delete_pantry_item(user_id: str, item_id: str) -> None:
         raise
 
 
-# ─── Recipe CRUD ─────────────────────────────────────────────────────────────────
+def set_pantry_item_image(user_id: str, item_id: str, image_url: str,
+                          image_variants: Optional[dict] = None) -> None:
+    """Persist the image URL (and resized variant URLs) on a pantry item."""
+    try:
+        get_pantry_table().update_item(
+            Key={"PK": f"USER#{user_id}", "SK": f"PANTRY#{item_id}"},
+            UpdateExpression="SET image_url = :url, image_variants = :variants, updated_at = :now",
+            ExpressionAttributeValues={":url": image_url, ":variants": image_variants, ":now": change_stamp()}
+        )
+        bump_user_version(user_id, "pantry")
+    except ClientError as e:
+        logging.error("Error setting pantry item image: %s", e.response["Error"]["Message"])
+        raise
 
-def read_recipe_items(user_id: str) -> list[Recipe]:
-    """Fetch all recipes for a given user_id."""
-    pk = f"USER#{user_id}"
+
+# ─── Image Generation Leases ─────────────────────────────────────────────────────
+# One row per shared image key so only one worker (across Lambdas) generates it.
+
+def acquire_image_lease(image_key: str, owner: str, ttl_seconds: int) -> bool:
+    """Claim the generation lease for ``image_key``; False if another owner holds a live lease."""
+    now = int(datetime.utcnow().timestamp())
     try:
-        resp = pantry_table.query(
-            KeyConditionExpression=Key("PK").eq(pk) & Key("SK").begins_with("RECIPE#"),
-            FilterExpression=Attr("active").eq(True)
+        get_pantry_table().put_item(
+            Item={"PK": f"IMAGE#{image_key}", "SK": "LEASE", "owner": owner,
+                  "lease_expires": now + ttl_seconds, "expires_at": now + ttl_seconds},
+            ConditionExpression="attribute_not_exists(PK) OR lease_expires < :now",
+            ExpressionAttributeValues={":now": now}
         )
-        return [Recipe(**raw) for raw in resp.get("Items", [])]
-     
+        return True
     except ClientError as e:
-        logging.error("Error querying recipe items: %s", e.response["Error"]["Message"])
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return False
+        logging.error("Error acquiring image lease: %s", e.response["Error"]["Message"])
         raise
 
 
+def release_image_lease(image_key: str, owner: str) -> None:
+    """Drop the lease for ``image_key`` if ``owner`` still holds it."""
+    try:
+        get_pantry_table().delete_item(
+            Key={"PK": f"IMAGE#{image_key}", "SK": "LEASE"},
+            ConditionExpression="#owner = :owner",
+            ExpressionAttributeNames={"#owner": "owner"},
+            ExpressionAttributeValues={":owner": owner}
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            logging.error("Error releasing image lease: %s", e.response["Error"]["Message"])
+            raise
+
+
+# ─── Recipe CRUD ─────────────────────────────────────────────────────────────────
+
+def iter_recipe_items(user_id: str, page_size: Optional[int] = None) -> Iterator[list[Recipe]]:
+    """Yield a user's recipes a page at a time."""
+    for rows in iter_active_rows(user_id, "RECIPE#", page_size):
+        yield [Recipe(**raw) for raw in rows]
+
+
+def read_recipe_items(user_id: str) -> list[Recipe]:
+    """Fetch all recipes for a given user_id."""
+    return [rec for page in iter_recipe_items(user_id) for rec in page]
+
+
 def write_recipe_items(user_id: str, items: list[Recipe]) -> None:
     """Batch write a list of Recipe for a given user_id."""
-    pk = f"USER#{user_id}"
     try:
-        with pantry_table.batch_writer() as batch:
+        with get_pantry_table().batch_writer() as batch:
             for rec in items:
-                data = rec.dict()
-                # Convert float values to Decimal
-                data = convert_to_decimal(data)
-
-                batch.put_item(
-                    Item={
-                        "PK": pk,
-                        "SK": f"RECIPE#{rec.id}",
-                        **data
-                    }
-                )
+                batch.put_item(Item=recipe_record(user_id, rec))
+        bump_user_version(user_id, "recipes")
 
     except ClientError as e:
         logging.error("Error writing recipe items: %s", e.response["Error"]["Message"])
@@ -177,12 +348,13 @@ def soft_delete_recipe_item(user_id: str, recipe_id: str) -> None:
     pk = f"USER#{user_id}"
     sk = f"RECIPE#{recipe_id}"
     try:
-        pantry_table.update_item(
+        get_pantry_table().update_item(
             Key={"PK": pk, "SK": sk},
-            UpdateExpression="SET #active = :inactive",
+            UpdateExpression="SET #active = :inactive, updated_at = :now",
             ExpressionAttributeNames={"#active": "active"},
-            ExpressionAttributeValues={":inactive": False}
+            ExpressionAttributeValues={":inactive": False, ":now": change_stamp()}
         )
+        bump_user_version(user_id, "recipes")
         logging.info(f"Soft deleted recipe with ID: {recipe_id} for user ID: {user_id}")
     except ClientError as e:
         logging.error("Error soft deleting recipe: %s", e.response["Error"]["Message"])
@@ -192,17 +364,43 @@ def soft_delete_recipe_item(user_id: str, recipe_id: str) -> None:
         raise
 
 
+def set_recipe_image(user_id: str, recipe_id: str, image_url: str,
+                     image_variants: Optional[dict] = None) -> bool:
+    """Persist the image URL (and variants) on an existing recipe; False if it no longer exists."""
+    try:
+        get_pantry_table().update_item(
+            Key={"PK": f"USER#{user_id}", "SK": f"RECIPE#{recipe_id}"},
+            UpdateExpression="SET image_url = :url, image_variants = :variants, updated_at = :now",
+            ConditionExpression="attribute_exists(PK)",
+            ExpressionAttributeValues={":url": image_url, ":variants": image_variants, ":now": change_stamp()}
+        )
+        bump_user_version(user_id, "recipes")
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return False
+        logging.error("Error setting recipe image: %s", e.response["Error"]["Message"])
+        raise
+
+
 # ─── Chat Metadata CRUD ───────────────────────────────────────────────────────
 
-from models.models import ChatMeta
+from models.models import ChatHistory, ChatMeta
+
+# Chat rows also carry the message window and summary; listings only project these
+CHAT_META_PROJECTION = {
+    "ProjectionExpression": "#id, #title, #updatedAt, #length",
+    "ExpressionAttributeNames": {"#id": "id", "#title": "title", "#updatedAt": "updatedAt", "#length": "length"},
+}
 
 
 def read_chat_meta(user_id: str) -> list[ChatMeta]:
     """Return chat metadata entries for a user sorted by updatedAt desc."""
     pk = f"USER#{user_id}"
     try:
-        resp = pantry_table.query(
-            KeyConditionExpression=Key("PK").eq(pk) & Key("SK").begins_with("CHAT#")
+        resp = get_pantry_table().query(
+            KeyConditionExpression=Key("PK").eq(pk) & Key("SK").begins_with("CHAT#"),
+            **CHAT_META_PROJECTION,
         )
         items = [ChatMeta(**raw) for raw in resp.get("Items", [])]
         items.sort(key=lambda x: x.updatedAt, reverse=True)
@@ -212,24 +410,122 @@ def read_chat_meta(user_id: str) -> list[ChatMeta]:
         raise
 
 
+def chat_meta_update(chat: ChatMeta) -> dict:
+    """UpdateItem arguments that set a chat's metadata without touching its stored history."""
+    return {
+        "UpdateExpression": ("SET #id = :id, #title = :title, #updatedAt = :updatedAt, #length = :length, "
+                             "updated_at = :now"),
+        "ExpressionAttributeNames": CHAT_META_PROJECTION["ExpressionAttributeNames"],
+        "ExpressionAttributeValues": {
+            ":id": chat.id, ":title": chat.title, ":updatedAt": chat.updatedAt, ":length": chat.length,
+            ":now": change_stamp(),
+        },
+    }
+
+
 def upsert_chat_meta(user_id: str, chat: ChatMeta) -> None:
     """Insert or update a chat metadata record."""
     pk = f"USER#{user_id}"
     try:
-        pantry_table.put_item(
-            Item={"PK": pk, "SK": f"CHAT#{chat.id}", **chat.dict()}
+        get_pantry_table().update_item(
+            Key={"PK": pk, "SK": f"CHAT#{chat.id}"}, **chat_meta_update(chat)
         )
+        bump_user_version(user_id, "chats")
     except ClientError as e:
         logging.error("Error writing chat meta: %s", e.response["Error"]["Message"])
         raise
 
 
+def read_chat_history(user_id: str, chat_id: str) -> Optional[ChatHistory]:
+    """Fetch a chat with its message window and summary, or None if it doesn't exist."""
+    try:
+        resp = get_pantry_table().get_item(Key={"PK": f"USER#{user_id}", "SK": f"CHAT#{chat_id}"})
+    except ClientError as e:
+        logging.error("Error fetching chat: %s", e.response["Error"]["Message"])
+        raise
+    raw = resp.get("Item")
+    return ChatHistory(**raw) if raw else None
+
+
+def chat_history_put(user_id: str, history: ChatHistory, expected_rev: int) -> dict:
+    """PutItem arguments that only succeed if nobody else wrote the chat since ``expected_rev``.
+
+    A chat created through POST /chats/ has metadata but no history_rev yet, which
+    read_chat_history reports as revision 0, so a missing revision counts as 0.
+    """
+    return {
+        "Item": {"PK": f"USER#{user_id}", "SK": f"CHAT#{history.id}", **history.dict(), "updated_at": change_stamp()},
+        "ConditionExpression": "attribute_not_exists(history_rev) OR history_rev = :rev",
+        "ExpressionAttributeValues": {":rev": expected_rev},
+    }
+
+
+def write_chat_history(user_id: str, history: ChatHistory, expected_rev: int) -> bool:
+    """Store ``history``; return False if the chat changed since it was read at ``expected_rev``."""
+    try:
+        get_pantry_table().put_item(**chat_history_put(user_id, history, expected_rev))
+        bump_user_version(user_id, "chats")
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return False
+        logging.error("Error writing chat: %s", e.response["Error"]["Message"])
+        raise
+
+
+# ─── Delta Sync ──────────────────────────────────────────────────────────────────
+# Offline clients pull rows whose updated_at is newer than their last sync,
+# soft-deleted ones included (active=False is the tombstone). With
+# SYNC_INDEX_NAME set, deltas come from a GSI keyed (PK, updated_at) and only
+# changed rows are read; without it the partition is queried with a filter, which
+# reads every row but still only returns the changes. Full syncs always use the
+# table: rows written before updated_at existed are not in the sparse index.
+
+SYNC_INDEX_NAME = os.getenv("SYNC_INDEX_NAME")
+
+
+def changes_query(user_id: str, since: Optional[str], cursor: Optional[dict], limit: int) -> dict:
+    """Query arguments for one page of rows changed after ``since`` (every live row if None)."""
+    pk = Key("PK").eq(f"USER#{user_id}")
+    args = {"Limit": limit}
+    if cursor:
+        args["ExclusiveStartKey"] = cursor
+    if since is None:
+        args.update(KeyConditionExpression=pk,
+                    FilterExpression=Attr("active").not_exists() | Attr("active").eq(True))
+    elif SYNC_INDEX_NAME:
+        args.update(IndexName=SYNC_INDEX_NAME, KeyConditionExpression=pk & Key("updated_at").gt(since))
+    else:
+        args.update(KeyConditionExpression=pk, FilterExpression=Attr("updated_at").gt(since))
+    return args
+
+
+def read_changes(user_id: str, since: Optional[str], cursor: Optional[dict],
+                 limit: int) -> tuple[list[dict], Optional[dict]]:
+    """Return raw rows changed after ``since`` and the key to continue from (None when done).
+
+    Keeps querying until about ``limit`` rows matched, so a filtered scan of a big
+    partition doesn't hand the client a string of empty pages.
+    """
+    rows = []
+    try:
+        while True:
+            resp = get_pantry_table().query(**changes_query(user_id, since, cursor, limit))
+            rows.extend(resp.get("Items", []))
+            cursor = resp.get("LastEvaluatedKey")
+            if cursor is None or len(rows) >= limit:
+                return rows, cursor
+    except ClientError as e:
+        logging.error("Error querying changes: %s", e.response["Error"]["Message"])
+        raise
+
+
 # ─── Auth CRUD ───────────────────────────────────────────────────────────────────
 
 def read_users() -> list[User]:
     """Scan all users from the auth table."""
     try:
-        resp = auth_table.scan()
+        resp = get_auth_table().scan()
         return [User(**raw) for raw in resp.get("Items", [])]
     except ClientError as e:
         logging.error("Error scanning users: %s", e.response["Error"]["Message"])
@@ -239,7 +535,7 @@ def read_users() -> list[User]:
 def write_users(users: list[User]) -> None:
     """Batc write a list of User into the auth table."""
     try:
-        with auth_table.batch_writer() as batch:
+        with get_auth_table().batch_writer() as batch:
             for usr in users:
                 data = usr.dict()
                 # Convert float values to Decimal
@@ -0,0 +1,91 @@
+import os
+import json
+import base64
+import binascii
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from auth.auth_service import get_user_id_from_token
+from models.models import ChatMeta, Recipe, SyncPage, SyncTombstone
+from storage.utils import inventory_item_from_record, read_changes
+from storage import async_utils as async_storage
+from storage.async_utils import storage_call
+from serialization import model_response
+
+sync_router = APIRouter(prefix="/sync")
+
+# ─── Delta Sync ──────────────────────────────────────────────────────────────────
+# GET /sync with no token returns every live pantry item, recipe and chat; each
+# response carries a token, and the next call with it returns only what changed
+# (and what was soft-deleted) since. The token resumes from SYNC_SETTLE_SECONDS
+# before the sync started, so a write stamped just before a sync but landing
+# after it is sent next time too; clients apply rows as idempotent upserts.
+
+SYNC_PAGE_SIZE = int(os.getenv("SYNC_PAGE_SIZE", "200"))
+SYNC_SETTLE_SECONDS = int(os.getenv("SYNC_SETTLE_SECONDS", "5"))
+
+
+def encode_token(since: Optional[str], resume: str, cursor: Optional[dict] = None) -> str:
+    """Opaque token: the lower bound of this sync, where the next one starts, and the page cursor."""
+    state = {"since": since, "resume": resume, "cursor": cursor}
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode()).decode()
+
+
+def decode_token(token: str, user_id: str) -> dict:
+    """Decode a token from ``encode_token``; 400 unless it is well formed and its cursor is in ``user_id``'s partition."""
+    try:
+        state = json.loads(base64.urlsafe_b64decode(token.encode()))
+        if not isinstance(state, dict) or not isinstance(state.get("resume"), str):
+            raise ValueError(token)
+        if not isinstance(state.get("since"), (str, type(None))):
+            raise ValueError(token)
+        cursor = state.get("cursor")
+        if cursor is not None and not (
+            isinstance(cursor, dict) and cursor.get("PK") == f"USER#{user_id}"
+            and all(isinstance(value, str) for value in cursor.values())
+        ):
+            raise ValueError(token)
+        return state
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+
+def sync_page(rows: list[dict], user_id: str, next_token: str, has_more: bool) -> SyncPage:
+    """Sort raw rows into live records and tombstones by their sort-key prefix."""
+    page = SyncPage(next=next_token, has_more=has_more)
+    for raw in rows:
+        kind, _, row_id = raw.get("SK", "").partition("#")
+        if kind == "PANTRY":
+            if raw.get("active", True):
+                page.pantry.append(inventory_item_from_record(raw, user_id))
+            else:
+                page.deleted.append(SyncTombstone(type="pantry", id=row_id))
+        elif kind == "RECIPE":
+            if raw.get("active", True):
+                page.recipes.append(Recipe(**raw))
+            else:
+                page.deleted.append(SyncTombstone(type="recipe", id=row_id))
+        elif kind == "CHAT":
+            page.chats.append(ChatMeta(**raw))
+    return page
+
+
+@sync_router.get("", response_model=SyncPage)
+async def sync(since: Optional[str] = None, limit: int = Query(SYNC_PAGE_SIZE, ge=1, le=1000),
+               user_id: str = Depends(get_user_id_from_token)) -> SyncPage:
+    """
+    Return pantry items, recipes and chats changed since the ``since`` token.
+    Omit the token for a full sync. While ``has_more`` is true, call again with ``next``.
+    """
+    if since:
+        state = decode_token(since, user_id)
+        lower, resume, cursor = state.get("since"), state["resume"], state.get("cursor")
+    else:
+        lower, cursor = None, None
+    if not cursor:
+        # Starting a sync (not continuing one): fix where the next sync resumes now
+        resume = (datetime.now(timezone.utc) - timedelta(seconds=SYNC_SETTLE_SECONDS)).isoformat(timespec="microseconds")
+    rows, cursor = await storage_call(read_changes, async_storage.read_changes, user_id, lower, cursor, limit)
+    if cursor:
+        return model_response(sync_page(rows, user_id, encode_token(lower, resume, cursor), True))
+    return model_response(sync_page(rows, user_id, encode_token(resume, resume), False))
@@ -1,10 +1,15 @@
 import pytest
 import os
 import boto3
-from moto import mock_dynamodb, mock_s3, mock_sqs, mock_cognito_idp
+from moto import mock_dynamodb, mock_s3, mock_sqs, mock_cognitoidp
 from fastapi.testclient import TestClient
 from api.app import app
 from pantry.pantry_service import get_user, get_user_id_from_token
+import cookbook.cookbook_service as cookbook_service
+import etags
+import pantry.pantry_service as pantry_service
+from storage import clients
+from storage import utils as storage
 import tempfile
 from unittest.mock import patch
 
@@ -43,7 +48,7 @@ def test_client(override_dependencies):
 @pytest.fixture(scope="function")
 def mock_aws_services():
     """Mock AWS services for testing"""
-    with mock_dynamodb(), mock_s3(), mock_sqs(), mock_cognito_idp():
+    with mock_dynamodb(), mock_s3(), mock_sqs(), mock_cognitoidp():
         # Set up test environment variables
         os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
         os.environ['MACRO_QUEUE_URL'] = 'https://sqs.us-east-1.amazonaws.com/123456789/test-queue'
@@ -96,6 +101,43 @@ def mock_aws_services():
             'auth_table': auth_table
         }
 
+@pytest.fixture
+def pantry_table(request, monkeypatch):
+    """Empty moto PantryPal table behind fresh storage clients.
+
+    Parametrize indirectly with "SyncIndex" to add the delta-sync GSI. Route
+    tests that stub the storage reads at import time are undone here, so the
+    routes read the table.
+    """
+    sync_index = getattr(request, 'param', None)
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setattr(storage, 'SYNC_INDEX_NAME', sync_index)
+    monkeypatch.setattr(etags, 'read_user_version', storage.read_user_version)
+    monkeypatch.setattr(pantry_service, 'read_pantry_items', storage.read_pantry_items)
+    monkeypatch.setattr(cookbook_service, 'read_recipe_items', storage.read_recipe_items)
+    attributes = [{'AttributeName': 'PK', 'AttributeType': 'S'}, {'AttributeName': 'SK', 'AttributeType': 'S'}]
+    indexes = {}
+    if sync_index:
+        attributes.append({'AttributeName': 'updated_at', 'AttributeType': 'S'})
+        indexes['GlobalSecondaryIndexes'] = [{
+            'IndexName': sync_index,
+            'KeySchema': [{'AttributeName': 'PK', 'KeyType': 'HASH'},
+                          {'AttributeName': 'updated_at', 'KeyType': 'RANGE'}],
+            'Projection': {'ProjectionType': 'ALL'},
+        }]
+    with mock_dynamodb():
+        clients.reset_clients()
+        boto3.client('dynamodb', region_name='us-east-1').create_table(
+            TableName='PantryPal',
+            KeySchema=[{'AttributeName': 'PK', 'KeyType': 'HASH'}, {'AttributeName': 'SK', 'KeyType': 'RANGE'}],
+            AttributeDefinitions=attributes,
+            BillingMode='PAY_PER_REQUEST',
+            **indexes,
+        )
+        yield
+        clients.reset_clients()
+
 @pytest.fixture
 def sample_pantry_item():
     """Sample pantry item for testing"""
@@ -18,7 +18,7 @@ app.dependency_overrides[openai_service.get_user_id_from_token] = lambda: "testu
 
 # Monkeypatch OpenAI client and pantry reader
 class DummyChat:
-    def create(self, *args, **kwargs):
+    async def create(self, *args, **kwargs):
         return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="dummy recipe"))])
 class DummyImage:
     def generate(self, *args, **kwargs):
@@ -56,6 +56,19 @@ def test_generate_image_not_found():
     assert response.status_code == 404
 
 
+def test_generate_image_pending_while_another_worker_generates(monkeypatch):
+    def pending(item_name, openai_client=None, wait_seconds=None):
+        assert wait_seconds == 0  # the route never blocks on another worker's lease
+        raise openai_service.ImagePending(item_name)
+    monkeypatch.setattr(openai_service, "read_pantry_items",
+                        lambda user_id: [SimpleNamespace(id="i1", product_name="Eggs")])
+    monkeypatch.setattr(openai_service, "get_or_create_item_image", pending)
+    response = client.post("/openai/generate_image", json={"item_id": "i1"})
+    assert response.status_code == 202
+    assert response.json() == {"status": "pending"}
+    assert response.headers["Retry-After"] == "5"
+
+
 def test_build_recipe_prompt_servings():
     items = [{"product_name": "Rice", "quantity": 1}]
     mods = SimpleNamespace(servings=4)
@@ -66,10 +79,118 @@ def test_build_recipe_prompt_servings():
 def test_generate_recipe_endpoint():
     openai_service.read_pantry_items = lambda user_id: [{"id": "1", "product_name": "Rice", "quantity": 1}]
     class DummyChat2:
-        def create(self, *args, **kwargs):
+        async def create(self, *args, **kwargs):
             return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='{"title":"t"}'))])
     openai_service.openai_client = SimpleNamespace(chat=SimpleNamespace(completions=DummyChat2()), images=DummyImage())
     payload = {"itemIds": ["1"], "modifiers": {"servings": 2}}
     resp = client.post("/openai/recipes/generate", json=payload)
     assert resp.status_code == 200
     assert resp.json() == {"recipe": {"title": "t"}}
+
+
+class DummyStream:
+    def __init__(self, tokens):
+        self.chunks = [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=t))]) for t in tokens]
+        self.closed = False
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def close(self):
+        self.closed = True
+
+
+def stream_chat(stream):
+    async def create(**kwargs):
+        return stream
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_llm_chat_stream_forwards_tokens(monkeypatch):
+    stream = DummyStream(["Hel", "lo", None])
+    monkeypatch.setattr(openai_service, "openai_client", stream_chat(stream))
+    resp = client.post("/openai/llm_chat/stream", json={"messages": [{"role": "user", "content": "hi"}]})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    assert resp.text == (
+        'event: token\ndata: {"delta": "Hel"}\n\n'
+        'event: token\ndata: {"delta": "lo"}\n\n'
+        'event: done\ndata: {"content": "Hello"}\n\n'
+    )
+    assert stream.closed
+
+
+def test_stream_stops_when_client_disconnects():
+    import asyncio
+    from ai.streaming import stream_completion_events
+
+    class GoneRequest:
+        async def is_disconnected(self):
+            return True
+
+    stream = DummyStream(["a", "b"])
+
+    async def collect():
+        return [frame async for frame in stream_completion_events(GoneRequest(), stream)]
+
+    assert asyncio.run(collect()) == []
+    assert stream.closed
+
+
+def test_generate_recipe_stream_emits_structured_events(monkeypatch):
+    monkeypatch.setattr(openai_service, "read_pantry_items",
+                        lambda user_id: [{"id": "1", "product_name": "Rice", "quantity": 1}])
+    # Truncated completion: the final document is repaired rather than rejected
+    stream = DummyStream(['{"title": "Rice', ' Bowl", "steps": ["Boil"', ', "Ser'])
+    monkeypatch.setattr(openai_service, "openai_client", stream_chat(stream))
+    resp = client.post("/openai/recipes/generate/stream", json={"itemIds": ["1"]})
+    assert resp.status_code == 200
+    assert resp.text == (
+        'event: title\ndata: "Rice Bowl"\n\n'
+        'event: step\ndata: "Boil"\n\n'
+        'event: recipe\ndata: {"recipe": {"title": "Rice Bowl", "steps": ["Boil", "Ser"]}}\n\n'
+    )
+
+
+def test_generate_recipe_served_from_cache_until_regenerate(monkeypatch):
+    from ai.response_cache import response_cache
+    response_cache.clear()
+    monkeypatch.setattr(openai_service, "read_pantry_items",
+                        lambda user_id: [{"id": "1", "product_name": "Rice", "quantity": 1}])
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f'{{"title":"v{len(calls)}"}}'))])
+    monkeypatch.setattr(openai_service, "openai_client",
+                        SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))))
+    payload = {"itemIds": ["1"], "modifiers": {"servings": 2}}
+
+    assert client.post("/openai/recipes/generate", json=payload).json() == {"recipe": {"title": "v1"}}
+    assert client.post("/openai/recipes/generate", json=payload).json() == {"recipe": {"title": "v1"}}
+    assert len(calls) == 1
+    # Different modifiers miss; regenerate bypasses and refreshes the entry
+    assert client.post("/openai/recipes/generate", json={"itemIds": ["1"]}).json() == {"recipe": {"title": "v2"}}
+    assert client.post("/openai/recipes/generate?regenerate=true", json=payload).json() == {"recipe": {"title": "v3"}}
+    assert client.post("/openai/recipes/generate", json=payload).json() == {"recipe": {"title": "v3"}}
+    assert len(calls) == 3
+
+    stats = response_cache.snapshot()
+    assert (stats["hits"], stats["misses"], stats["bypassed"]) == (2, 2, 1)
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_meal_suggestions_key_follows_expiry_and_age(monkeypatch):
+    from models.models import InventoryItemMacros
+    pantry = [{"id": "1", "product_name": "Milk", "expiration_date": "2024-05-03", "created_at": "2024-05-01"}]
+    monkeypatch.setattr(openai_service, "read_pantry_items", lambda user_id: [dict(it) for it in pantry])
+    goals = InventoryItemMacros(calories=2000)
+
+    _, key = openai_service.meal_suggestions_request("testuser", goals)
+    assert openai_service.meal_suggestions_request("testuser", goals)[1] == key
+    pantry[0]["expiration_date"] = "2024-05-10"
+    assert openai_service.meal_suggestions_request("testuser", goals)[1] != key
+    _, key = openai_service.meal_suggestions_request("testuser", goals)
+    pantry[0]["created_at"] = "2024-04-01"
+    assert openai_service.meal_suggestions_request("testuser", goals)[1] != key
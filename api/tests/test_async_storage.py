@@ -0,0 +1,133 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import boto3
+import pytest
+import requests
+
+from storage import async_utils
+
+
+def test_storage_call_runs_sync_fn_on_thread_pool(monkeypatch):
+    monkeypatch.setattr(async_utils, "ASYNC_STORAGE", False)
+    loop_thread = threading.get_ident()
+
+    def sync_fn(user_id):
+        return ("sync", user_id, threading.get_ident() != loop_thread)
+
+    async def async_fn(user_id):
+        raise AssertionError("async path should not run")
+
+    async def call():
+        nonlocal loop_thread
+        loop_thread = threading.get_ident()
+        return await async_utils.storage_call(sync_fn, async_fn, "u1")
+
+    assert asyncio.run(call()) == ("sync", "u1", True)
+
+
+def test_storage_call_awaits_async_fn_when_enabled(monkeypatch):
+    monkeypatch.setattr(async_utils, "ASYNC_STORAGE", True)
+
+    def sync_fn(user_id):
+        raise AssertionError("sync path should not run")
+
+    async def async_fn(user_id):
+        return ("async", user_id)
+
+    assert asyncio.run(async_utils.storage_call(sync_fn, async_fn, "u1")) == ("async", "u1")
+
+
+def test_storage_pages_iterates_either_generator(monkeypatch):
+    def sync_gen(user_id):
+        yield [user_id, "sync"]
+        yield ["page 2"]
+
+    async def async_gen(user_id):
+        yield [user_id, "async"]
+
+    async def collect():
+        return [page async for page in async_utils.storage_pages(sync_gen, async_gen, "u1")]
+
+    monkeypatch.setattr(async_utils, "ASYNC_STORAGE", False)
+    assert asyncio.run(collect()) == [["u1", "sync"], ["page 2"]]
+    monkeypatch.setattr(async_utils, "ASYNC_STORAGE", True)
+    assert asyncio.run(collect()) == [["u1", "async"]]
+
+
+@pytest.fixture
+def moto_server(monkeypatch):
+    """A moto DynamoDB endpoint over HTTP (aiobotocore can't use the in-process mock)."""
+    from moto.server import ThreadedMotoServer
+
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    endpoint = f"http://127.0.0.1:{server._server.server_port}"
+    monkeypatch.setenv("AWS_ENDPOINT_URL_DYNAMODB", endpoint)
+    boto3.client("dynamodb", region_name="us-east-1", endpoint_url=endpoint).create_table(
+        TableName="PantryPal",
+        KeySchema=[{"AttributeName": "PK", "KeyType": "HASH"}, {"AttributeName": "SK", "KeyType": "RANGE"}],
+        AttributeDefinitions=[{"AttributeName": "PK", "AttributeType": "S"},
+                              {"AttributeName": "SK", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    yield
+    requests.post(f"{endpoint}/moto-api/reset")
+    server.stop()
+
+
+def test_concurrent_first_calls_share_one_resource(moto_server, monkeypatch):
+    import aioboto3
+    sessions = []
+    real_session = aioboto3.Session
+
+    class SlowEnter:
+        # Yield to the loop while "resolving credentials", as a real first call can
+        def __init__(self, cm):
+            self.cm = cm
+
+        async def __aenter__(self):
+            await asyncio.sleep(0.01)
+            return await self.cm.__aenter__()
+
+        async def __aexit__(self, *exc):
+            return await self.cm.__aexit__(*exc)
+
+    def session(*args, **kwargs):
+        sessions.append(1)
+        real = real_session(*args, **kwargs)
+        return SimpleNamespace(resource=lambda *a, **kw: SlowEnter(real.resource(*a, **kw)))
+    monkeypatch.setattr(aioboto3, "Session", session)
+
+    async def burst():
+        resources = await asyncio.gather(*(async_utils.get_async_dynamodb() for _ in range(10)))
+        await async_utils.close_async_dynamodb()
+        return resources
+
+    resources = asyncio.run(burst())
+    assert len(sessions) == 1
+    assert all(r is resources[0] for r in resources)
+
+
+def test_async_pantry_crud_round_trip(moto_server):
+    from models.models import InventoryItem
+
+    async def round_trip():
+        try:
+            await async_utils.write_pantry_items("u1", [InventoryItem(id="a", product_name="Apple", quantity=2),
+                                                        InventoryItem(id="b", product_name="Bread", quantity=1)])
+            listed = await async_utils.read_pantry_items("u1")
+            one = await async_utils.read_pantry_item("u1", "a")
+            await async_utils.soft_delete_pantry_item("u1", "a")
+            return listed, one, await async_utils.read_pantry_items("u1"), await async_utils.read_user_version("u1", "pantry")
+        finally:
+            await async_utils.close_async_dynamodb()
+
+    listed, one, remaining, version = asyncio.run(round_trip())
+    assert sorted(i.product_name for i in listed) == ["Apple", "Bread"]
+    assert one.quantity == 2
+    assert [i.id for i in remaining] == ["b"]
+    assert version == 2
@@ -0,0 +1,73 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jose import jwk, jwt
+
+import auth.auth_service as auth_service
+from auth.claims_cache import VerifiedClaimsCache, claims_cache
+from auth.jwks import JwksProvider
+
+
+@pytest.fixture
+def signer(monkeypatch):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                serialization.NoEncryption())
+    public = jwk.construct(private.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo), "RS256").to_dict()
+    jwks = {"keys": [{**public, "kid": "k1", "alg": "RS256", "use": "sig"}]}
+    monkeypatch.setattr(auth_service, "client_id", "client")
+    monkeypatch.setattr(auth_service, "user_pool_id", "pool")
+    monkeypatch.setattr(auth_service, "jwks_provider", JwksProvider("http://jwks.invalid"))
+    auth_service.jwks_provider.install(jwks)
+    claims_cache.clear()
+
+    def sign(exp_in: int = 3600, sub: str = "user-1"):
+        claims = {"sub": sub, "aud": "client", "iss": f"https://cognito-idp.{auth_service.region}.amazonaws.com/pool",
+                  "exp": int(time.time()) + exp_in}
+        return jwt.encode(claims, pem, algorithm="RS256", headers={"kid": "k1"})
+
+    yield sign
+    claims_cache.clear()
+
+
+def request_with(token: str):
+    return SimpleNamespace(headers={"Authorization": f"Bearer {token}"})
+
+
+def test_verified_token_is_served_from_cache(signer, monkeypatch):
+    token = signer()
+    calls = []
+    decode = auth_service.jwt.decode
+    monkeypatch.setattr(auth_service.jwt, "decode", lambda *a, **kw: calls.append(1) or decode(*a, **kw))
+
+    first = asyncio.run(auth_service.get_current_user(request_with(token)))
+    second = asyncio.run(auth_service.get_current_user(request_with(token)))
+    assert first == second and first["sub"] == "user-1"
+    assert len(calls) == 1
+    assert (claims_cache.hits, claims_cache.misses) == (1, 1)
+
+
+def test_invalid_token_is_not_cached(signer):
+    tampered = signer()[:-4] + "AAAA"
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(auth_service.get_current_user(request_with(tampered)))
+        assert exc.value.status_code == 401
+    assert len(claims_cache) == 0
+
+
+def test_entries_expire_with_the_token(monkeypatch):
+    cache = VerifiedClaimsCache(max_entries=2)
+    now = time.time()
+    cache.put("a", {"exp": now + 60})
+    cache.put("stale", {"exp": now - 1})
+    assert len(cache) == 1
+    monkeypatch.setattr("auth.claims_cache.time.time", lambda: now + 61)
+    assert cache.get("a") is None
+    assert len(cache) == 0
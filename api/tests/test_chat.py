@@ -0,0 +1,99 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app import app
+import ai.openai_service as openai_service
+import chat.chat_service as chat_service
+from chat import memory
+
+
+@pytest.fixture
+def chat_client(pantry_table, monkeypatch):
+    prompts = []
+
+    async def create(**kwargs):
+        prompts.append(kwargs["messages"])
+        if kwargs["messages"][0]["content"] == memory.SUMMARY_PROMPT:
+            content = f"summary after {len(prompts)} calls"
+        else:
+            content = f"reply to {kwargs['messages'][-1]['content']}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    monkeypatch.setattr(openai_service, "openai_client",
+                        SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))))
+    monkeypatch.setitem(app.dependency_overrides, chat_service.get_user_id_from_token, lambda: "chatuser")
+    return TestClient(app), prompts
+
+
+def test_chat_history_window_and_summary_stay_bounded(chat_client):
+    client, prompts = chat_client
+    for i in range(30):
+        resp = client.post("/chats/c1/messages", json={"content": f"message {i}"})
+        assert resp.status_code == 200
+        assert resp.json() == {"response": f"reply to message {i}", "length": 2 * (i + 1)}
+
+    replies = [p for p in prompts if p[0]["content"] == memory.SYSTEM_PROMPT]
+    limit = memory.CHAT_WINDOW_MESSAGES + memory.CHAT_FOLD_BATCH + 3  # system, summary, new message
+    assert max(len(p) for p in replies) <= limit
+    assert replies[-1][1]["content"].startswith("Summary of the earlier conversation:\nsummary after")
+
+    history = client.get("/chats/c1").json()
+    assert history["length"] == 60
+    assert history["title"] == "message 0"
+    assert len(history["messages"]) <= memory.CHAT_WINDOW_MESSAGES + memory.CHAT_FOLD_BATCH
+    assert history["messages"][-1] == {"role": "assistant", "content": "reply to message 29"}
+
+    # Saving metadata from a client keeps the stored conversation intact
+    meta = {"id": "c1", "title": "Renamed", "updatedAt": history["updatedAt"], "length": 60}
+    assert client.post("/chats/", json=meta).status_code == 204
+    assert client.get("/chats/").json() == [meta]
+    assert client.get("/chats/c1").json()["messages"] == history["messages"]
+
+
+def test_stale_turn_is_rejected(chat_client):
+    from storage.utils import read_chat_history, write_chat_history
+    client, _ = chat_client
+    client.post("/chats/c2/messages", json={"content": "hi"})
+    stale = read_chat_history("chatuser", "c2")
+    assert write_chat_history("chatuser", stale.copy(update={"history_rev": 2}), 1)
+    assert not write_chat_history("chatuser", stale.copy(update={"history_rev": 2}), 1)
+
+
+def test_message_to_chat_created_from_metadata(chat_client):
+    client, _ = chat_client
+    meta = {"id": "c3", "title": "Dinner ideas", "updatedAt": "2024-05-01T12:00:00+00:00", "length": 0}
+    assert client.post("/chats/", json=meta).status_code == 204
+
+    resp = client.post("/chats/c3/messages", json={"content": "hi"})
+    assert resp.status_code == 200
+    assert resp.json() == {"response": "reply to hi", "length": 2}
+    assert client.post("/chats/c3/messages", json={"content": "again"}).json()["length"] == 4
+
+
+def test_failed_reply_cancels_the_summary(chat_client, monkeypatch):
+    client, _ = chat_client
+    monkeypatch.setattr(memory, "CHAT_WINDOW_MESSAGES", 2)
+    monkeypatch.setattr(memory, "CHAT_FOLD_BATCH", 0)
+    client.post("/chats/c4/messages", json={"content": "hi"})
+    cancelled = []
+
+    async def create(**kwargs):
+        if kwargs["messages"][0]["content"] == memory.SUMMARY_PROMPT:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+        await asyncio.sleep(0)  # the summary is in flight when the reply fails
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(openai_service, "openai_client",
+                        SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))))
+    # One event loop for the whole block, so a leftover summary would still be sleeping
+    with TestClient(app) as same_loop:
+        assert same_loop.post("/chats/c4/messages", json={"content": "again"}).status_code == 500
+        assert cancelled == [True]
+    assert client.get("/chats/c4").json()["length"] == 2
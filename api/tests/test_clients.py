@@ -0,0 +1,23 @@
+from storage import clients
+
+
+def test_client_config_tuned_per_service(monkeypatch):
+    monkeypatch.setenv("AWS_S3_READ_TIMEOUT", "42")
+    ddb = clients.client_config("dynamodb")
+    s3 = clients.client_config("s3")
+    assert ddb.max_pool_connections == clients.MAX_POOL_CONNECTIONS
+    assert ddb.tcp_keepalive is True
+    assert ddb.retries == {"mode": "adaptive", "max_attempts": clients.MAX_ATTEMPTS}
+    assert (ddb.connect_timeout, ddb.read_timeout) == (1, 3)
+    assert s3.read_timeout == 42
+
+
+def test_clients_are_shared_until_reset():
+    clients.reset_clients()
+    sqs = clients.get_client("sqs", region_name="us-east-1")
+    assert clients.get_client("sqs", region_name="us-east-1") is sqs
+    assert sqs.meta.config.max_pool_connections == clients.MAX_POOL_CONNECTIONS
+    table = clients.get_table("PantryPal")
+    assert clients.get_table("PantryPal") is table
+    clients.reset_clients()
+    assert clients.get_client("sqs", region_name="us-east-1") is not sqs
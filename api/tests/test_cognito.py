@@ -0,0 +1,70 @@
+import boto3
+import pytest
+from fastapi.testclient import TestClient
+from moto import mock_cognitoidp
+
+from api.app import app
+import auth.auth_service as auth_service
+from auth import cognito
+from storage import clients
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_cognitoidp():
+        clients.reset_clients()
+        monkeypatch.setattr(cognito, "_client_ready", False)
+        monkeypatch.setattr(cognito, "stats", cognito.CognitoStats())
+        idp = boto3.client("cognito-idp", region_name=cognito.COGNITO_REGION)
+        pool_id = idp.create_user_pool(PoolName="pantry")["UserPool"]["Id"]
+        app_client = idp.create_user_pool_client(UserPoolId=pool_id, ClientName="app",
+                                                 ExplicitAuthFlows=["USER_PASSWORD_AUTH"])
+        monkeypatch.setattr(auth_service, "client_id", app_client["UserPoolClient"]["ClientId"])
+        yield idp, pool_id
+        clients.reset_clients()
+
+
+def test_auth_routes_run_cognito_calls_on_the_pool(pool):
+    idp, pool_id = pool
+    client = TestClient(app)
+    resp = client.post("/auth/register", json={"username": "cook", "password": "Passw0rd!x", "email": "c@example.com"})
+    assert resp.status_code == 200
+    idp.admin_confirm_sign_up(UserPoolId=pool_id, Username="cook")
+
+    resp = client.post("/auth/login", json={"username": "cook", "password": "Passw0rd!x"})
+    assert resp.status_code == 200
+    assert resp.json()["id_token"]
+    resp = client.post("/auth/login", json={"username": "cook", "password": "wrong"})
+    assert resp.status_code == 401
+
+    calls = client.get("/auth/health").json()["cognito_calls"]
+    assert calls["sign_up"]["calls"] == 1
+    assert (calls["initiate_auth"]["calls"], calls["initiate_auth"]["errors"]) == (2, 1)
+    assert calls["initiate_auth"]["call_ms"]["max"] > 0
+
+
+def test_refresh_reuses_one_cognito_call_for_concurrent_requests(pool, monkeypatch):
+    import asyncio
+    from auth import refresh
+    from auth.refresh import RefreshDeduper
+
+    monkeypatch.setattr(refresh, "refresh_deduper", RefreshDeduper())
+    monkeypatch.setattr(auth_service, "refresh_deduper", refresh.refresh_deduper)
+    idp, pool_id = pool
+    client = TestClient(app)
+    client.post("/auth/register", json={"username": "cook", "password": "Passw0rd!x", "email": "c@example.com"})
+    idp.admin_confirm_sign_up(UserPoolId=pool_id, Username="cook")
+    tokens = client.post("/auth/login", json={"username": "cook", "password": "Passw0rd!x"}).json()
+
+    async def burst():
+        model = auth_service.RefreshModel(refresh_token=tokens["refresh_token"])
+        return await asyncio.gather(*(auth_service.refresh_tokens(model) for _ in range(5)))
+
+    results = asyncio.run(burst())
+    assert all(r["id_token"] and r["refresh_token"] == tokens["refresh_token"] for r in results)
+    # Served from the short-lived cache
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json() == results[0]
+    assert refresh.refresh_deduper.snapshot() == {"upstream": 1, "joined": 4, "cached": 1}
+    assert cognito.stats.calls["initiate_auth"] == 2  # login + one refresh
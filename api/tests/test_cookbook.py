@@ -2,6 +2,7 @@ import pytest
 from fastapi.testclient import TestClient
 from api.app import app
 import cookbook.cookbook_service as cookbook_service
+import etags
 from cookbook.cookbook_service import get_user, get_user_id_from_token
 from models.models import Recipe
 
@@ -19,6 +20,7 @@ app.dependency_overrides[get_user_id_from_token] = override_get_user_id_from_tok
 
 cookbook_service.read_recipe_items = lambda user_id: []
 cookbook_service.write_recipe_items = lambda user_id, items: None
+etags.read_user_version = lambda user_id, scope: 0
 
 client = TestClient(app)
 
@@ -55,6 +57,32 @@ def test_import_recipe_success():
     assert resp.status_code == 200
     assert resp.json()["name"] == "Test Recipe"
 
+def test_import_recipe_defers_image(monkeypatch):
+    class DummyScraper:
+        def title(self):
+            return "Pictured Recipe"
+
+        def ingredients(self):
+            return []
+
+        def instructions(self):
+            return ""
+
+        def image(self):
+            return "http://example.com/hero.jpg"
+
+    jobs = []
+    monkeypatch.setattr(cookbook_service, "scrape_me", lambda url: DummyScraper())
+    monkeypatch.setattr(cookbook_service, "enqueue_recipe_image", lambda job: False)
+    monkeypatch.setattr(cookbook_service, "enrich_recipe_image", jobs.append)
+
+    resp = client.post("/cookbook/import", json={"url": "http://example.com"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["image_url"] == cookbook_service.RECIPE_PLACEHOLDER_IMAGE_URL
+    # No queue configured, so the image job ran as a background task
+    assert jobs == [{"user_id": "testuser", "recipe_id": body["id"], "source_url": "http://example.com/hero.jpg"}]
+
 def test_add_recipe_stub():
     pass
 
@@ -0,0 +1,70 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app import app
+import auth.auth_service as auth_service
+from etags import etag_matches, version_etag
+from models.models import ChatMeta, InventoryItem, Recipe
+from storage import utils as storage
+
+
+@pytest.fixture
+def etag_client(pantry_table, monkeypatch):
+    user = {"id": "etaguser"}
+    monkeypatch.setitem(app.dependency_overrides, auth_service.get_user_id_from_token, lambda: user["id"])
+    return TestClient(app), user
+
+
+def test_etag_matching():
+    etag = version_etag("pantry", "u1", 3)
+    assert etag.startswith('W/"pantry-') and etag.endswith('-3"')
+    assert etag != version_etag("pantry", "u2", 3)
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag.removeprefix("W/")}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches(version_etag("pantry", "u1", 4), etag)
+
+
+@pytest.mark.parametrize("path,scope", [("/pantry/items", "pantry"), ("/cookbook", "recipes"), ("/chats/", "chats")])
+def test_unchanged_list_is_304_without_querying(etag_client, monkeypatch, path, scope):
+    client, _ = etag_client
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    def no_query(*args, **kwargs):
+        raise AssertionError("item partition queried on a 304")
+    monkeypatch.setattr(storage.get_pantry_table().__class__, "query", no_query)
+    again = client.get(path, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert again.content == b""
+
+
+def test_writes_change_the_etag(etag_client):
+    client, user = etag_client
+    etags = {path: client.get(path).headers["ETag"] for path in ("/pantry/items", "/cookbook", "/chats/")}
+
+    storage.write_pantry_items("etaguser", [InventoryItem(id="p1", product_name="Oats", quantity=1, unit="bag")])
+    resp = client.get("/pantry/items", headers={"If-None-Match": etags["/pantry/items"]})
+    assert resp.status_code == 200
+    assert [item["id"] for item in resp.json()] == ["p1"]
+    # Other collections are versioned separately
+    assert client.get("/cookbook", headers={"If-None-Match": etags["/cookbook"]}).status_code == 304
+
+    pantry_etag = resp.headers["ETag"]
+    storage.soft_delete_pantry_item("etaguser", "p1")
+    resp = client.get("/pantry/items", headers={"If-None-Match": pantry_etag})
+    assert resp.status_code == 200 and resp.json() == []
+
+    storage.write_recipe_items("etaguser", [Recipe(id="r1", name="Porridge")])
+    assert client.get("/cookbook", headers={"If-None-Match": etags["/cookbook"]}).status_code == 200
+
+    storage.upsert_chat_meta("etaguser", ChatMeta(id="c1", title="Hi", updatedAt="2024-01-01T00:00:00Z", length=0))
+    assert client.get("/chats/", headers={"If-None-Match": etags["/chats/"]}).status_code == 200
+
+    # Another account on the same device never gets the first account's 304
+    user["id"] = "someoneelse"
+    assert client.get("/chats/", headers={"If-None-Match": etags["/chats/"]}).status_code == 200
@@ -0,0 +1,95 @@
+import json
+import time
+
+import boto3
+import pytest
+from fastapi.testclient import TestClient
+from moto import mock_sqs
+
+from api.app import app
+import auth.auth_service as auth_service
+import pantry.pantry_service as pantry_service
+import macros.enrichment as enrichment
+import ai.images as images
+import metrics
+import tracing
+import worker
+from storage import utils as storage
+
+
+@pytest.fixture
+def queued(pantry_table, monkeypatch):
+    """Moto table and queues, with stats reset and both upstreams stubbed."""
+    monkeypatch.setitem(app.dependency_overrides, auth_service.get_user_id_from_token, lambda: "traceuser")
+    monkeypatch.setattr(tracing, "stats", tracing.HydrationStats())
+    monkeypatch.setattr(tracing, "HYDRATION_EMF", False)
+
+    def slow_macros(item_name):
+        time.sleep(0.02)
+        return enrichment.InventoryItemMacros(calories=52, protein=0)
+    monkeypatch.setattr(enrichment, "query_food_api", slow_macros)
+    monkeypatch.setattr(images, "get_or_create_item_image", lambda name: {"original": f"https://img/{name}.png"})
+    monkeypatch.setattr(images.ai_client, "api_key", "test")
+    with mock_sqs():
+        sqs = boto3.client("sqs", region_name="us-east-1")
+        monkeypatch.setattr(pantry_service, "MACRO_QUEUE_URL", sqs.create_queue(QueueName="macros")["QueueUrl"])
+        monkeypatch.setattr(pantry_service, "IMAGE_QUEUE_URL", sqs.create_queue(QueueName="images")["QueueUrl"])
+        yield TestClient(app), sqs
+
+
+def receive_records(sqs, queue_url: str) -> list:
+    """Messages in the shape the SQS event source hands to Lambda."""
+    resp = sqs.receive_message(QueueUrl=queue_url, AttributeNames=["SentTimestamp"], MaxNumberOfMessages=10)
+    return [{"eventSource": "aws:sqs", "body": m["Body"], "attributes": m["Attributes"]}
+            for m in resp.get("Messages", [])]
+
+
+def test_created_item_is_traced_from_enqueue_to_hydration(queued):
+    client, sqs = queued
+    resp = client.post("/pantry/items", json={"id": "apple-1", "product_name": "Apple", "quantity": 1})
+    assert resp.status_code == 200
+
+    records = receive_records(sqs, pantry_service.MACRO_QUEUE_URL) + receive_records(sqs, pantry_service.IMAGE_QUEUE_URL)
+    messages = [json.loads(r["body"]) for r in records]
+    assert sorted(m["jobType"] for m in messages) == ["IMAGE", "ITEM"]
+    assert all(m["trace_id"] and m["enqueued_at"] <= time.time() for m in messages)
+    assert messages[0]["trace_id"] != messages[1]["trace_id"]
+
+    worker.process_records(records)
+
+    item = storage.read_pantry_item("traceuser", "apple-1")
+    assert item.macros.calories == 52 and item.image_url == "https://img/Apple.png"
+    summary = tracing.hydration_stats()
+    assert summary["ITEM"]["completed"] == 1 and summary["IMAGE"]["completed"] == 1
+    assert summary["ITEM"]["upstream_ms"]["p50"] >= 20
+    assert summary["ITEM"]["write_ms"]["p50"] > 0
+    # Time to hydration covers the queue wait and the job itself
+    item_ms = summary["ITEM"]["hydration_ms"]["p50"]
+    assert item_ms >= summary["ITEM"]["queue_ms"]["p50"] + summary["ITEM"]["upstream_ms"]["p50"] - 1
+
+    text = metrics.render_metrics()
+    assert 'hydration_jobs_total{job_type="ITEM",outcome="completed"} 1' in text
+    assert 'hydration_duration_seconds{job_type="IMAGE",stage="total",quantile="0.95"}' in text
+    assert 'hydration_duration_seconds_max{job_type="ITEM",stage="upstream"}' in text
+
+
+def test_untraced_message_falls_back_to_sqs_sent_time(monkeypatch, capsys):
+    monkeypatch.setattr(tracing, "stats", tracing.HydrationStats())
+    monkeypatch.setattr(tracing, "HYDRATION_EMF", True)
+
+    def failing(payload):
+        with tracing.hydration_phase("upstream"):
+            raise RuntimeError("usda down")
+    monkeypatch.setitem(worker.JOB_HANDLERS, "ITEM", failing)
+    sent_ms = int((time.time() - 2) * 1000)
+    record = {"body": json.dumps({"jobType": "ITEM", "payload": {}}), "attributes": {"SentTimestamp": str(sent_ms)}}
+
+    with pytest.raises(RuntimeError):
+        worker.process_records([record])
+
+    summary = tracing.hydration_stats()["ITEM"]
+    assert summary["failed"] == 1 and summary["completed"] == 0
+    assert summary["queue_ms"]["p50"] >= 2000
+    emf = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert emf["JobType"] == "ITEM" and emf["Outcome"] == "failed" and emf["TraceId"]
+    assert {"Name": "hydration_ms", "Unit": "Milliseconds"} in emf["_aws"]["CloudWatchMetrics"][0]["Metrics"]
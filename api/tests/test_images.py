@@ -0,0 +1,110 @@
+import threading
+import time
+from io import BytesIO
+from types import SimpleNamespace
+
+import boto3
+import pytest
+from moto import mock_s3
+
+from PIL import Image
+
+from ai import images
+from storage import images as image_store
+
+
+@pytest.fixture
+def aws(pantry_table, monkeypatch):
+    with mock_s3():
+        monkeypatch.setattr(image_store, "_bucket_checked", False)
+        yield
+
+
+def png_bytes(size=(1024, 768)) -> bytes:
+    buf = BytesIO()
+    Image.new("RGB", size, "orange").save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def fake_download(url, timeout=10):
+    return BytesIO(png_bytes()), "image/png"
+
+
+class CountingImages:
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(data=[SimpleNamespace(url="http://test/image.png")])
+
+
+def test_shared_image_key_normalizes_name():
+    assert images.shared_image_key("  Whole   MILK! ") == images.shared_image_key("whole milk")
+    assert images.shared_image_key("milk") != images.shared_image_key("bread")
+
+
+def test_concurrent_requests_generate_once(aws, monkeypatch):
+    monkeypatch.setattr(image_store, "download_image", fake_download)
+    openai_images = CountingImages()
+    openai_client = SimpleNamespace(images=openai_images)
+
+    urls = []
+    threads = [
+        threading.Thread(target=lambda: urls.append(images.get_or_create_item_image("Milk", openai_client)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert openai_images.calls == 1
+    assert len({u["original"] for u in urls}) == 1
+    assert urls[0]["original"].endswith(images.shared_image_key("milk") + "/original.png")
+    # A later job for the same product is a cache hit
+    assert images.get_or_create_item_image("milk ", openai_client) == urls[0]
+    assert openai_images.calls == 1
+    # Per-key locks don't outlive their callers
+    assert images._generation_locks == {}
+
+
+def test_live_lease_defers_to_other_worker(aws, monkeypatch):
+    monkeypatch.setattr(images, "IMAGE_LEASE_WAIT_SECONDS", 0.3)
+    monkeypatch.setattr(images, "IMAGE_LEASE_POLL_SECONDS", 0.1)
+    key = images.shared_image_key("eggs")
+    assert images.acquire_image_lease(key, "other-worker", 60)
+    openai_images = CountingImages()
+
+    # The wait is bounded by IMAGE_LEASE_WAIT_SECONDS, not the lease length
+    start = time.monotonic()
+    with pytest.raises(images.ImagePending):
+        images.get_or_create_item_image("eggs", SimpleNamespace(images=openai_images))
+    assert time.monotonic() - start < 2
+    with pytest.raises(images.ImagePending):
+        images.get_or_create_item_image("eggs", SimpleNamespace(images=openai_images), wait_seconds=0)
+    assert openai_images.calls == 0
+
+
+def test_busy_key_lock_does_not_block_a_non_waiting_caller(aws):
+    openai_images = CountingImages()
+    key = images.shared_image_key("flour")
+    with images._key_lock(key, 0):
+        start = time.monotonic()
+        with pytest.raises(images.ImagePending):
+            images.get_or_create_item_image("Flour", SimpleNamespace(images=openai_images), wait_seconds=0)
+        assert time.monotonic() - start < 0.5
+    assert openai_images.calls == 0
+    assert images._generation_locks == {}
+
+
+def test_store_image_writes_resized_variants(aws):
+    variants = image_store.store_image(BytesIO(png_bytes()), "image/png", "recipes/r1")
+
+    assert set(variants) == {"original", "thumb", "medium"}
+    s3 = boto3.client("s3", region_name="us-east-1")
+    for name, max_edge in image_store.IMAGE_VARIANTS.items():
+        key = variants[name].split(".amazonaws.com/", 1)[1]
+        obj = s3.get_object(Bucket=image_store.IMAGE_BUCKET_NAME, Key=key)
+        assert obj["ContentType"] == "image/webp"
+        assert max(Image.open(BytesIO(obj["Body"].read())).size) == max_edge
@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+from api.app import app
+import cookbook.cookbook_service as cookbook_service
+from cookbook import importer
+
+RECIPE_PAGE = """<html><head><script type="application/ld+json">
+{"@context": "https://schema.org", "@type": "Recipe", "name": "%s",
+ "recipeIngredient": ["1 slice bread"], "recipeInstructions": "Toast it"}
+</script></head><body></body></html>"""
+
+
+def test_canonical_url_drops_tracking_and_fragments():
+    assert importer.canonical_url("HTTPS://Example.com/r/toast/?utm_source=x&b=2&a=1#steps") == \
+        "https://example.com/r/toast?a=1&b=2"
+
+
+def test_fetch_html_revalidates_with_etag(monkeypatch):
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text="<html>v1</html>", headers={"ETag": '"v1"'})
+
+    monkeypatch.setattr(importer, "html_cache", importer.HtmlCache(fresh_seconds=0))
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            first = await importer.fetch_html(client, "https://example.com/toast")
+            second = await importer.fetch_html(client, "https://example.com/toast")
+        return first, second
+
+    assert asyncio.run(run()) == ("<html>v1</html>", "<html>v1</html>")
+    assert seen == [None, '"v1"']
+
+
+def test_bulk_import_streams_status_and_limits_per_domain(monkeypatch):
+    in_flight = {"now": 0, "max": 0}
+
+    fetched = []
+
+    async def handler(request):
+        fetched.append(str(request.url))
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        if request.url.path == "/missing":
+            return httpx.Response(404)
+        return httpx.Response(200, text=RECIPE_PAGE % request.url.path.strip("/"))
+
+    saved = []
+    monkeypatch.setattr(importer, "html_cache", importer.HtmlCache())
+    monkeypatch.setattr(importer, "build_http_client",
+                        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(cookbook_service, "write_recipe_items", lambda user_id, items: saved.extend(items))
+    monkeypatch.setitem(app.dependency_overrides, cookbook_service.get_user_id_from_token, lambda: "testuser")
+
+    urls = [f"https://example.com/r{i}" for i in range(5)] + ["https://example.com/r5/?b=2&a=1",
+                                                               "https://example.com/missing",
+                                                               "https://example.com/r0?utm_source=x"]
+    resp = TestClient(app).post("/cookbook/import/bulk", json={"urls": urls})
+
+    assert resp.status_code == 200
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    statuses = {line["url"]: line["status"] for line in lines if "url" in line}
+    assert statuses["https://example.com/missing"] == "error"
+    assert sum(1 for s in statuses.values() if s == "saved") == 6
+    assert lines[-1] == {"status": "done", "saved": 6, "failed": 1}
+    assert sorted(r.name for r in saved) == [f"r{i}" for i in range(6)]
+    assert in_flight["max"] <= importer.PER_DOMAIN_CONCURRENCY
+    # Canonical URLs only dedupe; pages are fetched as the user gave them
+    assert "https://example.com/r5/?b=2&a=1" in fetched
+    assert len(fetched) == 7
@@ -0,0 +1,44 @@
+from ai.json_stream import RecipeStreamParser, parse_recipe_json
+
+RECIPE = (
+    'Sure!\n```json\n{"title": "Egg \\"Toast\\"", '
+    '"ingredients": [{"name": "egg", "qty": "2"}, "1 slice bread"], '
+    '"steps": ["Toast, then top", "Eat"], "macros": {"calories": 300}}\n```'
+)
+
+
+def test_events_emitted_as_values_complete():
+    parser = RecipeStreamParser()
+    events = []
+    for ch in RECIPE:
+        events += [(event, value, parser.pos) for event, value in parser.feed(ch)]
+
+    assert [(e, v) for e, v, _ in events] == [
+        ("title", 'Egg "Toast"'),
+        ("ingredient", {"name": "egg", "qty": "2"}),
+        ("ingredient", "1 slice bread"),
+        ("step", "Toast, then top"),
+        ("step", "Eat"),
+    ]
+    # The title is reported long before the document is finished
+    assert events[0][2] < RECIPE.index("ingredients")
+    assert parser.finalize()["macros"] == {"calories": 300}
+
+
+def test_truncated_document_is_repaired():
+    cut = RECIPE[:RECIPE.index('"Eat"') + 3]
+    assert parse_recipe_json(cut) == {
+        "title": 'Egg "Toast"',
+        "ingredients": [{"name": "egg", "qty": "2"}, "1 slice bread"],
+        "steps": ["Toast, then top", "Ea"],
+    }
+
+
+def test_dangling_key_and_partial_scalar_are_dropped():
+    assert parse_recipe_json('{"title": "Toast", "steps":') == {"title": "Toast"}
+    assert parse_recipe_json('{"title": "Toast", "serves": tr') == {"title": "Toast"}
+
+
+def test_unusable_output_returns_none():
+    assert parse_recipe_json("I cannot help with that.") is None
+    assert parse_recipe_json('{"tit') is None
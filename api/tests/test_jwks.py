@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk
+
+from auth import jwks as jwks_module
+from auth.jwks import JwksProvider
+
+
+def public_jwk(kid: str) -> dict:
+    public = rsa.generate_private_key(public_exponent=65537, key_size=2048).public_key()
+    pem = public.public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+    return {**jwk.construct(pem, "RS256").to_dict(), "kid": kid, "alg": "RS256"}
+
+
+@pytest.fixture
+def served(monkeypatch):
+    """Serve a mutable JWKS through httpx's mock transport and count fetches."""
+    state = {"jwks": {"keys": [public_jwk("k1")]}, "requests": 0, "status": 200}
+
+    def handler(request):
+        state["requests"] += 1
+        return httpx.Response(state["status"], json=state["jwks"])
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(jwks_module.httpx, "AsyncClient",
+                        lambda **kw: real_client(transport=httpx.MockTransport(handler), **kw))
+    return state
+
+
+def test_unknown_kid_refetches_at_most_once_per_interval(served, monkeypatch):
+    provider = JwksProvider("http://jwks.test/keys")
+
+    async def run():
+        # Concurrent cold requests share one fetch
+        keys = await asyncio.gather(*(provider.get_key("k1") for _ in range(5)))
+        assert all(k is not None for k in keys)
+        served["jwks"]["keys"].append(public_jwk("k2"))
+        assert await provider.get_key("k2") is None  # rate limited: fetched moments ago
+        monkeypatch.setattr(jwks_module, "JWKS_MIN_REFETCH_SECONDS", 0)
+        assert await provider.get_key("k2") is not None  # rotated key picked up
+
+    asyncio.run(run())
+    assert served["requests"] == 2
+
+
+def test_stale_keys_are_served_while_refreshing(served, monkeypatch):
+    provider = JwksProvider("http://jwks.test/keys")
+    provider.install({"keys": [public_jwk("old")]})
+    monkeypatch.setattr(jwks_module, "JWKS_REFRESH_SECONDS", -1)
+
+    async def run():
+        assert await provider.get_key("old") is not None
+        assert served["requests"] == 0  # answered before the refresh ran
+        await provider._refresh
+        assert set(provider.keys) == {"k1"}
+
+    asyncio.run(run())
+
+
+def test_jwks_file_is_used_offline(tmp_path, served):
+    path = tmp_path / "jwks.json"
+    path.write_text(json.dumps({"keys": [public_jwk("local")]}))
+    provider = JwksProvider("http://jwks.test/keys", str(path))
+
+    async def run():
+        assert await provider.get_key("local") is not None
+        assert await provider.get_key("other") is None
+
+    asyncio.run(run())
+    assert served["requests"] == 0
+
+
+def test_failed_first_fetch_is_retried_without_rate_limit(served, monkeypatch):
+    provider = JwksProvider("http://jwks.test/keys")
+    served["status"] = 503
+
+    async def run():
+        assert await provider.get_key("k1") is None
+        assert await provider.get_key("k1") is None  # brief backoff after a failure
+        served["status"] = 200
+        monkeypatch.setattr(jwks_module, "JWKS_RETRY_SECONDS", 0)
+        # Not held back by COGNITO_JWKS_MIN_REFETCH_SECONDS while there are no keys
+        assert await provider.get_key("k1") is not None
+
+    asyncio.run(run())
+    assert served["requests"] == 2
@@ -0,0 +1,96 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from starlette.requests import ClientDisconnect
+
+from ai import llm
+
+
+def slow_client(delay: float, active: dict):
+    async def create(**kwargs):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        await asyncio.sleep(delay)
+        active["now"] -= 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))])
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_per_user_and_global_limits(monkeypatch):
+    monkeypatch.setattr(llm, "OPENAI_MAX_PER_USER", 2)
+    monkeypatch.setattr(llm, "OPENAI_MAX_CONCURRENCY", 3)
+    per_user = {"now": 0, "max": 0}
+    overall = {"now": 0, "max": 0}
+
+    async def run():
+        heavy = slow_client(0.02, per_user)
+        others = slow_client(0.02, overall)
+        await asyncio.gather(
+            *(llm.chat_completion(heavy, "heavy-user", model="m") for _ in range(6)),
+            *(llm.chat_completion(others, f"user-{i}", model="m") for i in range(6)),
+        )
+        return llm._get_gate()
+
+    gate = asyncio.run(run())
+    assert per_user["max"] == 2
+    assert overall["max"] <= 3
+    # Idle per-user semaphores are dropped once their calls finish
+    assert gate.user_slots == {}
+
+
+def test_queue_timeout_raises_busy(monkeypatch):
+    monkeypatch.setattr(llm, "OPENAI_MAX_PER_USER", 1)
+    monkeypatch.setattr(llm, "OPENAI_QUEUE_TIMEOUT_SECONDS", 0.05)
+    rejected = llm.stats.rejected
+
+    async def run():
+        client = slow_client(0.5, {"now": 0, "max": 0})
+        first = asyncio.ensure_future(llm.chat_completion(client, "u1", model="m"))
+        await asyncio.sleep(0)
+        with pytest.raises(llm.LLMBusy):
+            await llm.chat_completion(client, "u1", model="m")
+        first.cancel()
+
+    asyncio.run(run())
+    assert llm.stats.rejected == rejected + 1
+    assert llm.llm_stats()["queue_ms"]["max"] >= 0
+
+
+def test_stream_slot_released_when_client_leaves_before_body(monkeypatch):
+    from ai.streaming import sse_response
+    monkeypatch.setattr(llm, "OPENAI_MAX_PER_USER", 1)
+    closed = []
+
+    class Upstream:
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            raise StopAsyncIteration
+
+        async def close(self):
+            closed.append(True)
+
+    async def create(**kwargs):
+        return Upstream()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    async def events():
+        yield "never sent"
+
+    async def send(message):
+        raise OSError("client went away")  # the first send fails, before the body is iterated
+
+    async def run():
+        stream = await llm.open_chat_stream(client, "u1", model="m")
+        response = sse_response(events(), stream)
+        with pytest.raises(ClientDisconnect):
+            await response({"type": "http", "asgi": {"spec_version": "2.4"}}, None, send)
+        assert closed == [True]
+        # The user's only slot is free again
+        async with llm.llm_slot("u1"):
+            pass
+        return llm._get_gate()
+
+    assert asyncio.run(run()).user_slots == {}
@@ -0,0 +1,80 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app import app
+import auth.auth_service as auth_service
+import metrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = metrics.Histogram("t_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 0.7, 3.0):
+        hist.observe(seconds, '/a"b')
+    lines = hist.render()
+    assert 't_seconds_bucket{route="/a\\"b",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{route="/a\\"b",le="1"} 3' in lines
+    assert 't_seconds_bucket{route="/a\\"b",le="+Inf"} 4' in lines
+    assert 't_seconds_count{route="/a\\"b"} 4' in lines
+
+
+def test_percentiles_by_nearest_rank():
+    assert metrics.percentiles(range(1, 101)) == {"p50": 51, "p95": 96, "p99": 100, "max": 100}
+    assert metrics.percentiles([]) == {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+
+def test_window_lines_export_seconds_with_separate_max():
+    lines = metrics.window_lines("t_wait_seconds", "Test wait.", [({"op": "a"}, [10.0, 20.0, 3000.0])])
+    assert 't_wait_seconds{op="a",quantile="0.5"} 0.02' in lines
+    assert 't_wait_seconds{op="a",quantile="0.99"} 3' in lines
+    assert 't_wait_seconds_max{op="a"} 3' in lines
+    assert not any('quantile="max"' in line or 'quantile="p' in line for line in lines)
+
+
+def test_dependency_span_counts_errors():
+    with pytest.raises(ValueError):
+        with metrics.dependency_span("usda", "test-op"):
+            raise ValueError("boom")
+    with metrics.dependency_span("usda", "test-op"):
+        pass
+    text = metrics.render_metrics()
+    assert 'dependency_call_duration_seconds_count{dependency="usda",operation="test-op"} 2' in text
+    assert 'dependency_call_errors_total{dependency="usda",operation="test-op"} 1' in text
+
+
+@pytest.fixture
+def metrics_client(pantry_table, monkeypatch):
+    monkeypatch.setitem(app.dependency_overrides, auth_service.get_user_id_from_token, lambda: "metricsuser")
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "scrape-secret")
+    return TestClient(app)
+
+
+def test_metrics_endpoint_reports_routes_and_aws_calls(metrics_client):
+    assert metrics_client.get("/pantry/items").status_code == 200
+    assert metrics_client.get("/no/such/route").status_code == 404
+
+    resp = metrics_client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    text = resp.text
+    assert 'http_requests_total{method="GET",route="/pantry/items",status="200"}' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/pantry/items",le="+Inf"}' in text
+    # Unmatched paths share one label instead of one series per URL
+    assert 'http_requests_total{method="GET",route="<unmatched>",status="404"}' in text
+    # DynamoDB calls are timed by the client registry's botocore hooks
+    assert 'dependency_call_duration_seconds_count{dependency="dynamodb",operation="GetItem"}' in text
+    assert 'dependency_call_duration_seconds_count{dependency="dynamodb",operation="Query"}' in text
+    # Stats kept elsewhere are collected on scrape
+    assert 'llm_calls_total{outcome="rejected"}' in text
+    assert 'llm_queue_wait_seconds{quantile="0.95"}' in text
+    assert "\nllm_queue_wait_seconds_max " in text
+    assert 'response_cache_lookups_total{result="hit"}' in text
+
+
+def test_metrics_require_the_scrape_token(monkeypatch):
+    client = TestClient(app)
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", None)
+    assert client.get("/metrics", headers={"Authorization": "Bearer anything"}).status_code == 404
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 404
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 404
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
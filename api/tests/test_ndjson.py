@@ -0,0 +1,83 @@
+import json
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app import app
+import auth.auth_service as auth_service
+import pantry.pantry_service as pantry_service
+from models.models import InventoryItem, InventoryItemMacros, Recipe
+from serialization import NDJSON_MEDIA_TYPE
+from storage import utils as storage
+
+
+@pytest.fixture
+def ndjson_client(pantry_table, monkeypatch):
+    monkeypatch.setitem(app.dependency_overrides, auth_service.get_user_id_from_token, lambda: "streamuser")
+    monkeypatch.setattr(pantry_service, "NDJSON_PAGE_SIZE", 7)
+    return TestClient(app)
+
+
+def test_pantry_streams_ndjson_in_pages(ndjson_client):
+    items = [InventoryItem(id=f"p{i:02}", product_name=f"Item {i}", macros=InventoryItemMacros(protein=Decimal("1.5")))
+             for i in range(30)]
+    storage.write_pantry_items("streamuser", items)
+    storage.soft_delete_pantry_item("streamuser", "p03")
+
+    with ndjson_client.stream("GET", "/pantry/items", headers={"Accept": NDJSON_MEDIA_TYPE}) as resp:
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == NDJSON_MEDIA_TYPE
+        assert resp.headers["vary"] == "Accept" and resp.headers["etag"]
+        chunks = list(resp.iter_bytes())
+    rows = [json.loads(line) for line in b"".join(chunks).splitlines()]
+
+    # Same records as the JSON array, in the same order
+    assert rows == ndjson_client.get("/pantry/items").json()
+    assert [row["id"] for row in rows] == [f"p{i:02}" for i in range(30) if i != 3]
+    assert rows[0]["macros"]["protein"] == 1.5
+
+
+def test_recipes_stream_ndjson(ndjson_client):
+    storage.write_recipe_items("streamuser", [Recipe(id="r1", name="Soup"), Recipe(id="r2", name="Stew")])
+    resp = ndjson_client.get("/cookbook", headers={"Accept": NDJSON_MEDIA_TYPE})
+    assert resp.status_code == 200
+    assert [json.loads(line)["name"] for line in resp.text.splitlines()] == ["Soup", "Stew"]
+
+
+def test_empty_pantry_streams_nothing(ndjson_client):
+    resp = ndjson_client.get("/pantry/items", headers={"Accept": NDJSON_MEDIA_TYPE})
+    assert resp.status_code == 200 and resp.content == b""
+
+
+def test_json_and_ndjson_have_distinct_etags_and_304s_vary(ndjson_client):
+    ndjson = {"Accept": NDJSON_MEDIA_TYPE}
+    json_etag = ndjson_client.get("/pantry/items").headers["etag"]
+    ndjson_etag = ndjson_client.get("/pantry/items", headers=ndjson).headers["etag"]
+    assert json_etag != ndjson_etag
+
+    resp = ndjson_client.get("/pantry/items", headers={**ndjson, "If-None-Match": ndjson_etag})
+    assert resp.status_code == 304 and resp.headers["vary"] == "Accept"
+    # The JSON array's ETag doesn't validate the NDJSON form
+    assert ndjson_client.get("/pantry/items", headers={**ndjson, "If-None-Match": json_etag}).status_code == 200
+
+
+def test_disconnect_mid_stream_closes_pages():
+    import asyncio
+    from serialization import ndjson_response
+    closed = []
+
+    async def pages():
+        try:
+            for i in range(3):
+                yield [{"n": i}]
+        finally:
+            closed.append(True)
+
+    async def run():
+        body = (await ndjson_response(pages())).body_iterator
+        assert await anext(body) == b'{"n":0}\n'
+        await body.aclose()  # what Starlette does when the client goes away
+        assert closed == [True]  # now, not when the loop shuts down
+
+    asyncio.run(run())
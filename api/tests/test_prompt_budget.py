@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+
+from ai import prompt_budget
+from ai.prompt_budget import budget_item_lines, compact_macros, count_tokens, rank_items
+import ai.openai_service as openai_service
+from models.models import InventoryItemMacros
+
+NOW = datetime(2025, 1, 15, tzinfo=timezone.utc)
+
+
+def days(n: int) -> str:
+    return (NOW + timedelta(days=n)).isoformat()
+
+
+def test_compact_macros_skips_empty_values():
+    macros = {"calories": 120, "protein": 4, "carbohydrates": 22.25, "fat": 1.5, "sodium": 300, "fiber": 0}
+    assert compact_macros(macros) == "120kcal P4 C22 F1.5"
+    assert compact_macros(None) == ""
+
+
+def test_rank_prefers_expiring_fitting_and_recent_items():
+    goals = {"protein": 150, "carbohydrates": 100, "fat": 40}
+    items = [
+        {"product_name": "old rice", "macros": {"carbohydrates": 45, "protein": 4}, "created_at": days(-90)},
+        {"product_name": "spoiled milk", "expiration_date": days(-5)},
+        {"product_name": "chicken", "macros": {"protein": 31, "fat": 4}, "created_at": days(-1)},
+        {"product_name": "spinach", "expiration_date": days(1)},
+    ]
+    names = [item["product_name"] for item in rank_items(items, goals, NOW)]
+    assert names == ["spinach", "chicken", "old rice", "spoiled milk"]
+
+
+def test_budget_lists_what_fits_and_counts_the_rest(monkeypatch):
+    monkeypatch.setattr(prompt_budget, "_encoder", lambda model: None)
+    items = [{"product_name": f"item {i:03d}", "quantity": 1} for i in range(500)]
+    lines = budget_item_lines(items, openai_service.recipe_item_line, token_budget=100, now=NOW)
+    assert lines[-1] == f"(+{500 - (len(lines) - 1)} more items not listed)"
+    assert sum(count_tokens(line) + 1 for line in lines[:-1]) <= 100
+
+
+def test_meal_prompt_stays_within_budget_for_large_pantries():
+    items = [
+        {"product_name": f"pantry item {i}", "quantity": 1,
+         "macros": {"calories": 100 + i, "protein": 5, "carbohydrates": 10, "fat": 3, "sodium": 50}}
+        for i in range(1000)
+    ]
+    goals = InventoryItemMacros(calories=2000, protein=150, carbohydrates=200, fat=60)
+    small = openai_service.generate_meal_suggestion_prompt(items[:5], goals)
+    large = openai_service.generate_meal_suggestion_prompt(items, goals)
+    assert "more items not listed" not in small
+    assert "more items not listed" in large
+    assert count_tokens(large) < prompt_budget.PROMPT_ITEM_TOKEN_BUDGET + count_tokens(small)
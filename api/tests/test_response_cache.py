@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+from ai.response_cache import ResponseCache, canonical_items, response_key
+from models.models import InventoryItemMacros, RecipeModifiers
+
+
+def test_response_key_is_canonical():
+    a = canonical_items([{"product_name": "Rice ", "quantity": 1}, {"product_name": "Beans", "quantity": 2}],
+                        ("product_name", "quantity"))
+    b = canonical_items([{"product_name": "beans", "quantity": 2, "id": "x"}, {"product_name": "rice", "quantity": 1}],
+                        ("product_name", "quantity"))
+    mods = RecipeModifiers(servings=2)
+    assert response_key("recipe", "m", items=a, modifiers=mods) == response_key("recipe", "m", items=b, modifiers=mods)
+    assert response_key("recipe", "m", items=a, modifiers=mods) != response_key("recipe", "other", items=a, modifiers=mods)
+    assert response_key("meal_suggestions", "m", goals=InventoryItemMacros(protein=Decimal("10"))) == \
+        response_key("meal_suggestions", "m", goals=InventoryItemMacros(protein=Decimal("10.0")))
+
+
+def test_expired_entries_miss():
+    cache = ResponseCache(ttl_seconds=0)
+    cache.put("u", "k", "v")
+    assert cache.get("u", "k") is None
+    assert cache.snapshot()["entries"] == 0
+
+
+def test_per_user_bound_evicts_least_recent():
+    cache = ResponseCache(per_user=2, max_users=1)
+    cache.put("u", "a", 1)
+    cache.put("u", "b", 2)
+    cache.get("u", "a")
+    cache.put("u", "c", 3)
+    assert cache.get("u", "b") is None
+    assert cache.get("u", "a") == 1
+    cache.put("other", "x", 4)
+    assert cache.get("u", "a") is None
+    assert cache.snapshot()["hit_ratio"] == 0.5
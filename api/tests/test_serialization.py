@@ -0,0 +1,38 @@
+import json
+from decimal import Decimal
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+from models.models import InventoryItem, InventoryItemMacros
+from serialization import FastJSONResponse, model_response
+
+
+def sample_items():
+    return [
+        InventoryItem(id=f"p{i}", product_name=f"Item {i}", cost=Decimal("2.49"), environmental_impact=Decimal("3"),
+                      image_variants={"thumb": "t.jpg"},
+                      macros=InventoryItemMacros(calories=Decimal("120"), protein=Decimal("4.5"), sodium=Decimal("0.10")))
+        for i in range(3)
+    ]
+
+
+def test_fast_path_matches_fastapi_encoding():
+    items = sample_items()
+    expected = jsonable_encoder(items)
+    assert json.loads(model_response(items).body) == expected
+    assert json.loads(FastJSONResponse(expected).body) == expected
+    # Integral Decimals stay ints, fractional ones become floats, as with jsonable_encoder
+    first = json.loads(model_response(items[0]).body)
+    assert first["environmental_impact"] == 3 and isinstance(first["environmental_impact"], int)
+    assert first["macros"]["protein"] == 4.5
+
+
+def test_model_response_keeps_headers():
+    response = Response()
+    del response.headers["content-length"]
+    response.headers["ETag"] = 'W/"pantry-x-1"'
+    rendered = model_response(sample_items(), response)
+    assert rendered.headers["etag"] == 'W/"pantry-x-1"'
+    assert rendered.headers["content-type"] == "application/json"
+    assert int(rendered.headers["content-length"]) == len(rendered.body)
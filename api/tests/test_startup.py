@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["openai", "recipe_scrapers", "cv2", "pyzbar", "numpy", "pytz", "PIL"]
+
+
+def loaded_after_import(module: str, watched: list = HEAVY_MODULES) -> list:
+    """Import ``module`` in a fresh interpreter and return which watched modules it pulled in."""
+    env = {
+        "PANTRY_TABLE_NAME": "PantryPal",
+        "AUTH_TABLE_NAME": "AuthTable",
+        "AWS_DEFAULT_REGION": "us-east-1",
+        **os.environ,
+        "PYTHONPATH": API_DIR,
+    }
+    code = f"import sys, {module}; print(','.join(m for m in {watched!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=API_DIR, env=env, capture_output=True, text=True, check=True)
+    return [m for m in out.stdout.strip().splitlines()[-1].split(",") if m] if out.stdout.strip() else []
+
+
+def test_app_import_defers_heavy_modules():
+    assert loaded_after_import("app") == []
+
+
+def test_worker_import_skips_api_stack():
+    assert loaded_after_import("worker", HEAVY_MODULES + ["fastapi", "starlette", "mangum", "app"]) == []
@@ -0,0 +1,76 @@
+import base64
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app import app
+import auth.auth_service as auth_service
+import sync.sync_service as sync_service
+from models.models import ChatMeta, InventoryItem, Recipe
+from storage import utils as storage
+
+
+# Every test runs against both the filtered-query fallback and the SyncIndex GSI
+pytestmark = pytest.mark.parametrize("pantry_table", [None, "SyncIndex"], ids=["filter", "gsi"], indirect=True)
+
+
+@pytest.fixture
+def sync_client(pantry_table, monkeypatch):
+    # Writes in a test land long before the next sync; don't resend them
+    monkeypatch.setattr(sync_service, "SYNC_SETTLE_SECONDS", 0)
+    monkeypatch.setitem(app.dependency_overrides, auth_service.get_user_id_from_token, lambda: "syncuser")
+    return TestClient(app)
+
+
+def full_sync(client, limit):
+    pages, token = [], None
+    while True:
+        resp = client.get("/sync", params={"since": token, "limit": limit} if token else {"limit": limit})
+        assert resp.status_code == 200
+        page = resp.json()
+        pages.append(page)
+        token = page["next"]
+        if not page["has_more"]:
+            return pages, token
+
+
+def test_delta_sync_returns_only_changes(sync_client):
+    client = sync_client
+    items = [InventoryItem(id=f"p{i}", product_name=f"Item {i}", quantity=1) for i in range(45)]
+    storage.write_pantry_items("syncuser", items)
+    storage.write_recipe_items("syncuser", [Recipe(id="r1", name="Soup"), Recipe(id="r2", name="Stew")])
+    storage.upsert_chat_meta("syncuser", ChatMeta(id="c1", title="Hi", updatedAt="2024-01-01T00:00:00Z", length=0))
+    storage.soft_delete_recipe_item("syncuser", "r2")
+    storage.write_pantry_items("otheruser", [InventoryItem(id="x1", product_name="Not mine")])
+
+    pages, token = full_sync(client, limit=20)
+    assert len(pages) > 1
+    assert sorted(i["id"] for p in pages for i in p["pantry"]) == sorted(i.id for i in items)
+    assert [r["id"] for p in pages for r in p["recipes"]] == ["r1"]
+    assert [c["id"] for p in pages for c in p["chats"]] == ["c1"]
+    assert not any(p["deleted"] for p in pages)  # a full sync has nothing to delete
+
+    # Nothing changed: an empty delta
+    quiet = client.get("/sync", params={"since": token}).json()
+    assert quiet["pantry"] == quiet["recipes"] == quiet["deleted"] == [] and not quiet["has_more"]
+
+    items[7].quantity = 3
+    storage.write_pantry_items("syncuser", [items[7]])
+    storage.soft_delete_pantry_item("syncuser", "p8")
+    delta = client.get("/sync", params={"since": quiet["next"]}).json()
+    assert [i["id"] for i in delta["pantry"]] == ["p7"]
+    assert delta["pantry"][0]["quantity"] == 3
+    assert delta["deleted"] == [{"type": "pantry", "id": "p8"}]
+    assert delta["recipes"] == delta["chats"] == []
+
+
+@pytest.mark.parametrize("state", [
+    {"since": None, "resume": "2024-05-01T00:00:00", "cursor": {"PK": "USER#someoneelse", "SK": "PANTRY#p1"}},
+    {"since": None, "resume": "2024-05-01T00:00:00", "cursor": ["USER#syncuser"]},
+    {"since": 5, "resume": "2024-05-01T00:00:00", "cursor": None},
+])
+def test_invalid_token_is_rejected(sync_client, state):
+    assert sync_client.get("/sync", params={"since": "not-a-token"}).status_code == 400
+    token = base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+    assert sync_client.get("/sync", params={"since": token}).status_code == 400
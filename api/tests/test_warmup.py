@@ -0,0 +1,32 @@
+import warmup
+from api.app import lambda_handler
+
+
+def test_warmup_event_detection():
+    assert warmup.is_warmup_event({"warmup": True})
+    assert warmup.is_warmup_event({"source": "aws.events", "detail-type": "Scheduled Event"})
+    assert not warmup.is_warmup_event({"httpMethod": "GET", "path": "/"})
+
+
+def test_run_warmup_hooks_reports_timings_and_failures(monkeypatch):
+    def broken():
+        raise RuntimeError("no network")
+
+    monkeypatch.setattr(warmup, "WARMUP_HOOKS", {"ok": lambda: None, "broken": broken})
+    results = warmup.run_warmup_hooks()
+    assert results["ok"]["ok"] is True
+    assert results["broken"] == {"ok": False, "error": "no network", "ms": results["broken"]["ms"]}
+    assert all(r["ms"] >= 0 for r in results.values())
+
+
+def test_lambda_handler_runs_hooks_on_warmup(monkeypatch):
+    calls = []
+    monkeypatch.setattr(warmup, "WARMUP_HOOKS", {"jwks": lambda: calls.append("jwks")})
+    resp = lambda_handler({"warmup": True}, None)
+    assert resp["status"] == "warm"
+    assert list(resp["hooks"]) == ["jwks"]
+    assert calls == ["jwks"]
+
+
+def test_hooks_registered_for_first_use_costs():
+    assert {"cognito_jwks", "cognito_client", "openai_client", "dynamodb", "s3", "sqs_client"} <= set(warmup.WARMUP_HOOKS)
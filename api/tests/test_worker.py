@@ -0,0 +1,24 @@
+import json
+import worker
+
+
+def sqs_event(*messages):
+    return {"Records": [{"eventSource": "aws:sqs", "body": json.dumps(m)} for m in messages]}
+
+
+def test_process_records_dispatches_by_job_type(monkeypatch):
+    calls = []
+    monkeypatch.setitem(worker.JOB_HANDLERS, "ITEM", lambda payload: calls.append(("ITEM", payload)))
+    monkeypatch.setitem(worker.JOB_HANDLERS, "IMAGE", lambda payload: calls.append(("IMAGE", payload)))
+
+    event = sqs_event(
+        {"jobType": "ITEM", "payload": {"item_id": "1"}},
+        {"jobType": "IMAGE", "payload": {"item_id": "2"}},
+        {"jobType": "BOGUS", "payload": {}},
+    )
+    assert worker.lambda_handler(event, None) == {"status": "hydration jobs processed"}
+    assert calls == [("ITEM", {"item_id": "1"}), ("IMAGE", {"item_id": "2"})]
+
+
+def test_worker_ignores_non_sqs_events():
+    assert worker.lambda_handler({"httpMethod": "GET"}, None) == {"status": "ignored"}
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import uuid
+import logging
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+from metrics import percentiles, register_collector, sample_lines, window_lines
+
+# ─── Hydration Tracing ───────────────────────────────────────────────────────────
+# Answers "how long after adding an item do its macros and image show up?".
+# Every hydration message carries a trace id and its enqueue time. The worker
+# opens a trace per message; job handlers mark their upstream (USDA, OpenAI,
+# image fetch) and write (DynamoDB) sections with hydration_phase(). Each
+# finished trace is logged as one CloudWatch Embedded Metric Format line (so
+# percentiles work across every worker instance) and kept in a rolling window
+# per job type for hydration_stats() and /metrics.
+
+HYDRATION_TRACE_WINDOW = int(os.getenv("HYDRATION_TRACE_WINDOW", "1000"))
+HYDRATION_EMF = os.getenv("HYDRATION_EMF", "true").lower() in ("1", "true", "yes")
+EMF_NAMESPACE = os.getenv("HYDRATION_EMF_NAMESPACE", "PantryPal/Hydration")
+TIMINGS = ("queue_ms", "upstream_ms", "write_ms", "hydration_ms")
+# Stage label of each timing in hydration_duration_seconds; "total" is time to hydration
+STAGES = {"queue_ms": "queue", "upstream_ms": "upstream", "write_ms": "write", "hydration_ms": "total"}
+
+_current: ContextVar[Optional["HydrationTrace"]] = ContextVar("hydration_trace", default=None)
+
+
+def hydration_message(job_type: str, payload: dict) -> str:
+    """SQS body for a hydration job, stamped with a new trace id and the enqueue time."""
+    return json.dumps({"jobType": job_type, "payload": payload,
+                       "trace_id": uuid.uuid4().hex, "enqueued_at": time.time()})
+
+
+class HydrationTrace:
+    def __init__(self, job_type: str, trace_id: str, enqueued_at: Optional[float]):
+        self.job_type = job_type
+        self.trace_id = trace_id
+        self.enqueued_at = enqueued_at
+        self.started_at = time.time()
+        self.phases: Dict[str, float] = defaultdict(float)
+        self.ok = True
+
+    def timings(self) -> Dict[str, Optional[float]]:
+        """Milliseconds per stage; queue and hydration are None when the enqueue time is unknown."""
+        finished = time.time()
+        queued = self.enqueued_at is not None
+        return {
+            # Clocks differ slightly between the API and worker instances; never report negative waits
+            "queue_ms": round(max(0.0, self.started_at - self.enqueued_at) * 1000, 1) if queued else None,
+            "upstream_ms": round(self.phases["upstream"], 1),
+            "write_ms": round(self.phases["write"], 1),
+            "hydration_ms": round(max(0.0, finished - self.enqueued_at) * 1000, 1) if queued else None,
+        }
+
+
+class HydrationStats:
+    """Rolling per-job-type windows of each stage's latency, plus outcome counts."""
+
+    def __init__(self, window: int = HYDRATION_TRACE_WINDOW):
+        self.completed = defaultdict(int)
+        self.failed = defaultdict(int)
+        self.samples = defaultdict(lambda: {name: deque(maxlen=window) for name in TIMINGS})
+
+    def record(self, trace: HydrationTrace, timings: Dict[str, Optional[float]]) -> None:
+        (self.completed if trace.ok else self.failed)[trace.job_type] += 1
+        for name, value in timings.items():
+            if value is not None:
+                self.samples[trace.job_type][name].append(value)
+
+    def snapshot(self) -> dict:
+        return {
+            job_type: {
+                "completed": self.completed[job_type],
+                "failed": self.failed[job_type],
+                **{name: percentiles(window) for name, window in samples.items()},
+            }
+            for job_type, samples in sorted(self.samples.items())
+        }
+
+
+stats = HydrationStats()
+
+
+def emf_line(trace: HydrationTrace, timings: Dict[str, Optional[float]]) -> str:
+    """One Embedded Metric Format record; CloudWatch turns the timings into metrics by JobType."""
+    metrics = [{"Name": name, "Unit": "Milliseconds"} for name, value in timings.items() if value is not None]
+    return json.dumps({
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{"Namespace": EMF_NAMESPACE, "Dimensions": [["JobType"]], "Metrics": metrics}],
+        },
+        "JobType": trace.job_type,
+        "TraceId": trace.trace_id,
+        "Outcome": "ok" if trace.ok else "failed",
+        **{name: value for name, value in timings.items() if value is not None},
+    })
+
+
+@contextmanager
+def hydration_trace(job_type: str, message: dict, record: Optional[dict] = None):
+    """Trace one hydration job from its message; ``record`` is the SQS record, for its SentTimestamp."""
+    enqueued_at = message.get("enqueued_at")
+    if enqueued_at is None and record is not None:
+        # Messages queued before tracing existed: fall back to when SQS accepted them
+        sent = record.get("attributes", {}).get("SentTimestamp")
+        enqueued_at = int(sent) / 1000 if sent else None
+    trace = HydrationTrace(job_type, message.get("trace_id") or uuid.uuid4().hex, enqueued_at)
+    token = _current.set(trace)
+    try:
+        yield trace
+    except BaseException:
+        trace.ok = False
+        raise
+    finally:
+        _current.reset(token)
+        timings = trace.timings()
+        stats.record(trace, timings)
+        logging.info(f"Hydration {job_type} trace {trace.trace_id}: {timings}")
+        if HYDRATION_EMF:
+            # EMF must be the whole log line, so bypass the logging format
+            print(emf_line(trace, timings), flush=True)
+
+
+@contextmanager
+def hydration_phase(name: str):
+    """Add the enclosed time to the current trace's ``name`` phase ("upstream" or "write"); no-op outside a trace."""
+    trace = _current.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if trace is not None:
+            trace.phases[name] += (time.perf_counter() - start) * 1000
+
+
+def hydration_stats() -> dict:
+    """Return percentile summaries (ms) of queue wait, upstream, write and time-to-hydration, by job type."""
+    return stats.snapshot()
+
+
+@register_collector("hydration")
+def hydration_metrics():
+    jobs = sorted(stats.samples)
+    return (
+        sample_lines("hydration_jobs_total", "Hydration jobs handled by this instance, by outcome.",
+                     [({"job_type": job, "outcome": outcome}, counts[job])
+                      for job in jobs for outcome, counts in (("completed", stats.completed), ("failed", stats.failed))],
+                     kind="counter")
+        + window_lines("hydration_duration_seconds", "Hydration time by job type and stage (total = enqueue to done).",
+                       [({"job_type": job, "stage": STAGES[name]}, list(stats.samples[job][name]))
+                        for job in jobs for name in TIMINGS])
+    )
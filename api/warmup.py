@@ -0,0 +1,40 @@
+import logging
+import time
+from typing import Callable, Dict
+
+# Pre-initialization hooks run on scheduled warm-up events, keyed by name.
+# Modules register the expensive first-use work they own (network fetches,
+# client construction, connection setup) so it happens off the user path.
+WARMUP_HOOKS: Dict[str, Callable[[], None]] = {}
+
+
+def register_warmup_hook(name: str):
+    """Decorator registering ``fn`` to run on every warm-up event."""
+    def decorator(fn: Callable[[], None]):
+        WARMUP_HOOKS[name] = fn
+        return fn
+    return decorator
+
+
+def is_warmup_event(event: dict) -> bool:
+    """Return True for the scheduled warm-up ping (custom input or raw EventBridge event)."""
+    if event.get("warmup"):
+        return True
+    return event.get("source") == "aws.events" and event.get("detail-type") == "Scheduled Event"
+
+
+def run_warmup_hooks() -> Dict[str, dict]:
+    """Run every registered hook and report how long each took."""
+    results: Dict[str, dict] = {}
+    for name, hook in list(WARMUP_HOOKS.items()):
+        start = time.perf_counter()
+        try:
+            hook()
+            result = {"ok": True}
+        except Exception as e:
+            logging.warning(f"Warm-up hook {name} failed: {e}")
+            result = {"ok": False, "error": str(e)}
+        result["ms"] = round((time.perf_counter() - start) * 1000, 1)
+        results[name] = result
+    logging.info(f"Warm-up complete: {results}")
+    return results
@@ -0,0 +1,54 @@
+import logging
+import json
+from dotenv import load_dotenv
+# Only the hydration jobs and their storage/HTTP dependencies are imported here;
+# the FastAPI app, routers and Mangum stay out of the worker's cold start.
+from macros.enrichment import enrich_item, enrich_recipe
+from ai.images import enrich_image_job
+from cookbook.image_jobs import enrich_recipe_image
+from tracing import hydration_trace
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+JOB_HANDLERS = {
+    "ITEM": enrich_item,
+    "RECIPE": enrich_recipe,
+    "IMAGE": enrich_image_job,
+    "RECIPE_IMAGE": enrich_recipe_image,
+}
+
+
+def is_sqs_event(event: dict) -> bool:
+    """Return True if the Lambda event is an SQS batch."""
+    records = event.get("Records") or []
+    return bool(records) and records[0].get("eventSource") == "aws:sqs"
+
+
+def process_records(records: list) -> dict:
+    """Dispatch each SQS record to its hydration job handler."""
+    for rec in records:
+        msg = json.loads(rec["body"])
+        logging.info(f"Received hydration message: {msg}")
+        job = msg.get("jobType", "ITEM")
+        payload = msg.get("payload", {})
+        handler = JOB_HANDLERS.get(job)
+        if handler is None:
+            logging.warning(f"Unknown hydration job type: {job} with payload {payload}")
+            continue
+        logging.info(f"Hydrating {job} job: {payload}")
+        with hydration_trace(job, msg, rec):
+            handler(payload)
+    return {"status": "hydration jobs processed"}
+
+
+# Lambda handler for the SQS hydration queues
+def lambda_handler(event, context):
+    """
+    Handle SQS hydration events without loading the API.
+    """
+    if not is_sqs_event(event):
+        logging.warning(f"Worker received a non-SQS event: {list(event.keys())}")
+        return {"status": "ignored"}
+    return process_records(event["Records"])